@@ -5,6 +5,11 @@ import traceback
 from openai import OpenAI
 from PySide6.QtCore import QSettings
 
+from json_stream import ItemStream
+from model_router import router
+from plan_model import check_epic, check_story
+from search_index import index_epics, index_stack, index_story, index_tickets
+
 # settings = QSettings("PrinzCodeAgent")
 # openai_key = settings.value("openai/key", type=str)
 
@@ -36,19 +41,20 @@ def _get_openai_client() -> str:
 
 def suggest_stack(project_desc: str) -> tuple[str, str]:
     client = _get_openai_client()
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
+    resp = router.complete(
+        client,
+        "stack",
+        [
             {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": project_desc},
         ],
-        temperature=0.3,
     )
     answer = resp.choices[0].message.content.strip()
 
     # YAML + Frage/Question trennen
     splitter = "\nFRAGE:" if "\nFRAGE:" in answer else "\nQUESTION:"
     yaml_part, question = answer.split(splitter, 1)
+    index_stack(project_desc, yaml_part.strip())
     return yaml_part.strip(), splitter.strip() + question.strip()
 
 
@@ -72,35 +78,38 @@ Return TWO blocks:
 """
 
 
-def revise_stack(current_yaml: str, user_changes: str) -> tuple[str, str]:
+def revise_stack(
+    current_yaml: str, user_changes: str, description: str = ""
+) -> tuple[str, str]:
     client = _get_openai_client()
     """Returns (new_yaml, new_question)"""
     prompt = REVISION_PROMPT.replace("$STACK", current_yaml).replace(
         "$CHANGES", user_changes
     )
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
+    resp = router.complete(
+        client,
+        "revise",
+        [
             {"role": "system", "content": prompt},
         ],
-        temperature=0.3,
     )
     answer = resp.choices[0].message.content.strip()
     splitter = "\nFRAGE:" if "\nFRAGE:" in answer else "\nQUESTION:"
     yaml_part, question = answer.split(splitter, 1)
+    index_stack(description, yaml_part.strip())
     return yaml_part.strip(), splitter.strip() + question.strip()
 
 
 DECOMP_PROMPT = """
 You are a senior agile product owner.
-Given the confirmed tech stack and the product description, do two things:
+Given the confirmed tech stack and the product description, create a JSON
+array of epics with their stories.
 
-1) Create a JSON array of epics with their stories (as before).
-2) Plan these epics into 3–5 sequential sprints.  
-   - Sprint 1: basics & foundation  
-   - Sprint 2: technical setup & integrations  
-   - Sprint 3+: UI, polishing, etc.  
-   Each sprint gets a name, a goal, and a list of epic names.
+- Order the epics by dependency: basics & foundation first, then technical
+  setup & integrations, then UI, polishing, etc.
+- Only if an epic cannot start before other epics are done, list their names
+  in "depends_on"; otherwise omit the key.
+- Sprint planning is done afterwards, do NOT plan sprints.
 
 Output ONLY valid JSON matching this schema, no markdown, no commentary:
 
@@ -108,6 +117,7 @@ Output ONLY valid JSON matching this schema, no markdown, no commentary:
   "epics": [
     {
       "epic": "string",
+      "depends_on": ["string", ...],
       "stories": [
         {
           "summary": "string",
@@ -117,41 +127,151 @@ Output ONLY valid JSON matching this schema, no markdown, no commentary:
         }
       ]
     }
-  ],
-  "sprints": [
-    {
-      "name": "Sprint 1",
-      "goal": "string",
-      "epics": ["Flotten-Dashboard", "Nutzer- & Rollenverwaltung"]
-    },
-    {
-      "name": "Sprint 2",
-      "goal": "string",
-      "epics": [ ... ]
-    }
   ]
 }
 """
 
 
-def decompose_project(description: str, stack_yaml: str) -> dict:
+def _decomp_messages(description: str, stack_yaml: str) -> list[dict]:
+    return [
+        {"role": "system", "content": DECOMP_PROMPT},
+        {
+            "role": "user",
+            "content": f"DESC:\n{description}\n\nSTACK:\n{stack_yaml}",
+        },
+    ]
+
+
+def decompose_project(description: str, stack_yaml: str, index: bool = True) -> dict:
+    """
+    Decomposes a project into epics and stories with one LLM call.
+
+    Args:
+        description (str): The project description.
+        stack_yaml (str): The confirmed tech stack.
+        index (bool, optional): Add the result to the search index. Off for
+            speculative runs, whose result may never be used; the caller
+            indexes it with ``index_decomposition`` once it is.
+
+    Returns:
+        dict: The decomposition JSON (``{"epics": [...]}``).
+    """
+    client = _get_openai_client()
+    resp = router.complete(
+        client,
+        "decompose",
+        _decomp_messages(description, stack_yaml),
+        response_format={"type": "json_object"},
+    )
+    raw = resp.choices[0].message.content.strip()
+    print("⮕ LLM-Raw-JSON:\n", raw)
+    data = json.loads(raw)
+    if index:
+        index_decomposition(data, description)
+    return data
+
+
+def decomposed_epics(data) -> list:
+    """Returns the epic dicts of a decomposition (object or bare list)."""
+    return data.get("epics", []) if isinstance(data, dict) else data
+
+
+def index_decomposition(data, description: str) -> None:
+    """Adds the epics and stories of a decomposition to the search index."""
+    index_epics(decomposed_epics(data), description)
+
+
+def stream_decomposition(description: str, stack_yaml: str):
+    """
+    Streams the decomposition and yields every epic as soon as it is complete.
+
+    Args:
+        description (str): The product description.
+        stack_yaml (str): The confirmed tech stack.
+
+    Yields:
+        dict: One epic in the layout of ``decompose_project``'s "epics" list.
+    """
+    client = _get_openai_client()
+    items = ItemStream()
+    for delta in router.stream(
+        client,
+        "decompose",
+        _decomp_messages(description, stack_yaml),
+        response_format={"type": "json_object"},
+    ):
+        for epic in items.feed(delta):
+            index_epics([epic], description)
+            yield epic
+
+
+REGEN_PROMPT = """
+You are a senior agile product owner.
+An existing plan (epics with story summaries) is given as context. Rework
+ONLY the part named in TARGET, taking the user's HINT into account if there
+is one. Keep it consistent with the rest of the plan and don't duplicate
+stories of other epics.
+
+Output ONLY valid JSON, no markdown, no commentary:
+- for an epic:  {"epic": "string", "stories": [STORY, ...]}
+- for a story:  STORY
+
+STORY = {"summary": "string", "points": 5, "tasks": ["string", ...],
+         "acceptance_criteria": ["string", ...]}
+"""
+
+
+def regenerate_part(
+    description: str,
+    stack_yaml: str,
+    outline: str,
+    epic: str,
+    story: str | None = None,
+    hint: str = "",
+) -> dict:
+    """
+    Re-decomposes one epic or one story of an existing plan.
+
+    Args:
+        description (str): The project description.
+        stack_yaml (str): The confirmed tech stack.
+        outline (str): The rest of the plan as compact context (``Plan.outline``).
+        epic (str): The name of the epic to rework, or of the story's epic.
+        story (str, optional): The summary of the story to rework. Without
+            it the whole epic is reworked.
+        hint (str, optional): What the user wants changed.
+
+    Returns:
+        dict: The new epic or story as JSON object.
+
+    Raises:
+        ValueError: If the answer is not a complete epic (with stories) or
+            story, depending on ``story``.
+    """
+
+    target = f"EPIC: {epic}" if story is None else f"STORY: {story} (EPIC: {epic})"
     client = _get_openai_client()
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": DECOMP_PROMPT},
+    resp = router.complete(
+        client,
+        "regenerate",
+        [
+            {"role": "system", "content": REGEN_PROMPT},
             {
                 "role": "user",
-                "content": f"DESC:\n{description}\n\nSTACK:\n{stack_yaml}",
+                "content": f"DESC:\n{description}\n\nSTACK:\n{stack_yaml}\n\n"
+                f"PLAN:\n{outline}\n\nTARGET: {target}\n\nHINT: {hint or '-'}",
             },
         ],
         response_format={"type": "json_object"},
-        temperature=0.2,
-        timeout=60,
     )
     raw = resp.choices[0].message.content.strip()
-    print("⮕ LLM-Raw-JSON:\n", raw)
-    return json.loads(raw)
+    print("⮕ Regen-LLM-Raw-JSON:\n", raw)
+    data = json.loads(raw)
+    if story is None:
+        index_epics([check_epic(data)], description)
+    else:
+        index_story(check_story(data), epic, description)
+    return data
 
 
 TICKET_PROMPT = """
@@ -169,15 +289,14 @@ Output ONLY valid JSON matching this schema, no markdown, no commentary.
 def generate_ticket_content(prompt: str) -> list[dict]:
     client = _get_openai_client()
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        resp = router.complete(
+            client,
+            "ticket",
+            [
                 {"role": "system", "content": TICKET_PROMPT},
                 {"role": "user", "content": prompt},
             ],
             response_format={"type": "json_object"},
-            temperature=0.3,
-            timeout=30,
         )
         raw = resp.choices[0].message.content.strip()
         print("⮕ Ticket-LLM-Raw-JSON:\n", raw)
@@ -187,14 +306,75 @@ def generate_ticket_content(prompt: str) -> list[dict]:
         if isinstance(parsed, dict):
             # wenn der LLM unter "tickets" ausgeliefert hat
             if "tickets" in parsed and isinstance(parsed["tickets"], list):
-                return parsed["tickets"]
-            # einzelnes Ticket
-            return [parsed]
+                tickets = parsed["tickets"]
+            else:
+                # einzelnes Ticket
+                tickets = [parsed]
         elif isinstance(parsed, list):
-            return parsed
-
-        raise RuntimeError(f"Unerwartetes Format von LLM: {type(parsed)}")
+            tickets = parsed
+        else:
+            raise RuntimeError(f"Unerwartetes Format von LLM: {type(parsed)}")
+        index_tickets(prompt, tickets)
+        return tickets
 
     except Exception as e:
         err = traceback.format_exc()
         raise RuntimeError(f"generate_ticket_content fehlgeschlagen: {e}\n{err}")
+
+
+EXTRACT_PROMPT = """
+You are a senior requirements engineer.
+You get ONE part of a longer product specification.
+
+Extract the requirements of this part as a compact bullet list: goals,
+features, non-functional requirements, constraints, exclusions and open
+questions. Keep names, numbers and integrations exactly; drop prose,
+examples and repetitions. If the part contains no requirements, return
+an empty answer.
+
+Answer in the language of the text. Output ONLY the bullet list.
+"""
+
+
+def extract_requirements(chunk: str) -> str:
+    """Returns the requirements of one document chunk as a bullet list."""
+    client = _get_openai_client()
+    resp = router.complete(
+        client,
+        "extract",
+        [
+            {"role": "system", "content": EXTRACT_PROMPT},
+            {"role": "user", "content": chunk},
+        ],
+    )
+    return resp.choices[0].message.content.strip()
+
+
+CONDENSE_PROMPT = """
+You are a senior product owner.
+You get requirement lists that were extracted from consecutive parts of one
+product specification.
+
+Merge them into ONE concise project brief: remove duplicates, keep every
+distinct requirement, names and numbers. Use these sections (German headings
+if the text is German):
+Ziel / Goal, Hauptfunktionen / Main features, Nicht-Funktionen / Out of scope,
+Nicht-funktionale Anforderungen / Non-functional requirements,
+Offene Punkte / Open questions.
+
+Output ONLY the brief as plain text, no code fences.
+"""
+
+
+def condense_requirements(parts: str) -> str:
+    """Merges extracted requirement lists into one project brief."""
+    client = _get_openai_client()
+    resp = router.complete(
+        client,
+        "condense",
+        [
+            {"role": "system", "content": CONDENSE_PROMPT},
+            {"role": "user", "content": parts},
+        ],
+    )
+    return resp.choices[0].message.content.strip()
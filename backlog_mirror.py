@@ -0,0 +1,345 @@
+"""Local SQLite mirror of the issues of Jira projects.
+
+The first sync of a project pages through all of its issues with a JQL
+search, fetching only the fields we need. Later syncs only ask for issues
+with ``updated >= last sync`` (as a relative ``-Nm`` so server time zones
+don't matter). Deleted issues are removed by the webhook listener or by a
+full sync, which runs when the last one is older than ``FULL_SYNC_AGE``.
+Reads (by project, epic or sprint) are then local queries.
+
+Every row also stores the MinHash signature of its text. The duplicate index
+of a project (``duplicate_index``) is built from the stored signatures once
+and then kept up to date by syncs, deletes and ``remember_issue``, so pushes
+and reconciles don't hash the whole backlog again.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from dedup import DuplicateIndex, issue_text
+from jira_client import get_global_fields
+
+DEFAULT_PATH = os.path.join(
+    os.path.expanduser("~"), ".prinzcode_agent", "backlog.db"
+)
+PAGE_SIZE = 100
+# seconds after which the next sync reads everything and drops deleted issues
+FULL_SYNC_AGE = 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    key TEXT PRIMARY KEY,
+    project TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    issuetype TEXT,
+    status TEXT,
+    epic TEXT,
+    sprint_id INTEGER,
+    sprint TEXT,
+    updated TEXT,
+    parent TEXT,
+    points REAL,
+    signature BLOB
+);
+CREATE INDEX IF NOT EXISTS issues_project ON issues(project);
+CREATE INDEX IF NOT EXISTS issues_epic ON issues(epic);
+CREATE INDEX IF NOT EXISTS issues_sprint ON issues(sprint_id);
+CREATE INDEX IF NOT EXISTS issues_parent ON issues(parent);
+CREATE TABLE IF NOT EXISTS sync_state (
+    project TEXT PRIMARY KEY,
+    last_sync REAL NOT NULL,
+    last_full REAL NOT NULL
+);
+"""
+
+_COLUMNS = (
+    "key",
+    "project",
+    "summary",
+    "description",
+    "issuetype",
+    "status",
+    "epic",
+    "sprint_id",
+    "sprint",
+    "updated",
+    "parent",
+    "points",
+)
+
+# written by sync, the signature is only read for the duplicate index
+_WRITE_COLUMNS = _COLUMNS + ("signature",)
+
+
+def _name(value) -> str | None:
+    if value is None:
+        return None
+    return value.get("name") if isinstance(value, dict) else str(value)
+
+
+def last_sprint(value) -> tuple[int | None, str | None]:
+    """Reads the most recent sprint of the sprint field (Cloud or Server format)."""
+    if not value:
+        return None, None
+    sprint = value[-1] if isinstance(value, list) else value
+    if isinstance(sprint, dict):
+        return sprint.get("id"), sprint.get("name")
+    # Server: "com.atlassian.greenhopper.service.sprint.Sprint@..[id=1,name=S1,...]"
+    parts = str(sprint).split("[", 1)[-1].rstrip("]").split(",")
+    attrs = dict(p.split("=", 1) for p in parts if "=" in p)
+    sprint_id = attrs.get("id", "")
+    return (int(sprint_id) if sprint_id.isdigit() else None), attrs.get("name")
+
+
+def _row(raw: dict, project_key: str, roles: dict[str, str]) -> tuple:
+    fields = raw.get("fields") or {}
+    epic = None
+    parent = fields.get("parent") or {}
+    parent_type = ((parent.get("fields") or {}).get("issuetype") or {}).get("name")
+    if parent and parent_type == "Epic":
+        epic = parent.get("key")
+    elif roles.get("epic_link"):
+        epic = fields.get(roles["epic_link"])
+    sprint_id, sprint = last_sprint(fields.get(roles.get("sprint", "")))
+    return (
+        raw["key"],
+        project_key,
+        fields.get("summary") or "",
+        fields.get("description") or "",
+        _name(fields.get("issuetype")),
+        _name(fields.get("status")),
+        epic,
+        sprint_id,
+        sprint,
+        fields.get("updated"),
+        parent.get("key"),
+        fields.get(roles.get("story_points", "")),
+    )
+
+
+class BacklogMirror:
+    """SQLite mirror of Jira issues with incremental sync.
+
+    Args:
+        path (str, optional): Database file. Defaults to
+            ``~/.prinzcode_agent/backlog.db``; ``":memory:"`` works too.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        # one sync at a time, a full sync must not prune what another one adds
+        self._sync_lock = threading.Lock()
+        # live duplicate indexes by project, see duplicate_index()
+        self._indexes: dict[str, DuplicateIndex] = {}
+        self._signer = DuplicateIndex()
+
+    # ---------- sync ----------
+    def last_sync(self, project_key: str) -> tuple[float, float] | None:
+        """Returns the times of the last sync and the last full sync, if any."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT last_sync, last_full FROM sync_state WHERE project = ?",
+                (project_key,),
+            ).fetchone()
+
+    def sync(self, jira, project_key: str, full: bool = False) -> int:
+        """
+        Pulls new and changed issues of a project into the mirror.
+
+        Args:
+            jira: An instance of the JIRA client (use the pooled ``get_jira()``).
+            project_key (str): The key of the project.
+            full (bool, optional): Re-read everything and drop issues that no
+                longer exist. Defaults to False; the first sync and syncs
+                ``FULL_SYNC_AGE`` after the last full one are full anyway.
+
+        Returns:
+            int: Number of issues written.
+        """
+
+        with self._sync_lock:
+            return self._sync(jira, project_key, full)
+
+    def _sync(self, jira, project_key: str, full: bool) -> int:
+        roles = get_global_fields(jira)
+        fields = ["summary", "description", "issuetype", "status", "parent", "updated"]
+        optional = ("epic_link", "sprint", "story_points")
+        fields += [roles[r] for r in optional if r in roles]
+
+        started = time.time()
+        state = self.last_sync(project_key)
+        full = full or state is None or started - state[1] > FULL_SYNC_AGE
+        jql = f'project = "{project_key}"'
+        if full:
+            # key order doesn't shift while issues are edited during the read
+            jql += " ORDER BY key ASC"
+        else:
+            # one minute overlap so nothing slips through between two syncs
+            minutes = int((started - state[0]) // 60) + 1
+            jql += f" AND updated >= -{minutes}m ORDER BY updated ASC"
+
+        seen: set[str] = set()
+        start = 0
+        while True:
+            page = jira.search_issues(
+                jql,
+                startAt=start,
+                maxResults=PAGE_SIZE,
+                fields=",".join(fields),
+                json_result=True,
+            )
+            issues = page.get("issues", [])
+            rows = self._with_signatures(
+                [_row(raw, project_key, roles) for raw in issues]
+            )
+            with self._lock, self._db:
+                self._db.executemany(
+                    f"INSERT OR REPLACE INTO issues ({', '.join(_WRITE_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(_WRITE_COLUMNS))})",
+                    rows,
+                )
+                index = self._indexes.get(project_key)
+                for row in rows if index is not None else ():
+                    index.add(row[0], issue_text(row[2], row[3]), row[-1])
+            if full:
+                seen.update(r[0] for r in rows)
+            start += len(issues)
+            if not issues or start >= page.get("total", 0):
+                break
+
+        with self._lock, self._db:
+            if full:
+                known = self._db.execute(
+                    "SELECT key FROM issues WHERE project = ?", (project_key,)
+                ).fetchall()
+                gone = [(k,) for (k,) in known if k not in seen]
+                self._db.executemany("DELETE FROM issues WHERE key = ?", gone)
+                index = self._indexes.get(project_key)
+                for (key,) in gone if index is not None else ():
+                    index.remove(key)
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state (project, last_sync, last_full) "
+                "VALUES (?, ?, ?)",
+                (project_key, started, started if full else state[1]),
+            )
+        return start
+
+    def _with_signatures(self, rows: list[tuple]) -> list[tuple]:
+        # reuse the stored signature of every issue whose text didn't change
+        keys = [row[0] for row in rows]
+        with self._lock:
+            stored = {
+                key: (summary, description, sig)
+                for key, summary, description, sig in self._db.execute(
+                    "SELECT key, summary, description, signature FROM issues "
+                    f"WHERE key IN ({', '.join('?' * len(keys))})",
+                    keys,
+                )
+            }
+        result = []
+        for row in rows:
+            summary, description, sig = stored.get(row[0], (None, None, None))
+            if sig is None or (summary, description) != (row[2], row[3]):
+                sig = self._signer.signature(issue_text(row[2], row[3]))
+            result.append(row + (sig,))
+        return result
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM issues WHERE key = ?", (key,))
+            for index in self._indexes.values():
+                index.remove(key)
+
+    # ---------- duplicate index ----------
+    def duplicate_index(self, project_key: str) -> DuplicateIndex:
+        """
+        Returns the live duplicate index over the mirrored issues of a project.
+
+        The first call reads the stored signatures (and computes the missing
+        ones), afterwards syncs, deletes and ``remember`` update the same
+        index one issue at a time.
+        """
+
+        with self._lock:
+            index = self._indexes.get(project_key)
+            if index is not None:
+                return index
+            index = DuplicateIndex()
+            missing = []
+            for key, summary, description, sig in self._db.execute(
+                "SELECT key, summary, description, signature FROM issues "
+                "WHERE project = ?",
+                (project_key,),
+            ).fetchall():
+                added = index.add(key, issue_text(summary, description), sig)
+                if sig is None and added is not None:
+                    missing.append((added, key))
+            if missing:
+                with self._db:
+                    self._db.executemany(
+                        "UPDATE issues SET signature = ? WHERE key = ?", missing
+                    )
+            self._indexes[project_key] = index
+            return index
+
+    def remember(self, project_key: str, key: str, text: str) -> None:
+        """Adds a just created or changed issue to the live duplicate index."""
+        with self._lock:
+            index = self._indexes.get(project_key)
+        if index is not None:
+            index.add(key, text)
+
+    # ---------- queries ----------
+    def _query(self, where: str, args: tuple) -> list[dict]:
+        with self._lock:
+            cur = self._db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM issues WHERE {where} ORDER BY key",
+                args,
+            )
+            return [dict(zip(_COLUMNS, row)) for row in cur]
+
+    def issues(
+        self, project_key: str, epic: str | None = None, sprint_id: int | None = None
+    ) -> list[dict]:
+        """Returns the mirrored issues of a project, optionally of one epic/sprint."""
+        where, args = "project = ?", [project_key]
+        if epic is not None:
+            where += " AND epic = ?"
+            args.append(epic)
+        if sprint_id is not None:
+            where += " AND sprint_id = ?"
+            args.append(sprint_id)
+        return self._query(where, tuple(args))
+
+
+_mirror: BacklogMirror | None = None
+
+
+def get_mirror() -> BacklogMirror:
+    """Returns the shared mirror, opened on first use."""
+    global _mirror
+    if _mirror is None:
+        _mirror = BacklogMirror()
+    return _mirror
+
+
+def remember_issue(project_key: str, key: str, text: str) -> None:
+    """Adds a created or changed issue to its duplicate index, if the mirror is open.
+
+    The row itself reaches the mirror with the next incremental sync.
+    """
+    if _mirror is not None:
+        _mirror.remember(project_key, key, text)
+
+
+def forget_issue(key: str) -> None:
+    """Drops a deleted issue from the mirror, if the mirror is open."""
+    if _mirror is not None:
+        _mirror.delete(key)
@@ -0,0 +1,87 @@
+"""Small thread-safe TTL cache for Jira lookups.
+
+Entries are keyed by tuples such as ``("projects",)``, ``("boards", key)``,
+``("sprints", board_id)`` or ``("issues", key)``. They expire after ``ttl``
+seconds, and the webhook listener (see ``webhook.py``) keeps them fresh in
+between by updating or invalidating single entries when Jira sends events.
+
+Cached values are snapshots: ``get`` hands out the stored object without a
+copy, so nobody may change it in place. ``update`` patches a copy and swaps
+it in under the lock, readers iterating the old object are not disturbed.
+That copy is only cheap for small values (projects, boards, sprints). The
+large per-project issue data is not patched here: ``("issues", key)`` holds
+the duplicate index of the backlog mirror, which is updated in place under
+its own lock.
+"""
+
+import copy
+import threading
+import time
+
+DEFAULT_TTL = 300
+
+
+class TTLCache:
+    def __init__(self, ttl: float = DEFAULT_TTL) -> None:
+        self.ttl = ttl
+        self._data: dict[tuple, tuple[float, object]] = {}
+        self._lock = threading.RLock()
+
+    def get(self, key: tuple):
+        """Returns the cached value or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stamp, value = entry
+            if time.monotonic() - stamp > self.ttl:
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: tuple, value) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+
+    def get_or_load(self, key: tuple, loader):
+        """Returns the cached value, calling ``loader()`` on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def update(self, key: tuple, fn) -> bool:
+        """Applies ``fn`` to a copy of a cached value and stores the copy.
+
+        ``fn`` changes the (shallow) copy in place; the entry keeps its
+        timestamp. Returns False if nothing is cached under ``key``.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False
+            stamp, value = entry
+            value = copy.copy(value)
+            fn(value)
+            self._data[key] = (stamp, value)
+            return True
+
+    def invalidate(self, key: tuple) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_prefix(self, *prefix) -> None:
+        """Drops every entry whose key starts with ``prefix``."""
+        n = len(prefix)
+        with self._lock:
+            for key in [k for k in self._data if k[:n] == prefix]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+# shared by jira_client, the UI tabs and the webhook listener
+jira_cache = TTLCache()
@@ -0,0 +1,201 @@
+"""Offline near-duplicate detection for stories (MinHash + LSH).
+
+The index holds the summaries/descriptions of the issues that already exist
+in a Jira project. Every generated story is checked against it before it is
+pushed, so work that is already in the backlog is not created a second time.
+
+Texts are compared by their word 3-grams. Each of the ``num_perm`` MinHash
+values uses its own hash function: SHAKE-128 stretches every shingle into
+``num_perm`` independent 64-bit words. Bands of 4 rows keep the candidate
+lists short. Candidates are then scored with the exact Jaccard similarity of
+their shingle sets, so only real near-duplicates pass the threshold.
+
+Signatures are the same in every process, so the backlog mirror stores them
+next to the issues (see ``backlog_mirror.BacklogMirror.duplicate_index``):
+the index of a large project is read back instead of hashed again, and syncs
+and pushes update it one issue at a time.
+"""
+
+import hashlib
+import re
+import struct
+import threading
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+DEFAULT_THRESHOLD = 0.6
+
+
+def story_text(story: dict) -> str:
+    """Returns the text of a story dict that is used for duplicate checks."""
+    parts = [story.get("summary", "")]
+    parts.extend(story.get("acceptance_criteria", []) or [])
+    return "\n".join(p for p in parts if p)
+
+
+def issue_text(summary: str, description: str | None) -> str:
+    """Returns the text of an existing issue that is used for duplicate checks."""
+    return f"{summary}\n{description or ''}"
+
+
+def _shingles(text: str) -> set[str]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < 3:
+        # too short for 3-grams, the whole text is the only shingle
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + 3]) for i in range(len(words) - 2)}
+
+
+def _check_threshold(threshold: float) -> float:
+    if not 0 < threshold <= 1:
+        raise ValueError("threshold muss zwischen 0 und 1 liegen.")
+    return threshold
+
+
+class DuplicateIndex:
+    """In-memory MinHash/LSH index over issue texts.
+
+    The index is thread-safe: a push may query it while a sync updates it.
+
+    Args:
+        num_perm (int): Number of MinHash values per signature.
+        bands (int): Number of LSH bands, ``num_perm`` must be divisible by it.
+            With the defaults (64 / 16, i.e. 4 rows per band) pairs from a
+            Jaccard similarity of about 0.5 on become candidates.
+        threshold (float): Default Jaccard similarity from which a text
+            counts as duplicate, between 0 and 1.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        threshold: float = DEFAULT_THRESHOLD,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm muss durch bands teilbar sein.")
+        _check_threshold(threshold)
+        self._words = struct.Struct(f"<{num_perm}Q")
+        self._band_size = self._words.size // bands
+        self._bands = bands
+        self.threshold = threshold
+        self._buckets: list[dict[bytes, list[str]]] = [{} for _ in range(bands)]
+        self._signatures: dict[str, bytes] = {}
+        self._texts: dict[str, str] = {}
+        # shingle sets for the exact score, computed when a key is a candidate
+        self._shingles: dict[str, frozenset[int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._signatures
+
+    def signature(self, text: str) -> bytes | None:
+        """Returns the MinHash signature of ``text``, None if it has no words."""
+        shingles = _shingles(text)
+        if not shingles:
+            return None
+        size, unpack = self._words.size, self._words.unpack
+        rows = [
+            unpack(hashlib.shake_128(s.encode()).digest(size)) for s in shingles
+        ]
+        return self._words.pack(*map(min, zip(*rows)))
+
+    def _band_keys(self, sig: bytes):
+        n = self._band_size
+        for b in range(self._bands):
+            yield b, sig[b * n : (b + 1) * n]
+
+    def add(
+        self, key: str, text: str, signature: bytes | None = None
+    ) -> bytes | None:
+        """Adds (or replaces) the text of the issue ``key``.
+
+        Args:
+            key (str): The issue key.
+            text (str): Its text, see ``issue_text``.
+            signature (bytes, optional): The stored signature of ``text``, so
+                it isn't computed again.
+
+        Returns:
+            bytes | None: The signature of ``text`` (None if it has no words
+            and was not added).
+        """
+        if signature is None or len(signature) != self._words.size:
+            signature = self.signature(text)
+        with self._lock:
+            self._remove(key)
+            if signature is None:
+                return None
+            self._signatures[key] = signature
+            self._texts[key] = text
+            for b, band in self._band_keys(signature):
+                self._buckets[b].setdefault(band, []).append(key)
+        return signature
+
+    def remove(self, key: str) -> None:
+        """Removes the issue ``key`` from the index, if present."""
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        sig = self._signatures.pop(key, None)
+        if sig is None:
+            return
+        del self._texts[key]
+        self._shingles.pop(key, None)
+        for b, band in self._band_keys(sig):
+            bucket = self._buckets[b].get(band)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[b][band]
+
+    def _shingle_set(self, key: str) -> frozenset[int]:
+        hashes = self._shingles.get(key)
+        if hashes is None:
+            hashes = frozenset(map(hash, _shingles(self._texts[key])))
+            self._shingles[key] = hashes
+        return hashes
+
+    def query(
+        self, text: str, threshold: float | None = None
+    ) -> list[tuple[str, float]]:
+        """Returns ``(key, similarity)`` pairs above the threshold, best first.
+
+        The similarity is the exact Jaccard similarity of the shingle sets;
+        MinHash only selects the candidates.
+        """
+        limit = self.threshold if threshold is None else _check_threshold(threshold)
+        sig = self.signature(text)
+        if sig is None:
+            return []
+        hashes = frozenset(map(hash, _shingles(text)))
+
+        hits = []
+        with self._lock:
+            candidates = set()
+            for b, band in self._band_keys(sig):
+                candidates.update(self._buckets[b].get(band, ()))
+            for key in candidates:
+                other = self._shingle_set(key)
+                score = len(hashes & other) / len(hashes | other)
+                if score >= limit:
+                    hits.append((key, score))
+        hits.sort(key=lambda kv: kv[1], reverse=True)
+        return hits
+
+    def best_match(self, text: str) -> tuple[str, float] | None:
+        """Returns the most similar existing issue or None."""
+        hits = self.query(text)
+        return hits[0] if hits else None
+
+    @classmethod
+    def from_issues(cls, issues, **kwargs) -> "DuplicateIndex":
+        """Builds an index from ``(key, summary, description)`` tuples."""
+        index = cls(**kwargs)
+        for key, summary, description in issues:
+            index.add(key, issue_text(summary, description))
+        return index
@@ -0,0 +1,174 @@
+"""Chunked ingestion of large specification documents.
+
+A Markdown or plain-text document is read line by line and cut into chunks
+of about ``CHUNK_TOKENS`` tokens at paragraph/heading boundaries. The
+requirements of every chunk are extracted by the LLM concurrently (with a
+bounded number of chunks in flight) and merged into one condensed brief,
+which then goes into ``suggest_stack``/``decompose_project`` like a typed-in
+description. Memory stays bounded: only the in-flight chunks and the already
+condensed requirements are kept.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+
+CHUNK_TOKENS = 2000
+BRIEF_TOKENS = 3000
+MAX_WORKERS = 4
+
+try:
+    import tiktoken
+
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+
+    def count_tokens(text: str) -> int:
+        return len(_ENCODING.encode(text))
+
+except ImportError:
+
+    def count_tokens(text: str) -> int:
+        # rough estimate for the OpenAI tokenizers: ~4 characters per token
+        return len(text) // 4 + 1
+
+
+def iter_paragraphs(lines, max_tokens: int = CHUNK_TOKENS):
+    """Groups lines into paragraphs; blank lines and headings start a new one.
+
+    A paragraph is also cut once it reaches ``max_tokens``, so text without
+    blank lines or headings (logs, single-block exports) stays bounded.
+    """
+    para: list[str] = []
+    size = 0
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.strip() or line.lstrip().startswith("#"):
+            if para:
+                yield "\n".join(para)
+                para, size = [], 0
+            if line.strip():
+                para.append(line)
+                size = count_tokens(line)
+            continue
+        n = count_tokens(line)
+        if para and size + n > max_tokens:
+            yield "\n".join(para)
+            para, size = [], 0
+        para.append(line)
+        size += n
+    if para:
+        yield "\n".join(para)
+
+
+def _fit(text: str, max_tokens: int) -> int:
+    """Returns how many leading characters of ``text`` fit into ``max_tokens``."""
+    cut = min(len(text), max_tokens * 4)
+    while cut > 1:
+        n = count_tokens(text[:cut])
+        if n <= max_tokens:
+            break
+        cut = max(1, cut * max_tokens // n)
+    return cut
+
+
+def _split_oversized(paragraph: str, max_tokens: int):
+    """Cuts a paragraph that is bigger than a chunk at line/char boundaries."""
+    for line in paragraph.splitlines():
+        while count_tokens(line) > max_tokens:
+            cut = _fit(line, max_tokens)
+            yield line[:cut]
+            line = line[cut:]
+        if line:
+            yield line
+
+
+def iter_chunks(lines, max_tokens: int = CHUNK_TOKENS):
+    """Yields text chunks of at most ~``max_tokens`` tokens."""
+    chunk: list[str] = []
+    size = 0
+    for para in iter_paragraphs(lines, max_tokens):
+        tokens = count_tokens(para)
+        pieces = [para] if tokens <= max_tokens else _split_oversized(para, max_tokens)
+        for piece in pieces:
+            n = tokens if piece is para else count_tokens(piece)
+            if chunk and size + n > max_tokens:
+                yield "\n\n".join(chunk)
+                chunk, size = [], 0
+            chunk.append(piece)
+            size += n
+    if chunk:
+        yield "\n\n".join(chunk)
+
+
+def ingest_document(
+    path: str,
+    extract=None,
+    condense=None,
+    max_workers: int = MAX_WORKERS,
+    chunk_tokens: int = CHUNK_TOKENS,
+    brief_tokens: int = BRIEF_TOKENS,
+    on_progress=None,
+) -> str:
+    """
+    Turns a (large) specification document into a condensed project brief.
+
+    Args:
+        path (str): Path of a Markdown or plain-text file.
+        extract (callable, optional): ``chunk -> requirements``.
+            Defaults to ``ai.extract_requirements``.
+        condense (callable, optional): ``requirements -> brief``.
+            Defaults to ``ai.condense_requirements``.
+        max_workers (int, optional): Concurrent LLM calls. Defaults to 4.
+        chunk_tokens (int, optional): Tokens per chunk. Defaults to 2000.
+        brief_tokens (int, optional): Target size of the brief. Defaults to 3000.
+        on_progress (callable, optional): Called with the number of chunks
+            that are done so far.
+
+    Returns:
+        str: The brief. Documents that fit into one chunk are returned as is.
+    """
+
+    if extract is None or condense is None:
+        from ai import condense_requirements, extract_requirements
+
+        extract = extract or extract_requirements
+        condense = condense or condense_requirements
+
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        chunks = iter_chunks(fh, chunk_tokens)
+        first = next(chunks, "")
+        second = next(chunks, None)
+        if second is None:
+            return first.strip()
+
+        parts: list[str] = []
+        size = 0
+        done = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = deque()
+
+            def collect_oldest():
+                nonlocal size, done, parts
+                text = pending.popleft().result().strip()
+                done += 1
+                if on_progress:
+                    on_progress(done)
+                if not text:
+                    return
+                parts.append(text)
+                size += count_tokens(text)
+                if size > 2 * brief_tokens:
+                    # fold what we have so far, keeps memory and prompt bounded
+                    folded = condense("\n\n".join(parts))
+                    parts, size = [folded], count_tokens(folded)
+
+            for chunk in chain((first, second), chunks):
+                # results are collected in document order, at most
+                # 2 × max_workers chunks are read ahead
+                if len(pending) >= 2 * max_workers:
+                    collect_oldest()
+                pending.append(pool.submit(extract, chunk))
+            while pending:
+                collect_oldest()
+
+    return condense("\n\n".join(parts)) if parts else ""
@@ -1,26 +1,218 @@
+import threading
+import time
 from jira import JIRA
 from PySide6.QtCore import QSettings
 from datetime import datetime, timedelta, timezone
 from jira.exceptions import JIRAError
 
+from cache import jira_cache
+from dedup import DuplicateIndex, issue_text
+
+
+# schema types used to recognise the agile fields, their ids differ per site
+_EPIC_NAME_SCHEMA = "com.pyxis.greenhopper.jira:gh-epic-label"
+_EPIC_LINK_SCHEMA = "com.pyxis.greenhopper.jira:gh-epic-link"
+_STORY_POINT_SCHEMA = "com.pyxis.greenhopper.jira:jsw-story-points"
+_STORY_POINT_NAMES = ("story points", "story point estimate")
+_SPRINT_SCHEMA = "com.pyxis.greenhopper.jira:gh-sprint"
+
+# (server, project_key) -> {"types": {name: id}, "subtask": name, "fields": {type: roles}}
+# ("all" holds the global roles when no createmeta is available,
+# (server, "*") the roles of the site-wide field list)
+_meta_cache: dict[tuple[str, str], dict] = {}
+
+
+def _field_role(field: dict) -> str | None:
+    """Maps a createmeta/fields entry to the role we use it for."""
+    field_id = field.get("fieldId") or field.get("key") or field.get("id")
+    custom = (field.get("schema") or {}).get("custom", "")
+    name = (field.get("name") or "").lower()
+    if field_id == "parent":
+        return "parent"
+    if custom == _EPIC_NAME_SCHEMA:
+        return "epic_name"
+    if custom == _EPIC_LINK_SCHEMA:
+        return "epic_link"
+    if custom == _STORY_POINT_SCHEMA or name in _STORY_POINT_NAMES:
+        return "story_points"
+    if custom == _SPRINT_SCHEMA:
+        return "sprint"
+    return None
+
+
+def _roles(fields) -> dict[str, str]:
+    roles = {}
+    for f in fields:
+        role = _field_role(f)
+        if role and role not in roles:
+            roles[role] = f.get("fieldId") or f.get("key") or f.get("id")
+    return roles
+
+
+def _createmeta_values(jira, path: str) -> list[dict]:
+    """
+    Collects all pages of ``issue/createmeta/{project}/issuetypes[/{id}]``.
+
+    Cloud and Server/Data Center 8.4+ serve these paged endpoints (the
+    ``createmeta_*`` helpers of the jira package refuse to run on Cloud).
+    """
+    values, start = [], 0
+    while True:
+        page = jira._get_json(path, params={"startAt": start, "maxResults": 50})
+        items = page.get("issueTypes") or page.get("fields") or page.get("values") or []
+        values.extend(items)
+        start += len(items)
+        if not items or start >= page.get("total", start):
+            return values
+
+
+def _legacy_meta(jira, project_key: str) -> dict:
+    # servers before 8.4 only have the expanded createmeta, with all issue
+    # types and their fields in one response
+    try:
+        data = jira._get_json(
+            "issue/createmeta",
+            params={"projectKeys": project_key, "expand": "projects.issuetypes.fields"},
+        )
+        types = data["projects"][0]["issuetypes"]
+    except (JIRAError, LookupError):
+        # no createmeta at all: the global field list has the right ids, even
+        # if we can't see the screens; rejected fields are dropped on create
+        roles = get_global_fields(jira)
+        return {"types": {}, "subtask": "Sub-task", "fields": {}, "all": roles}
+    return {
+        "types": {t["name"]: t["id"] for t in types},
+        "subtask": next((t["name"] for t in types if t.get("subtask")), "Sub-task"),
+        "fields": {
+            t["name"]: _roles(
+                {**f, "fieldId": field_id} for field_id, f in t["fields"].items()
+            )
+            for t in types
+        },
+    }
+
+
+def _project_meta(jira, project_key: str) -> dict:
+    cache_key = (getattr(jira, "server_url", ""), project_key)
+    meta = _meta_cache.get(cache_key)
+    if meta is None:
+        try:
+            types = _createmeta_values(
+                jira, f"issue/createmeta/{project_key}/issuetypes"
+            )
+        except JIRAError:
+            meta = _legacy_meta(jira, project_key)
+        else:
+            subtask = next((t["name"] for t in types if t.get("subtask")), "Sub-task")
+            meta = {
+                "types": {t["name"]: t["id"] for t in types},
+                "subtask": subtask,
+                "fields": {},
+            }
+        _meta_cache[cache_key] = meta
+    return meta
 
-def is_team_managed(jira: JIRA, project_key: str) -> bool:
-    """Is the given project a team-managed project?
+
+def get_global_fields(jira) -> dict[str, str]:
+    """Returns role → field id from the site-wide field list (cached per server)."""
+    cache_key = (getattr(jira, "server_url", ""), "*")
+    roles = _meta_cache.get(cache_key)
+    if roles is None:
+        roles = _roles(jira.fields())
+        _meta_cache[cache_key] = roles
+    return roles
+
+
+def get_create_fields(jira, project_key: str, issue_type: str) -> dict[str, str]:
+    """
+    Discovers the agile fields available on the create screen of an issue type.
+
+    The result is looked up once per project and issue type via createmeta and
+    cached, so creates can be built correctly on the first attempt. A field
+    Jira still rejects is dropped from the cached roles (see ``_create_issue``).
 
     Args:
-        jira (JIRA): the JIRA instance to use
-        project_key (str): the key of the project to check
+        jira: An instance of the JIRA client.
+        project_key (str): The key of the project.
+        issue_type (str): The issue type name, e.g. "Epic" or "Story".
 
     Returns:
-        bool: True if the project is team-managed, False otherwise
+        dict[str, str]: Maps the roles ``epic_name``, ``epic_link``, ``parent``
+        and ``story_points`` to their field ids. Roles that are not on the
+        create screen are missing.
     """
 
-    proj = jira.project(project_key)
-    return getattr(proj, "isSimplified", False) or getattr(proj, "simplified", False)
+    meta = _project_meta(jira, project_key)
+    roles = meta["fields"].get(issue_type)
+    if roles is None:
+        if "all" in meta:
+            # a copy per type, a field rejected for stories may work for epics
+            roles = dict(meta["all"])
+        else:
+            type_id = meta["types"].get(issue_type)
+            roles = {}
+            if type_id is not None:
+                roles = _roles(
+                    _createmeta_values(
+                        jira, f"issue/createmeta/{project_key}/issuetypes/{type_id}"
+                    )
+                )
+        meta["fields"][issue_type] = roles
+    return roles
+
+
+def _forget_rejected(jira, fields: dict, error) -> None:
+    """Drops the discovered fields a create error names from the field cache."""
+    try:
+        named = set(error.response.json().get("errors") or {})
+    except (AttributeError, ValueError):
+        named = set()  # bulk creates only report the message
+    message = str(error)
+    roles = get_create_fields(
+        jira, fields["project"]["key"], fields["issuetype"]["name"]
+    )
+    for role, field_id in list(roles.items()):
+        if field_id in fields and (field_id in named or f"'{field_id}'" in message):
+            print(f"⮕ Feld {field_id} ({role}) abgelehnt, lege ohne es an")
+            del roles[role]
 
 
-EPIC_NAME_ID = "customfield_10011"
-EPIC_LINK_ID = "customfield_10014"
+def _create_issue(jira, build):
+    """
+    Creates the issue ``build()`` describes.
+
+    If Jira rejects a discovered field (e.g. an epic link the create screen
+    doesn't show after all), the field is forgotten and the issue is built
+    and created again without it, so a story can fall back to ``parent``.
+    """
+    fields = build()
+    while True:
+        try:
+            return jira.create_issue(fields=fields)
+        except JIRAError as e:
+            _forget_rejected(jira, fields, e)
+            retry = build()
+            if retry == fields:
+                raise
+            fields = retry
+
+
+def get_subtask_type(jira, project_key: str) -> str:
+    """Returns the name of the sub-task issue type ("Sub-task" or "Subtask")."""
+    return _project_meta(jira, project_key)["subtask"]
+
+
+def clear_field_cache(project_key: str | None = None) -> None:
+    """Forgets discovered fields, for one project or for all of them."""
+    if project_key is None:
+        _meta_cache.clear()
+        return
+    for key in [k for k in _meta_cache if k[1] == project_key]:
+        del _meta_cache[key]
+
+
+_clients: dict[tuple[str, str, str], JIRA] = {}
+_clients_lock = threading.Lock()
 
 
 def get_jira():
@@ -28,7 +220,8 @@ def get_jira():
 
     The JIRA instance is created by passing the values of the
     JIRA_URL, JIRA_EMAIL, and JIRA_TOKEN environment variables to the
-    JIRA constructor.
+    JIRA constructor. It is pooled per credentials, so every caller reuses
+    the same HTTP session and its open connections.
 
     If any of the environment variables are not set, a ValueError is
     raised.
@@ -46,7 +239,12 @@ def get_jira():
             "Bitte in den Einstellungen Jira-URL, Email und Token eintragen."
         )
 
-    return JIRA(server=url, basic_auth=(email, token))
+    with _clients_lock:
+        client = _clients.get((url, email, token))
+        if client is None:
+            client = JIRA(server=url, basic_auth=(email, token))
+            _clients[(url, email, token)] = client
+    return client
 
 
 def create_issue(summary, description, project_key, issue_type="Task"):
@@ -76,9 +274,22 @@ def create_issue(summary, description, project_key, issue_type="Task"):
     return jira.create_issue(fields=issue_dict)
 
 
+def epic_fields(jira, project_key: str, epic_name: str) -> dict:
+    """Builds the create fields of an epic, with its name field if available."""
+    fields = {
+        "project": {"key": project_key},
+        "summary": epic_name,
+        "issuetype": {"name": "Epic"},
+    }
+    meta = get_create_fields(jira, project_key, "Epic")
+    if "epic_name" in meta:
+        fields[meta["epic_name"]] = epic_name
+    return fields
+
+
 def create_epic(jira, project_key: str, epic_name: str) -> str:
     """
-    Creates a Jira epic issue under a given project, along with its name field if the project is not team-managed.
+    Creates a Jira epic issue under a given project, along with its name field if the create screen has one.
 
     Args:
         jira: An instance of the JIRA client.
@@ -91,28 +302,132 @@ def create_epic(jira, project_key: str, epic_name: str) -> str:
     Raises:
         JIRAError: If there is an error during the creation of the epic.
     """
+    issue = _create_issue(jira, lambda: epic_fields(jira, project_key, epic_name))
+    return issue.key
+
+
+# how the tasks of a story end up in Jira
+TASK_MODES = {
+    "subtasks": "Sub-Tasks",
+    "checklist": "Checkliste in der Beschreibung",
+    "threshold": "Sub-Tasks erst ab Punkte-Schwelle",
+}
+DEFAULT_TASK_THRESHOLD = 5
+
+
+def parse_task_overrides(text: str) -> tuple[dict[str, tuple[str, int | None]], list]:
+    """
+    Parses per-project task modes such as ``"ABC=checklist, XYZ=threshold:8"``.
+
+    Returns:
+        tuple: ``{PROJECT_KEY: (mode, threshold or None)}`` and the entries
+        that could not be read (unknown mode, missing ``=``, bad threshold).
+    """
+    overrides, invalid = {}, []
+    for entry in text.split(","):
+        if not entry.strip():
+            continue
+        key, sep, value = entry.partition("=")
+        mode, _, limit = value.strip().partition(":")
+        limit = limit.strip()
+        if not sep or not key.strip() or mode not in TASK_MODES or (
+            limit and not limit.isdigit()
+        ):
+            invalid.append(entry.strip())
+            continue
+        overrides[key.strip().upper()] = (mode, int(limit) if limit else None)
+    return overrides, invalid
+
+
+def task_mode(project_key: str | None = None) -> tuple[str, int]:
+    """
+    Returns the task mode and point threshold for a project.
+
+    Projects can override the default in the settings (``tasks/projects``,
+    e.g. ``"ABC=checklist, XYZ=threshold:8"``), all others use
+    ``tasks/mode`` and ``tasks/threshold``. Overrides that can't be read are
+    reported and ignored, the project then uses the default.
+    """
+    settings = QSettings("PrinzCodeAgent")
+    mode = settings.value("tasks/mode", "subtasks", type=str)
+    if mode not in TASK_MODES:
+        print(f"⮕ Unbekannter Task-Modus {mode!r}, nehme Sub-Tasks")
+        mode = "subtasks"
+    threshold = settings.value("tasks/threshold", DEFAULT_TASK_THRESHOLD, type=int)
+    overrides, invalid = parse_task_overrides(
+        settings.value("tasks/projects", "", type=str)
+    )
+    if project_key:
+        prefix = project_key.upper() + "="
+        for entry in invalid:
+            if entry.upper().replace(" ", "").startswith(prefix):
+                print(f"⮕ Task-Modus {entry!r} ungültig, nehme Standard ({mode})")
+        override_mode, limit = overrides.get(project_key.upper(), (mode, None))
+        mode, threshold = override_mode, threshold if limit is None else limit
+    return mode, threshold
+
+
+def wants_subtasks(mode: str, threshold: int, points) -> bool:
+    """Are the tasks of a story with ``points`` created as sub-tasks?"""
+    if mode == "checklist":
+        return False
+    if mode == "threshold":
+        return (points or 0) >= threshold
+    return True
+
+
+# heading of the task checklist in a story description
+CHECKLIST_HEADING = "*Aufgaben:*"
+
+
+def story_fields(
+    jira, project_key: str, epic_key: str | None, story: dict, checklist=False
+) -> dict:
+    """Builds the create fields of a story: epic link or parent, story points.
+
+    With ``checklist`` the tasks are listed in the description instead of
+    being created as sub-tasks.
+    """
+    description = "\n".join(f"* {a}" for a in story["acceptance_criteria"])
+    if checklist and story.get("tasks"):
+        description += f"\n\n{CHECKLIST_HEADING}\n" + "\n".join(
+            f"* ☐ {t}" for t in story["tasks"]
+        )
     fields = {
         "project": {"key": project_key},
-        "summary": epic_name,
-        "issuetype": {"name": "Epic"},
+        "summary": story["summary"],
+        "description": description,
+        "issuetype": {"name": "Story"},
+    }
+    meta = get_create_fields(jira, project_key, "Story")
+    if epic_key:
+        if "epic_link" in meta:
+            fields[meta["epic_link"]] = epic_key
+        elif "parent" in meta:
+            fields["parent"] = {"key": epic_key}
+    if "story_points" in meta and story.get("points") is not None:
+        fields[meta["story_points"]] = float(story["points"])
+    return fields
+
+
+def subtask_fields(jira, project_key: str, parent_key: str, summary: str) -> dict:
+    """Builds the create fields of a sub-task of ``parent_key``."""
+    return {
+        "project": {"key": project_key},
+        "summary": summary,
+        "issuetype": {"name": get_subtask_type(jira, project_key)},
+        "parent": {"key": parent_key},
     }
-    if not is_team_managed(jira, project_key):
-        fields[EPIC_NAME_ID] = epic_name
-
-    try:
-        issue = jira.create_issue(fields=fields)
-    except JIRAError as e:
-        msg = str(e)
-        # epic name issue, try without again
-        if EPIC_NAME_ID in msg:
-            fields.pop(EPIC_NAME_ID, None)
-            issue = jira.create_issue(fields=fields)
-        else:
-            raise
-    return issue.key
 
 
-def create_story(jira, project_key: str, epic_key: str, story: dict) -> str:
+def create_story(
+    jira,
+    project_key: str,
+    epic_key: str,
+    story: dict,
+    on_created=None,
+    subtasks: bool | None = None,
+) -> str:
     """
     Creates a Jira story issue under a given project and epic, along with its sub-tasks.
 
@@ -122,6 +437,13 @@ def create_story(jira, project_key: str, epic_key: str, story: dict) -> str:
         epic_key (str): The key of the epic under which the story is to be created.
         story (dict): A dictionary containing the story details, including summary,
                       acceptance criteria, and tasks.
+        on_created (callable, optional): Called as
+                      ``on_created(kind, key, summary, seconds)`` right after the
+                      story (kind "story") and each sub-task (kind "subtask")
+                      was created.
+        subtasks (bool, optional): Create the tasks as sub-tasks (True) or
+                      list them as checklist in the description (False).
+                      Defaults to the task mode of the project.
 
     Returns:
         str: The key of the created story issue.
@@ -130,51 +452,92 @@ def create_story(jira, project_key: str, epic_key: str, story: dict) -> str:
         JIRAError: If there is an error during the creation of the story or sub-tasks.
 
     Note:
-        If the project is not team-managed, the epic link field will be added to the story.
-        If there is an issue with the epic link field during creation, it will attempt
-        to create the story without this field.
+        The epic is linked via the epic link field (company-managed) or the
+        parent field (team-managed), whichever the create screen offers; if
+        Jira rejects the epic link anyway the story is created with parent.
+        Story points are set when a story point field is available.
     """
 
-    fields = {
-        "project": {"key": project_key},
-        "summary": story["summary"],
-        "description": "\n".join(f"* {a}" for a in story["acceptance_criteria"]),
-        "issuetype": {"name": "Story"},
-    }
-    if not is_team_managed(jira, project_key):
-        fields[EPIC_LINK_ID] = epic_key
+    if subtasks is None:
+        mode, threshold = task_mode(project_key)
+        subtasks = wants_subtasks(mode, threshold, story.get("points"))
 
-    try:
-        issue = jira.create_issue(fields=fields)
-    except JIRAError as e:
-        msg = str(e)
-        # Epic link issus, try again
-        if EPIC_LINK_ID in msg:
-            fields.pop(EPIC_LINK_ID, None)
-            issue = jira.create_issue(fields=fields)
-        else:
-            raise
-
-    for t in story.get("tasks", []):
-        jira.create_issue(
-            fields={
-                "project": {"key": project_key},
-                "summary": t,
-                "issuetype": {"name": "Sub-task"},
-                "parent": {"key": issue.key},
-            }
+    def build():
+        return story_fields(
+            jira, project_key, epic_key, story, checklist=not subtasks
         )
+
+    fields = build()
+    t0 = time.perf_counter()
+    issue = _create_issue(jira, build)
+    if on_created:
+        on_created("story", issue.key, story["summary"], time.perf_counter() - t0)
+    from backlog_mirror import remember_issue
+
+    remember_issue(
+        project_key, issue.key, issue_text(fields["summary"], fields["description"])
+    )
+
+    for t in story.get("tasks", []) if subtasks else ():
+        t0 = time.perf_counter()
+        sub = jira.create_issue(fields=subtask_fields(jira, project_key, issue.key, t))
+        if on_created:
+            on_created("subtask", sub.key, t, time.perf_counter() - t0)
     return issue.key
 
 
+def duplicate_index(jira, project_key: str) -> DuplicateIndex:
+    """
+    Returns the duplicate index over the existing issues of a project.
+
+    The index lives in the local backlog mirror and is updated issue by issue
+    (syncs, created issues, webhook events). The cache entry only decides when
+    the mirror is synced again: on a miss it is synced incrementally first.
+    """
+
+    def load():
+        from backlog_mirror import get_mirror
+
+        mirror = get_mirror()
+        mirror.sync(jira, project_key)
+        return mirror.duplicate_index(project_key)
+
+    return jira_cache.get_or_load(("issues", project_key), load)
+
+
+def list_projects(jira) -> list[dict]:
+    """Returns the projects as ``{"key", "name"}`` dicts (cached)."""
+    return jira_cache.get_or_load(
+        ("projects",),
+        lambda: [{"key": p.key, "name": p.name} for p in jira.projects()],
+    )
+
+
+def list_sprints(jira, board_id: int) -> list[dict]:
+    """Returns the sprints of a board as ``{"id", "name", "state"}`` dicts (cached)."""
+    return jira_cache.get_or_load(
+        ("sprints", board_id),
+        lambda: [
+            {"id": s.id, "name": s.name, "state": s.state}
+            for s in jira.sprints(board_id)
+        ],
+    )
+
+
 def ensure_board(jira, project_key: str) -> int:
     """Exist Srcumboard?"""
+    board_id = jira_cache.get(("boards", project_key))
+    if board_id is not None:
+        return board_id
     boards = jira.boards(projectKeyOrID=project_key, type="scrum")
     if boards:
-        return boards[0].id
-    return jira.create_board(
-        name=f"{project_key} Board", project_key=project_key, preset="scrum"
-    ).id
+        board_id = boards[0].id
+    else:
+        board_id = jira.create_board(
+            name=f"{project_key} Board", project_key=project_key, preset="scrum"
+        ).id
+    jira_cache.set(("boards", project_key), board_id)
+    return board_id
 
 
 def create_sprint(jira, board_id: int, name: str, days: int = 14) -> int:
@@ -204,7 +567,14 @@ def create_sprint(jira, board_id: int, name: str, days: int = 14) -> int:
         startDate=start_ts,
         endDate=end_ts,
     )
-    return getattr(sprint, "id", None) or sprint.raw["id"]
+    sprint_id = getattr(sprint, "id", None) or sprint.raw["id"]
+    jira_cache.update(
+        ("sprints", board_id),
+        lambda sprints: sprints.append(
+            {"id": sprint_id, "name": name, "state": "future"}
+        ),
+    )
+    return sprint_id
 
 
 def add_issue_to_sprint(jira, sprint_id: int, issue_key: str):
@@ -223,6 +593,209 @@ def add_issue_to_sprint(jira, sprint_id: int, issue_key: str):
     jira.add_issues_to_sprint(sprint_id, [issue_key])
 
 
+# Jira accepts at most 50 issues per bulk create and per sprint, backlog or epic
+# move
+BULK_LIMIT = 50
+
+
+class BulkCreateError(RuntimeError):
+    """Raised by ``create_issues_bulk`` when some of the issues failed.
+
+    ``keys`` holds the keys in input order, ``None`` for the failed issues,
+    so callers can record what was created before giving up.
+    """
+
+    def __init__(self, message: str, keys: list[str | None]):
+        super().__init__(message)
+        self.keys = keys
+
+
+def create_issues_bulk(jira, items: list, build) -> list[str]:
+    """
+    Creates up to ``BULK_LIMIT`` issues with one request.
+
+    Issues that fail because Jira rejects a discovered field are built again
+    without it and retried, like ``_create_issue`` does for single creates.
+
+    Args:
+        jira: An instance of the JIRA client.
+        items (list): What to create, e.g. plan nodes.
+        build (callable): Returns the create fields of one item.
+
+    Returns:
+        list[str]: The keys of the created issues, in input order.
+
+    Raises:
+        BulkCreateError: If any of the issues could not be created.
+    """
+    keys: list[str | None] = [None] * len(items)
+    pending = [(i, build(item)) for i, item in enumerate(items)]
+    while pending:
+        results = jira.create_issues([f for _, f in pending], prefetch=False)
+        failed = []
+        for (i, fields), r in zip(pending, results):
+            if r["status"] == "Success":
+                keys[i] = r["issue"].key
+            else:
+                _forget_rejected(jira, fields, r["error"])
+                failed.append((i, fields, r["error"]))
+        pending, errors = [], []
+        for i, fields, error in failed:
+            retry = build(items[i])
+            if retry == fields:
+                errors.append(error)
+            else:
+                pending.append((i, retry))
+        if errors:
+            raise BulkCreateError(
+                f"Issues konnten nicht angelegt werden: {errors}", keys
+            )
+    return keys
+
+
+def update_issue_fields(jira, issue_key: str, fields: dict) -> None:
+    """Sets ``fields`` of an issue with a single PUT (no prior GET)."""
+    res = jira._session.put(
+        jira._get_url(f"issue/{issue_key}"), json={"fields": fields}
+    )
+    if res.status_code not in (200, 204):
+        raise RuntimeError(f"{issue_key} konnte nicht geändert werden: {res.text}")
+
+
+def move_to_backlog(jira, issue_keys: list[str]) -> None:
+    """Moves up to ``BULK_LIMIT`` issues out of their sprint into the backlog."""
+    jira.move_to_backlog(issue_keys)
+
+
+def move_to_epic(
+    jira, project_key: str, epic_key: str, issue_keys: list[str]
+) -> int:
+    """
+    Moves up to ``BULK_LIMIT`` stories to an epic.
+
+    One request of the agile API moves all of them. Where Jira refuses it
+    (e.g. team-managed projects on older sites), the epic link or parent is
+    set per story instead.
+
+    Returns:
+        int: The number of requests that were made.
+    """
+    url = jira._get_url(f"epic/{epic_key}/issue", base=jira.AGILE_BASE_URL)
+    try:
+        res = jira._session.post(url, json={"issues": issue_keys})
+        if res.status_code in (200, 204):
+            return 1
+    except JIRAError:
+        pass
+    meta = get_create_fields(jira, project_key, "Story")
+    if "epic_link" in meta:
+        fields = {meta["epic_link"]: epic_key}
+    elif "parent" in meta:
+        fields = {"parent": {"key": epic_key}}
+    else:
+        raise RuntimeError(f"Stories können nicht nach {epic_key} verschoben werden")
+    for key in issue_keys:
+        update_issue_fields(jira, key, fields)
+    return 1 + len(issue_keys)
+
+
+def done_transition(jira, issue_key: str) -> str | None:
+    """Returns the id of a transition of the issue into a done status, if any."""
+    for t in jira.transitions(issue_key):
+        category = ((t.get("to") or {}).get("statusCategory") or {}).get("key")
+        if category == "done":
+            return t["id"]
+    return None
+
+
+# how long a bulk transition task of Jira Cloud is polled before its issues
+# are looked up instead
+BULK_TASK_TIMEOUT = 120
+
+
+def transition_issues_bulk(
+    jira, transitions: list[tuple[str, str]]
+) -> set[str] | None:
+    """
+    Moves up to ``BULK_LIMIT`` issues through a transition with one request.
+
+    Uses the bulk API of Jira Cloud, which runs the transitions as a task
+    that is polled until it ends. If the task reports failures (or doesn't
+    end in time), the status of the issues is looked up.
+
+    Args:
+        jira: An instance of the JIRA client.
+        transitions (list): ``(transition id, issue key)`` pairs.
+
+    Returns:
+        set[str] | None: The keys of the issues that are in a done status
+        now, or None if Jira refused the request (e.g. Server/Data Center,
+        which has no bulk API).
+    """
+    grouped: dict[str, list[str]] = {}
+    for transition, key in transitions:
+        grouped.setdefault(transition, []).append(key)
+    base = f"{jira.server_url}/rest/api/3/bulk"
+    body = {
+        "bulkTransitionInputs": [
+            {"selectedIssueIdsOrKeys": keys, "transitionId": transition}
+            for transition, keys in grouped.items()
+        ],
+        "sendBulkNotification": False,
+    }
+    try:
+        res = jira._session.post(f"{base}/issues/transition", json=body)
+    except JIRAError:
+        return None
+    if res.status_code not in (200, 201):
+        return None
+
+    task_id = res.json()["taskId"]
+    deadline = time.monotonic() + BULK_TASK_TIMEOUT
+    while True:
+        task = jira._session.get(f"{base}/queue/{task_id}").json()
+        if task.get("status") not in ("ENQUEUED", "RUNNING"):
+            break
+        if time.monotonic() > deadline:
+            break
+        time.sleep(1)
+
+    keys = [key for _, key in transitions]
+    if (
+        task.get("status") == "COMPLETE"
+        and not task.get("failedAccessibleIssues")
+        and not task.get("invalidOrInaccessibleIssueCount")
+    ):
+        return set(keys)
+    return done_issues(jira, keys)
+
+
+def done_issues(jira, issue_keys: list[str]) -> set[str]:
+    """Returns the keys of the issues whose status is in the done category."""
+    page = jira.search_issues(
+        f"key in ({', '.join(issue_keys)})",
+        maxResults=len(issue_keys),
+        fields="status",
+        json_result=True,
+    )
+    done = set()
+    for issue in page.get("issues", []):
+        status = issue["fields"].get("status") or {}
+        if (status.get("statusCategory") or {}).get("key") == "done":
+            done.add(issue["key"])
+    return done
+
+
+def transition_issue(jira, issue_key: str, transition: str) -> bool:
+    """Moves one issue through a transition, False if Jira refused it."""
+    try:
+        jira.transition_issue(issue_key, transition)
+    except JIRAError as e:
+        print(f"⮕ {issue_key} konnte nicht geschlossen werden: {e}")
+        return False
+    return True
+
+
 def create_jira_project(name: str, key: str | None = None) -> str:
     """
     Creates a new Jira project with the specified name and optional key.
@@ -0,0 +1,51 @@
+"""Picks complete items out of a JSON document while it is still streaming.
+
+The LLM answers the decomposition as ``{"epics": [{...}, {...}]}`` (or as a
+bare array). ``ItemStream`` tracks strings, escapes and nesting of the text
+fed so far and returns every object of that array as soon as its closing
+brace has arrived, so the first epics can be used long before the answer is
+complete. Only the text of the item that is still open is kept.
+"""
+
+import json
+
+# container stacks under which an object is an item of the top-level array
+_ITEM_PARENTS = (["{", "["], ["["])
+
+
+class ItemStream:
+    def __init__(self) -> None:
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._item: list[str] | None = None  # text of the open item
+        self._item_depth = 0
+
+    def feed(self, text: str) -> list:
+        """Consumes the next piece of text and returns the items it completed."""
+        done = []
+        start = 0 if self._item is not None else None
+        for i, ch in enumerate(text):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if ch == "{" and self._item is None and self._stack in _ITEM_PARENTS:
+                    self._item, self._item_depth, start = [], len(self._stack) + 1, i
+                self._stack.append(ch)
+            elif ch in "}]":
+                if self._item is not None and len(self._stack) == self._item_depth:
+                    self._item.append(text[start : i + 1])
+                    done.append(json.loads("".join(self._item)))
+                    self._item, start = None, None
+                if self._stack:
+                    self._stack.pop()
+        if self._item is not None and start is not None:
+            self._item.append(text[start:])
+        return done
@@ -0,0 +1,302 @@
+"""Picks the OpenAI model and parameters per call type.
+
+Each call type (``stack``, ``revise``, ``decompose``, ``ticket``,
+``regenerate``, ``extract``, ``condense``) has a list
+of models that are good enough for it. The list can be overridden in the
+settings (``ai/models/<call_type>``, comma separated). The router measures
+latency and output token throughput per call type and model, tries the
+fastest measured model first and falls back to the next one on timeout or
+error.
+
+"Fastest" depends on the call type: short answers (``rank_by: latency``)
+go to the model with the lowest latency, long ones (``rank_by: tps``) to
+the one with the highest output token throughput. A share of the calls
+(``EXPLORE``) tries a model with fewer than ``MIN_SAMPLES`` measurements
+first, so fallbacks get measured too. Error rates are moving averages that
+also fade with time (``ERROR_HALF_LIFE``), so a burst of errors demotes a
+model only for a while.
+
+The stats are written to the settings ``SAVE_DELAY`` seconds after a call
+(one write for a whole burst of calls) and when the app exits.
+"""
+
+import atexit
+import json
+import random
+import threading
+import time
+
+from PySide6.QtCore import QSettings
+
+DEFAULT_ROUTES = {
+    "stack": {
+        "models": ["gpt-4o-mini", "gpt-4.1-mini"],
+        "temperature": 0.3,
+        "timeout": 30,
+        "rank_by": "latency",
+    },
+    "revise": {
+        "models": ["gpt-4o-mini", "gpt-4.1-mini"],
+        "temperature": 0.3,
+        "timeout": 30,
+        "rank_by": "latency",
+    },
+    "decompose": {
+        "models": ["gpt-4o-mini", "gpt-4.1-mini"],
+        "temperature": 0.2,
+        "timeout": 60,
+        "rank_by": "tps",
+    },
+    "ticket": {
+        "models": ["gpt-4o-mini", "gpt-4.1-nano"],
+        "temperature": 0.3,
+        "timeout": 30,
+        "rank_by": "latency",
+    },
+    "regenerate": {
+        "models": ["gpt-4o-mini", "gpt-4.1-mini"],
+        "temperature": 0.3,
+        "timeout": 45,
+        "rank_by": "latency",
+    },
+    "extract": {
+        "models": ["gpt-4o-mini", "gpt-4.1-nano"],
+        "temperature": 0.1,
+        "timeout": 60,
+        "rank_by": "tps",
+    },
+    "condense": {
+        "models": ["gpt-4o-mini", "gpt-4.1-mini"],
+        "temperature": 0.2,
+        "timeout": 90,
+        "rank_by": "tps",
+    },
+}
+
+# route keys for the router itself, the rest goes to the API
+_ROUTER_KEYS = ("models", "rank_by")
+
+# weight of the newest measurement in the moving averages
+ALPHA = 0.3
+# share of calls that try an under-measured model first
+EXPLORE = 0.1
+# measurements after which a model no longer counts as under-measured
+MIN_SAMPLES = 3
+# seconds after which a recorded error rate has faded to half
+ERROR_HALF_LIFE = 3600
+# error rate above which a model is only used as last resort
+MAX_ERROR_RATE = 0.5
+# seconds between a call and writing the stats to the settings
+SAVE_DELAY = 30
+
+
+class ModelRouter:
+    def __init__(self, routes: dict | None = None, seed=None) -> None:
+        self.routes = routes or DEFAULT_ROUTES
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict] = self._load_stats()
+        self._rng = random.Random(seed)
+        self._save_timer: threading.Timer | None = None
+
+    # ---------- config ----------
+    def models(self, call_type: str) -> list[str]:
+        """Returns the configured models for ``call_type`` in config order."""
+        configured = QSettings("PrinzCodeAgent").value(f"ai/models/{call_type}", "")
+        models = [m.strip() for m in str(configured or "").split(",") if m.strip()]
+        return models or list(self.routes[call_type]["models"])
+
+    def candidates(self, call_type: str) -> list[str]:
+        """Returns the models in the order they are tried.
+
+        Measured models come first, best first by the ``rank_by`` metric of
+        the route, models that mostly fail go last. Unmeasured models keep
+        their config order. With probability ``EXPLORE`` an under-measured
+        model that is not failing is moved to the front.
+        """
+        models = self.models(call_type)
+        by_tps = self.routes.get(call_type, {}).get("rank_by") == "tps"
+        now = time.time()
+        with self._lock:
+            stats = {m: self._stats.get(f"{call_type}/{m}") for m in models}
+
+        def failing(model) -> bool:
+            s = stats[model]
+            return bool(s) and self.error_rate(s, now) > MAX_ERROR_RATE
+
+        def rank(item):
+            idx, model = item
+            s = stats[model]
+            if not s or (by_tps and not s["tps"]):
+                return (1, 0.0, idx)
+            metric = -s["tps"] if by_tps else s["latency"]
+            return (2 if failing(model) else 0, metric, idx)
+
+        order = [m for _, m in sorted(enumerate(models), key=rank)]
+        fresh = [
+            m
+            for m in order[1:]
+            if (not stats[m] or stats[m]["calls"] < MIN_SAMPLES) and not failing(m)
+        ]
+        if fresh and self._rng.random() < EXPLORE:
+            pick = self._rng.choice(fresh)
+            order.remove(pick)
+            order.insert(0, pick)
+        return order
+
+    # ---------- calls ----------
+    def complete(self, client, call_type: str, messages: list[dict], **kwargs):
+        """
+        Sends a chat completion for ``call_type``, with fallback over the models.
+
+        Args:
+            client (OpenAI): The OpenAI client.
+            call_type (str): One of the keys of ``DEFAULT_ROUTES``.
+            messages (list[dict]): The chat messages.
+            **kwargs: Extra arguments for ``chat.completions.create``
+                (e.g. ``response_format``), they override the route defaults.
+
+        Returns:
+            ChatCompletion: The response of the first model that answered.
+
+        Raises:
+            Exception: The error of the last model if all of them failed.
+        """
+
+        route = self.routes[call_type]
+        params = {k: v for k, v in route.items() if k not in _ROUTER_KEYS}
+        params.update(kwargs)
+
+        last_exc = None
+        for model in self.candidates(call_type):
+            t0 = time.perf_counter()
+            try:
+                resp = client.chat.completions.create(
+                    model=model, messages=messages, **params
+                )
+            except Exception as exc:
+                last_exc = exc
+                self.record(call_type, model, time.perf_counter() - t0, 0, ok=False)
+                print(f"⮕ {model} fehlgeschlagen ({type(exc).__name__}), Fallback")
+                continue
+            usage = getattr(resp, "usage", None)
+            tokens = getattr(usage, "completion_tokens", 0) or 0
+            self.record(call_type, model, time.perf_counter() - t0, tokens, ok=True)
+            return resp
+        raise last_exc
+
+    def stream(self, client, call_type: str, messages: list[dict], **kwargs):
+        """
+        Streams a chat completion for ``call_type`` and yields the text deltas.
+
+        Falls back to the next model only while nothing has been yielded yet;
+        once output arrived an error is raised to the caller.
+
+        Args:
+            client (OpenAI): The OpenAI client.
+            call_type (str): One of the keys of ``DEFAULT_ROUTES``.
+            messages (list[dict]): The chat messages.
+            **kwargs: Extra arguments for ``chat.completions.create``.
+
+        Yields:
+            str: The content deltas in order.
+        """
+
+        route = self.routes[call_type]
+        params = {k: v for k, v in route.items() if k not in _ROUTER_KEYS}
+        params.update(kwargs)
+        params.update(stream=True, stream_options={"include_usage": True})
+
+        last_exc = None
+        for model in self.candidates(call_type):
+            t0 = time.perf_counter()
+            started = False
+            tokens = 0
+            try:
+                chunks = client.chat.completions.create(
+                    model=model, messages=messages, **params
+                )
+                for chunk in chunks:
+                    if chunk.usage is not None:
+                        tokens = chunk.usage.completion_tokens or 0
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        started = True
+                        yield delta
+            except Exception as exc:
+                self.record(call_type, model, time.perf_counter() - t0, 0, ok=False)
+                if started:
+                    raise
+                last_exc = exc
+                print(f"⮕ {model} fehlgeschlagen ({type(exc).__name__}), Fallback")
+                continue
+            self.record(call_type, model, time.perf_counter() - t0, tokens, ok=True)
+            return
+        raise last_exc
+
+    # ---------- stats ----------
+    def record(
+        self, call_type: str, model: str, latency: float, tokens: int, ok: bool
+    ) -> None:
+        """Adds one measurement to the moving averages of a model."""
+        key = f"{call_type}/{model}"
+        now = time.time()
+        with self._lock:
+            s = self._stats.get(key)
+            if s is None:
+                s = self._stats[key] = {
+                    "calls": 0,
+                    "error_rate": 0.0,
+                    "latency": latency,
+                    "tps": 0.0,
+                    "updated": now,
+                }
+            s["calls"] += 1
+            s["error_rate"] = self.error_rate(s, now)
+            s["error_rate"] += ALPHA * ((0.0 if ok else 1.0) - s["error_rate"])
+            s["updated"] = now
+            if ok:
+                s["latency"] += ALPHA * (latency - s["latency"])
+                if tokens:
+                    # streams without usage report no tokens, keep the average
+                    tps = tokens / latency if latency > 0 else 0.0
+                    s["tps"] += ALPHA * (tps - s["tps"]) if s["tps"] else tps
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(SAVE_DELAY, self.save)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def save(self) -> None:
+        """Writes the stats to the settings now, if a call changed them."""
+        with self._lock:
+            if self._save_timer is None:
+                return
+            self._save_timer.cancel()
+            self._save_timer = None
+            snapshot = json.dumps(self._stats)
+        QSettings("PrinzCodeAgent").setValue("ai/stats", snapshot)
+
+    @staticmethod
+    def error_rate(s: dict, now: float | None = None) -> float:
+        """The error rate of a stats entry, faded by the time since its update."""
+        age = (time.time() if now is None else now) - s.get("updated", 0)
+        return s["error_rate"] * 0.5 ** (max(age, 0) / ERROR_HALF_LIFE)
+
+    def stats(self) -> dict[str, dict]:
+        """Returns ``{"<call_type>/<model>": {calls, error_rate, latency, tps,
+        updated}}``."""
+        with self._lock:
+            return {k: dict(v) for k, v in self._stats.items()}
+
+    @staticmethod
+    def _load_stats() -> dict:
+        raw = QSettings("PrinzCodeAgent").value("ai/stats", "")
+        try:
+            return json.loads(raw) if raw else {}
+        except (TypeError, ValueError):
+            return {}
+
+
+router = ModelRouter()
+atexit.register(router.save)
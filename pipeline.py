@@ -0,0 +1,124 @@
+"""Generates the plan and pushes it to Jira at the same time.
+
+Two stages are connected by a bounded queue:
+
+1. a producer thread reads the streamed decomposition and puts every epic
+   into the queue as soon as it is complete,
+2. the calling thread takes the epics out, packs their stories into sprints
+   with the incremental ``SprintPacker`` and creates them in Jira right away.
+
+While Jira works on one epic the LLM is already writing the next ones, so
+generate + push takes about as long as the slower of the two stages instead
+of their sum. The queue keeps the producer at most ``QUEUE_SIZE`` epics ahead.
+"""
+
+import queue
+import threading
+
+from plan_model import Epic, Plan
+from planner import DEFAULT_VELOCITY, SprintPacker
+from pusher import PlanPusher, epic_operations
+from search_index import index_pushed
+
+QUEUE_SIZE = 4
+# how often (seconds) a producer waiting for room checks the stop flag
+PUT_TIMEOUT = 0.1
+
+_DONE = object()
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Puts ``item`` into ``q``, False if ``stop`` was set while waiting."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=PUT_TIMEOUT)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def generate_and_push(
+    jira,
+    epics,
+    plan: Plan,
+    project_key: str,
+    on_event,
+    velocity: int = DEFAULT_VELOCITY,
+    queue_size: int = QUEUE_SIZE,
+) -> Plan:
+    """
+    Pushes epics to Jira while they are still being generated.
+
+    Args:
+        jira: An instance of the JIRA client.
+        epics: Iterable of epic dicts, usually ``ai.stream_decomposition(...)``.
+        plan (Plan): An empty plan that is filled as the epics arrive. It
+            holds everything pushed so far even if the pipeline fails.
+        project_key (str): The key of the target project.
+        on_event (callable): Called with a ``PushEvent`` after every operation;
+            ``total`` grows as epics arrive.
+        velocity (int, optional): Story points per sprint. Defaults to 20.
+        queue_size (int, optional): Epics the producer may run ahead.
+            Defaults to 4.
+
+    Returns:
+        Plan: ``plan``, with its sprints and indexes set.
+
+    Raises:
+        Exception: The first error of either stage; the other stage is stopped.
+    """
+
+    q: queue.Queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for data in epics:
+                if not _put(q, Epic.from_dict(data), stop):
+                    break
+            else:
+                _put(q, _DONE, stop)
+        except Exception as exc:
+            _put(q, exc, stop)
+        finally:
+            close = getattr(epics, "close", None)
+            if close is not None:
+                close()  # ends the HTTP stream if we stopped early
+
+    producer = threading.Thread(target=produce, name="decompose-stream", daemon=True)
+    producer.start()
+
+    packer = SprintPacker(velocity)
+    sprint_by_name = {}
+    try:
+        pusher = PlanPusher(jira, plan, project_key, on_event)
+        while True:
+            item = q.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+
+            epic = item
+            plan.epics.append(epic)
+            known = len(packer.sprints)
+            packer.add_epic(epic)
+            for sprint in packer.sprints[known:]:
+                sprint_by_name[sprint.name] = sprint
+            pusher.total += len(packer.sprints) - known + epic_operations(
+                epic, pusher.task_mode, pusher.task_threshold
+            )
+
+            for story in epic.stories:
+                sprint_id = pusher.sprint_id(sprint_by_name[story.sprint])
+                pusher.push_story(epic, story, sprint_id)
+            pusher.epic_key(epic)  # epics without stories
+            index_pushed([epic], plan.description)
+    finally:
+        # a producer waiting on the full queue gives up within PUT_TIMEOUT and
+        # closes the stream, no need to wait for the LLM here
+        stop.set()
+        plan.sprints = packer.result()
+        plan.reindex()
+    return plan
@@ -0,0 +1,217 @@
+"""Typed, compact in-memory model of a generated plan.
+
+The LLM output is parsed once into slotted dataclasses. Names that are
+repeated all over the plan (epic and sprint names) are interned, and the
+lookups used by push, tree rendering and export are indexed, so all of them
+run in linear time over the plan.
+"""
+
+from dataclasses import dataclass, field
+from sys import intern
+
+
+def _int(value, default: int = 1) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def check_story(data) -> dict:
+    """Returns ``data`` if it is a complete story dict, raises ValueError if not."""
+    if not isinstance(data, dict):
+        raise ValueError(f"Story ist kein JSON-Objekt: {data!r:.80}")
+    summary = data.get("summary")
+    if not isinstance(summary, str) or not summary.strip():
+        raise ValueError("Story ohne summary.")
+    for key in ("acceptance_criteria", "tasks"):
+        if not isinstance(data.get(key), list):
+            raise ValueError(f"Story „{summary}“ ohne Liste {key}.")
+    return data
+
+
+def check_epic(data) -> dict:
+    """Returns ``data`` if it is an epic with stories, raises ValueError if not."""
+    if not isinstance(data, dict) or not isinstance(data.get("epic"), str):
+        raise ValueError(f"Kein Epic mit Namen: {data!r:.80}")
+    stories = data.get("stories")
+    if not isinstance(stories, list) or not stories:
+        raise ValueError(f"Epic „{data['epic']}“ ohne Stories.")
+    for story in stories:
+        check_story(story)
+    return data
+
+
+@dataclass(slots=True)
+class Story:
+    summary: str
+    points: int = 1
+    tasks: tuple[str, ...] = ()
+    acceptance_criteria: tuple[str, ...] = ()
+    sprint: str | None = None
+    # set once pushed: the Jira key and (task summary, sub-task key) pairs
+    key: str | None = None
+    task_keys: tuple[tuple[str, str], ...] = ()
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Story":
+        return cls(
+            summary=str(data.get("summary", "")),
+            points=_int(data.get("points")),
+            tasks=tuple(str(t) for t in data.get("tasks") or ()),
+            acceptance_criteria=tuple(
+                str(a) for a in data.get("acceptance_criteria") or ()
+            ),
+        )
+
+    def to_dict(self) -> dict:
+        """Returns the story in the dict layout ``jira_client`` expects."""
+        return {
+            "summary": self.summary,
+            "points": self.points,
+            "tasks": list(self.tasks),
+            "acceptance_criteria": list(self.acceptance_criteria),
+            "sprint": self.sprint,
+        }
+
+
+@dataclass(slots=True)
+class Epic:
+    name: str
+    stories: list[Story] = field(default_factory=list)
+    depends_on: tuple[str, ...] = ()
+    key: str | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Epic":
+        return cls(
+            name=intern(str(data.get("epic", ""))),
+            stories=[Story.from_dict(s) for s in data.get("stories") or ()],
+            depends_on=tuple(intern(str(d)) for d in data.get("depends_on") or ()),
+        )
+
+
+@dataclass(slots=True)
+class Sprint:
+    name: str
+    goal: str = ""
+    epics: list[str] = field(default_factory=list)
+    points: int = 0
+    sprint_id: int | None = None
+
+
+@dataclass(slots=True)
+class Plan:
+    epics: list[Epic] = field(default_factory=list)
+    sprints: list[Sprint] = field(default_factory=list)
+    # every Jira key a push or sync created for this plan, so issues whose
+    # node was removed from the plan can be closed later
+    pushed_keys: set[str] = field(default_factory=set)
+    # the project description the plan was generated from
+    description: str = ""
+    # indexes, rebuilt by reindex()
+    epic_by_name: dict[str, Epic] = field(default_factory=dict)
+    sprint_by_name: dict[str, Sprint] = field(default_factory=dict)
+    stories_by_sprint: dict[str | None, list[tuple[Epic, Story]]] = field(
+        default_factory=dict
+    )
+
+    @classmethod
+    def from_llm(cls, data) -> "Plan":
+        """Parses the JSON of ``decompose_project`` (dict or bare epic list)."""
+        epics = data.get("epics", []) if isinstance(data, dict) else data
+        plan = cls(epics=[Epic.from_dict(e) for e in epics or ()])
+        plan.reindex()
+        return plan
+
+    def reindex(self) -> None:
+        """Rebuilds the name and sprint indexes in one pass over the plan."""
+        self.epic_by_name = {e.name: e for e in self.epics}
+        self.sprint_by_name = {s.name: s for s in self.sprints}
+        by_sprint: dict[str | None, list[tuple[Epic, Story]]] = {}
+        for epic in self.epics:
+            for story in epic.stories:
+                sprint = story.sprint if story.sprint in self.sprint_by_name else None
+                by_sprint.setdefault(sprint, []).append((epic, story))
+        self.stories_by_sprint = by_sprint
+
+    def schedule(self, velocity: int) -> None:
+        """Assigns all stories to sprints with the local planner."""
+        from planner import plan_sprints
+
+        # sprint names are stable, so pushed sprints keep their Jira id
+        ids = {s.name: s.sprint_id for s in self.sprints}
+        self.sprints = plan_sprints(self.epics, velocity)
+        for sprint in self.sprints:
+            sprint.sprint_id = ids.get(sprint.name)
+        self.reindex()
+
+    def unplanned(self) -> list[tuple[Epic, Story]]:
+        """Stories that belong to no sprint (they go to the backlog)."""
+        return self.stories_by_sprint.get(None, [])
+
+    def outline(self) -> str:
+        """Compact text of the plan (epic names and story summaries only)."""
+        lines = []
+        for epic in self.epics:
+            lines.append(f"EPIC: {epic.name}")
+            lines.extend(f"  - {s.summary} ({s.points} SP)" for s in epic.stories)
+        return "\n".join(lines)
+
+    def replace_epic(self, index: int, data: dict) -> Epic:
+        """Splices a regenerated epic in at ``index``, keeping its dependencies.
+
+        The epic keeps its Jira key, and stories whose summary didn't change
+        keep their key and sprint, so a later sync updates them in place
+        instead of creating new issues.
+
+        Raises:
+            ValueError: If ``data`` is not an epic with stories; the plan is
+                left unchanged.
+        """
+        old = self.epics[index]
+        epic = Epic.from_dict(check_epic(data))
+        if not epic.name:
+            epic.name = old.name
+        epic.depends_on = epic.depends_on or old.depends_on
+        epic.key = old.key
+        pushed = {s.summary: s for s in old.stories if s.key}
+        for story in epic.stories:
+            prev = pushed.pop(story.summary, None)
+            if prev is not None:
+                story.key, story.task_keys = prev.key, prev.task_keys
+                story.sprint = prev.sprint
+        if epic.name != old.name:
+            for other in self.epics:
+                if old.name in other.depends_on:
+                    other.depends_on = tuple(
+                        epic.name if d == old.name else d for d in other.depends_on
+                    )
+        self.epics[index] = epic
+        self.reindex()
+        return epic
+
+    def replace_story(self, epic_index: int, story_index: int, data: dict) -> Story:
+        """Splices a regenerated story into its epic, keeping its sprint and key.
+
+        Raises:
+            ValueError: If ``data`` is not a complete story; the plan is left
+                unchanged.
+        """
+        epic = self.epics[epic_index]
+        old = epic.stories[story_index]
+        story = Story.from_dict(check_story(data))
+        story.sprint, story.key, story.task_keys = old.sprint, old.key, old.task_keys
+        epic.stories[story_index] = story
+        self.reindex()
+        return story
+
+    def __bool__(self) -> bool:
+        return bool(self.epics)
+
+    def story_count(self) -> int:
+        return sum(len(e.stories) for e in self.epics)
+
+    def is_pushed(self) -> bool:
+        """Has any part of the plan been created in Jira yet?"""
+        return bool(self.pushed_keys)
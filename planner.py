@@ -0,0 +1,173 @@
+"""Local capacity-based sprint planning.
+
+Stories are packed into sprints by team velocity (first-fit bin-packing over
+the story points). Epics are placed in the order the LLM returned them, moved
+back where needed so that every epic comes after the epics in its
+``depends_on``. An epic never starts before the epic placed in front of it
+and starts only after its dependencies are finished.
+"""
+
+import heapq
+from sys import intern
+
+from plan_model import Epic, Sprint
+
+DEFAULT_VELOCITY = 20
+
+
+class SprintPacker:
+    """Packs epics into sprints one at a time.
+
+    The packer is incremental, so it can also place epics while they are
+    still arriving. Each packed story gets the name of its sprint in
+    ``story.sprint``.
+
+    Args:
+        velocity (int): Story points a sprint can take.
+        prefix (str): Prefix of the generated sprint names.
+    """
+
+    def __init__(self, velocity: int = DEFAULT_VELOCITY, prefix: str = "Sprint"):
+        self.velocity = max(int(velocity), 1)
+        self.prefix = prefix
+        self.sprints: list[Sprint] = []
+        self._free: list[int] = []
+        self._first_open = 0  # all sprints before are full
+        self._last_start = 0  # start sprint of the previous epic
+        self._epic_end: dict[str, int] = {}
+
+    def _new_sprint(self) -> int:
+        idx = len(self.sprints)
+        self.sprints.append(Sprint(name=intern(f"{self.prefix} {idx + 1}")))
+        self._free.append(self.velocity)
+        return idx
+
+    def _place(self, points: int, earliest: int) -> int:
+        idx = max(earliest, self._first_open)
+        while idx < len(self._free) and self._free[idx] < points:
+            idx += 1
+        if idx >= len(self._free):
+            # nothing fits: open a new sprint (oversized stories end up alone)
+            idx = self._new_sprint()
+        self._free[idx] -= points
+        while self._first_open < len(self._free) and self._free[self._first_open] <= 0:
+            self._first_open += 1
+        return idx
+
+    def add_epic(self, epic: Epic) -> None:
+        """Places all stories of ``epic`` and records its sprint range.
+
+        Only dependencies that were added before are respected, see
+        ``order_epics`` for sorting a complete list first.
+        """
+        name = epic.name
+        earliest = self._last_start
+        for dep in epic.depends_on:
+            if dep in self._epic_end:
+                earliest = max(earliest, self._epic_end[dep] + 1)
+
+        start = end = None
+        for story in epic.stories:
+            points = max(story.points, 1)
+            idx = self._place(points, earliest)
+            sprint = self.sprints[idx]
+            sprint.points += points
+            # stories of one epic are placed in a row, so checking the last
+            # entry is enough to keep the list unique
+            if not sprint.epics or sprint.epics[-1] != name:
+                sprint.epics.append(name)
+            story.sprint = sprint.name
+            start = idx if start is None else min(start, idx)
+            end = idx if end is None else max(end, idx)
+
+        if start is not None:
+            self._last_start = start
+            self._epic_end[name] = end
+
+    def result(self) -> list[Sprint]:
+        """Returns the sprints with a goal naming their epics."""
+        for sprint in self.sprints:
+            sprint.goal = "Fokus: " + ", ".join(sprint.epics)
+        return self.sprints
+
+
+def order_epics(epics: list[Epic]) -> list[Epic]:
+    """
+    Sorts epics so that each one follows the epics it depends on.
+
+    Otherwise the given order is kept. Dependencies on epics that are not in
+    the list are ignored.
+
+    Args:
+        epics (list[Epic]): The epics of the plan.
+
+    Returns:
+        list[Epic]: The epics in dependency order.
+
+    Raises:
+        ValueError: If the dependencies form a cycle.
+    """
+
+    index = {e.name: i for i, e in enumerate(epics)}
+    deps = [
+        {index[d] for d in e.depends_on if d in index} - {i}
+        for i, e in enumerate(epics)
+    ]
+    dependents: list[list[int]] = [[] for _ in epics]
+    for i, ds in enumerate(deps):
+        for d in ds:
+            dependents[d].append(i)
+
+    # Kahn's algorithm, always taking the earliest ready epic
+    missing = [len(ds) for ds in deps]
+    ready = [i for i, n in enumerate(missing) if n == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        i = heapq.heappop(ready)
+        order.append(epics[i])
+        for j in dependents[i]:
+            missing[j] -= 1
+            if missing[j] == 0:
+                heapq.heappush(ready, j)
+
+    if len(order) < len(epics):
+        raise ValueError(
+            "Zyklische Abhängigkeit zwischen Epics: " + _cycle(epics, deps, missing)
+        )
+    return order
+
+
+def _cycle(epics: list[Epic], deps: list[set[int]], missing: list[int]) -> str:
+    """Describes one dependency cycle among the epics left over by Kahn."""
+    # every leftover epic depends on another leftover one, so following
+    # those edges must run into a cycle
+    node = next(i for i, n in enumerate(missing) if n)
+    seen: list[int] = []
+    while node not in seen:
+        seen.append(node)
+        node = min(d for d in deps[node] if missing[d])
+    cycle = seen[seen.index(node) :] + [node]
+    return " → ".join(epics[i].name for i in cycle)
+
+
+def plan_sprints(epics: list[Epic], velocity: int = DEFAULT_VELOCITY) -> list[Sprint]:
+    """
+    Packs the stories of ``epics`` into sprints.
+
+    Args:
+        epics (list[Epic]): The epics of the plan; they are packed in
+            dependency order (see ``order_epics``).
+        velocity (int, optional): Story points per sprint. Defaults to 20.
+
+    Returns:
+        list[Sprint]: The sprints, every story has its ``sprint`` set.
+
+    Raises:
+        ValueError: If the epic dependencies form a cycle.
+    """
+
+    packer = SprintPacker(velocity)
+    for epic in order_epics(epics):
+        packer.add_epic(epic)
+    return packer.result()
@@ -0,0 +1,181 @@
+"""Pushes a plan to Jira and reports every created issue as an event.
+
+``push_plan`` runs the whole push (board, duplicate index, sprints, epics,
+stories, sub-tasks) and calls ``on_event`` after each Jira operation, so the
+UI can show progress while the push is still running. The task mode of the
+project (``jira_client.task_mode``) decides whether the tasks of a story
+become sub-tasks or a checklist in its description. ``PlanPusher`` does
+the single steps, ``pipeline`` uses it to push epics as they are generated.
+"""
+
+import time
+from dataclasses import dataclass
+
+from dedup import story_text
+from plan_model import Plan
+from search_index import index_pushed
+from jira_client import (
+    add_issue_to_sprint,
+    create_epic,
+    create_sprint,
+    create_story,
+    duplicate_index,
+    ensure_board,
+    task_mode,
+    wants_subtasks,
+)
+
+
+@dataclass(slots=True)
+class PushEvent:
+    kind: str  # "sprint", "epic", "story", "subtask" or "skip"
+    key: str  # Jira key (sprint id for sprints, duplicate key for skips)
+    name: str
+    seconds: float  # latency of the Jira call(s)
+    done: int  # issues handled so far
+    total: int  # issues in the plan
+    saved: int = 0  # sub-task creations saved by the task mode so far
+
+
+def epic_operations(epic, mode: str = "subtasks", threshold: int = 0) -> int:
+    """Number of issues (epic, stories, sub-tasks) a push of ``epic`` creates."""
+    return 1 + sum(
+        1 + (len(s.tasks) if wants_subtasks(mode, threshold, s.points) else 0)
+        for s in epic.stories
+    )
+
+
+def count_operations(plan: Plan, project_key: str | None = None) -> int:
+    """Number of sprints, epics, stories and sub-tasks a push creates."""
+    mode, threshold = task_mode(project_key)
+    return len(plan.sprints) + sum(
+        epic_operations(e, mode, threshold) for e in plan.epics
+    )
+
+
+class PlanPusher:
+    """Creates the parts of a plan in Jira one at a time and reports them.
+
+    Epics and sprints are created lazily the first time a story needs them,
+    so the parts can be pushed in any order, also while the plan is still
+    being generated. Created keys and sprint ids are stored on the plan nodes
+    (and in ``plan.pushed_keys``) for a later ``reconcile.sync_plan``.
+
+    Args:
+        jira: An instance of the JIRA client.
+        plan (Plan): The plan the pushed parts belong to.
+        project_key (str): The key of the target project.
+        on_event (callable): Called with a ``PushEvent`` after every operation.
+        total (int, optional): Operations expected so far, can be raised
+            later through ``total``. Defaults to 0.
+    """
+
+    def __init__(self, jira, plan: Plan, project_key: str, on_event, total: int = 0):
+        self.jira = jira
+        self.plan = plan
+        self.project_key = project_key
+        self.on_event = on_event
+        self.total = total
+        self.done = 0
+        self.board_id = ensure_board(jira, project_key)
+        # shared with the backlog mirror, create_story adds every new story
+        self.dup_index = duplicate_index(jira, project_key)
+        self.epic_keys: dict[str, str] = {}
+        self.task_mode, self.task_threshold = task_mode(project_key)
+        self.saved = 0
+
+    def emit(self, kind, key, name, seconds, count=1):
+        self.done += count
+        self.on_event(
+            PushEvent(
+                kind, str(key), name, seconds, self.done, self.total, self.saved
+            )
+        )
+
+    def uses_subtasks(self, story) -> bool:
+        """Are the tasks of ``story`` created as sub-tasks in this project?"""
+        return wants_subtasks(self.task_mode, self.task_threshold, story.points)
+
+    def sprint_id(self, sprint) -> int:
+        """Returns the Jira id of ``sprint``, creating the sprint on first use."""
+        if sprint.sprint_id is None:
+            t0 = time.perf_counter()
+            sprint.sprint_id = create_sprint(
+                self.jira, self.board_id, sprint.name, days=14
+            )
+            self.emit("sprint", sprint.sprint_id, sprint.name, time.perf_counter() - t0)
+        return sprint.sprint_id
+
+    def epic_key(self, epic) -> str:
+        """Returns the key of ``epic``, creating the epic on first use."""
+        # epics can span several sprints, create them only once
+        epic_key = self.epic_keys.get(epic.name)
+        if epic_key is None:
+            t0 = time.perf_counter()
+            epic_key = create_epic(self.jira, self.project_key, epic.name)
+            self.epic_keys[epic.name] = epic.key = epic_key
+            self.plan.pushed_keys.add(epic_key)
+            self.emit("epic", epic_key, epic.name, time.perf_counter() - t0)
+        return epic_key
+
+    def push_story(self, epic, story, sprint_id: int | None) -> None:
+        """Creates ``story`` with its sub-tasks unless it is a duplicate."""
+        data = story.to_dict()
+        text = story_text(data)
+        subtasks = self.uses_subtasks(story)
+        dup = self.dup_index.best_match(text)
+        if dup:
+            count = 1 + (len(story.tasks) if subtasks else 0)
+            self.emit("skip", dup[0], story.summary, 0.0, count)
+            return
+        if not subtasks:
+            self.saved += len(story.tasks)
+        epic_key = self.epic_key(epic)
+        task_keys = []
+
+        def on_created(kind, key, name, seconds):
+            if kind == "subtask":
+                task_keys.append((name, key))
+            self.plan.pushed_keys.add(key)
+            self.emit(kind, key, name, seconds)
+
+        story_key = create_story(
+            self.jira, self.project_key, epic_key, data, on_created, subtasks
+        )
+        story.key, story.task_keys = story_key, tuple(task_keys)
+        if sprint_id is not None:
+            add_issue_to_sprint(self.jira, sprint_id, story_key)
+
+
+def push_plan(jira, plan: Plan, project_key: str, on_event) -> dict[str, str]:
+    """
+    Creates sprints, epics, stories and sub-tasks of ``plan`` in Jira.
+
+    Stories that look like duplicates of existing issues are skipped.
+    Stories without a sprint go to the backlog, epics without stories are
+    still created. The created keys and sprint ids are stored on the plan
+    nodes (and in ``plan.pushed_keys``) for a later ``reconcile.sync_plan``.
+
+    Args:
+        jira: An instance of the JIRA client.
+        plan (Plan): The plan to push.
+        project_key (str): The key of the target project.
+        on_event (callable): Called with a ``PushEvent`` after every operation.
+
+    Returns:
+        dict[str, str]: Epic name → epic key.
+    """
+
+    total = count_operations(plan, project_key)
+    pusher = PlanPusher(jira, plan, project_key, on_event, total)
+    for sp in plan.sprints:
+        sprint_id = pusher.sprint_id(sp)
+        for epic, story in plan.stories_by_sprint.get(sp.name, ()):
+            pusher.push_story(epic, story, sprint_id)
+
+    for epic, story in plan.unplanned():
+        pusher.push_story(epic, story, None)
+    for epic in plan.epics:
+        pusher.epic_key(epic)
+    index_pushed(plan.epics, plan.description)
+    return pusher.epic_keys
@@ -0,0 +1,460 @@
+"""Brings Jira in line with an edited plan using as few requests as possible.
+
+After a push every plan node knows its Jira key (sprints their id). A sync
+reads the current state of the project from the backlog mirror (one
+incremental search), maps nodes without a key to issues the plan pushed
+before (epics by name, stories with the duplicate index) and computes a diff
+without touching the plan:
+
+* create: new sprints, epics, stories and sub-tasks (or checklists, see
+  ``jira_client.task_mode``; pushed stories keep their sub-tasks or
+  checklist when the mode changes)
+* update: only the fields that differ (summary, description, points)
+* move: stories whose sprint or epic changed, grouped per target
+* close: issues a push created whose node is no longer in the plan
+
+``apply_changes`` then creates issues with bulk creates, moves them with one
+call per sprint or epic and closes them with bulk transitions (Jira Cloud),
+each in chunks of ``BULK_LIMIT``. Jira has no bulk edit for per-issue
+values, so only changed issues are updated, one request each. Re-syncing a
+large plan after a few edits therefore costs a handful of requests instead
+of a full push.
+"""
+
+from dataclasses import dataclass, field
+
+from backlog_mirror import get_mirror
+from cache import jira_cache
+from dedup import story_text
+from plan_model import Epic, Plan, Sprint, Story
+from search_index import index_pushed
+from jira_client import (
+    BULK_LIMIT,
+    CHECKLIST_HEADING,
+    TASK_MODES,
+    BulkCreateError,
+    create_issues_bulk,
+    create_sprint,
+    done_transition,
+    ensure_board,
+    epic_fields,
+    get_create_fields,
+    list_sprints,
+    move_to_backlog,
+    move_to_epic,
+    story_fields,
+    subtask_fields,
+    task_mode,
+    transition_issue,
+    transition_issues_bulk,
+    update_issue_fields,
+    wants_subtasks,
+)
+
+# fields a story update may touch; everything else on the issue is left alone
+_STORY_FIELDS = ("summary", "description")
+
+
+@dataclass(slots=True)
+class Changes:
+    sprints: list[Sprint] = field(default_factory=list)
+    epics: list[Epic] = field(default_factory=list)
+    stories: list[tuple[Epic, Story]] = field(default_factory=list)
+    subtasks: list[tuple[Story, str]] = field(default_factory=list)
+    updates: dict[str, dict] = field(default_factory=dict)
+    # target sprint name (None = backlog) -> stories to move there
+    moves: dict[str | None, list[Story]] = field(default_factory=dict)
+    # existing stories that belong to another (or a new) epic now
+    epic_moves: list[tuple[Epic, Story]] = field(default_factory=list)
+    # (key, issue type, status) of issues to close
+    close: list[tuple[str, str, str]] = field(default_factory=list)
+    # keys of issues apply_changes could not close, they stay pushed
+    not_closed: list[str] = field(default_factory=list)
+    # stories left out because they duplicate an existing issue
+    duplicates: int = 0
+    # task mode and point threshold of the project
+    task_mode: tuple[str, int] = ("subtasks", 0)
+    # tasks of new stories written as checklist instead of sub-tasks
+    saved: int = 0
+    # mapping of plan nodes to Jira, written back by apply_mapping
+    sprint_ids: list[tuple[Sprint, int]] = field(default_factory=list)
+    keys: list[tuple[Epic | Story, str | None]] = field(default_factory=list)
+    task_keys: list[tuple[Story, tuple]] = field(default_factory=list)
+    # pushed keys whose issue was deleted in Jira
+    forget: set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return any(
+            (
+                self.sprints,
+                self.epics,
+                self.stories,
+                self.subtasks,
+                self.updates,
+                self.moves,
+                self.epic_moves,
+                self.close,
+            )
+        )
+
+    def summary(self) -> str:
+        moved = sum(len(s) for s in self.moves.values()) + len(self.epic_moves)
+        text = (
+            f"{len(self.sprints)} Sprints, {len(self.epics)} Epics, "
+            f"{len(self.stories)} Stories und {len(self.subtasks)} Sub-Tasks neu · "
+            f"{len(self.updates)} geändert · {moved} verschoben · "
+            f"{len(self.close)} geschlossen"
+        )
+        if self.duplicates:
+            text += f" · {self.duplicates} Duplikate übersprungen"
+        if self.saved:
+            mode = TASK_MODES[self.task_mode[0]]
+            text += f" · {self.saved} API-Aufrufe gespart ({mode})"
+        if self.not_closed:
+            text += (
+                f"\n\n{len(self.not_closed)} Issues konnten nicht geschlossen "
+                f"werden: {', '.join(self.not_closed)}"
+            )
+        return text
+
+    def uses_subtasks(self, story: Story) -> bool:
+        return wants_subtasks(*self.task_mode, story.points)
+
+
+def _chunks(items: list, size: int = BULK_LIMIT):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _story_update(
+    jira, project_key: str, story: Story, row, checklist=False
+) -> dict:
+    """Returns the fields of ``story`` that differ from its mirrored issue.
+
+    The epic is not compared, epic changes are moves (``Changes.epic_moves``).
+    """
+    want = story_fields(jira, project_key, None, story.to_dict(), checklist)
+    meta = get_create_fields(jira, project_key, "Story")
+    changed = {f: want[f] for f in _STORY_FIELDS if (row[f] or "") != want[f]}
+    points = meta.get("story_points")
+    if points in want and row["points"] != want[points]:
+        changed[points] = want[points]
+    return changed
+
+
+def diff_plan(jira, plan: Plan, project_key: str) -> Changes:
+    """
+    Computes what has to change in Jira so it matches ``plan``.
+
+    The backlog mirror is synced first. Plan nodes whose issue is gone lose
+    their key (they are created again). Nodes without a key are mapped to
+    issues this plan pushed before (epics by name, stories with the
+    duplicate index). Stories that match any other issue count as
+    duplicates and are left out; such issues are never touched. The plan
+    itself is not changed: the new mapping is part of the result and is
+    written back by ``apply_changes`` (or ``apply_mapping``).
+
+    Args:
+        jira: An instance of the JIRA client.
+        plan (Plan): The edited plan.
+        project_key (str): The key of the target project.
+
+    Returns:
+        Changes: The diff, ready for ``apply_changes``.
+    """
+
+    mirror = get_mirror()
+    mirror.sync(jira, project_key)
+    rows = {r["key"]: r for r in mirror.issues(project_key)}
+    changes = Changes(task_mode=task_mode(project_key))
+
+    # ---------- sprints ----------
+    board_sprints = None
+    sprint_ids: dict[str, int | None] = {}
+    for sp in plan.sprints:
+        sprint_id = sp.sprint_id
+        if sprint_id is None:
+            if board_sprints is None:
+                board_id = ensure_board(jira, project_key)
+                board_sprints = {
+                    s["name"]: s["id"] for s in list_sprints(jira, board_id)
+                }
+            sprint_id = board_sprints.get(sp.name)
+            if sprint_id is None:
+                changes.sprints.append(sp)
+            else:
+                changes.sprint_ids.append((sp, sprint_id))
+        sprint_ids[sp.name] = sprint_id
+
+    # ---------- map nodes to issues ----------
+    # id(node) -> key as it will be after apply_mapping
+    key_of: dict[int, str | None] = {}
+    task_keys_of: dict[int, tuple] = {}
+    for epic in plan.epics:
+        for node in (epic, *epic.stories):
+            key_of[id(node)] = node.key if node.key in rows else None
+    # only issues this plan created may be adopted by another node
+    adoptable = (plan.pushed_keys & rows.keys()) - set(key_of.values())
+
+    epics_by_name = {
+        r["summary"]: k
+        for k, r in rows.items()
+        if r["issuetype"] == "Epic" and k in adoptable
+    }
+    # the mirror's live index, shared with pushes: read it, never change it
+    dup_index = mirror.duplicate_index(project_key)
+    claimed: set[str] = set()
+    skipped: set[int] = set()
+    for epic in plan.epics:
+        if key_of[id(epic)] is None and epic.name in epics_by_name:
+            key_of[id(epic)] = epics_by_name.pop(epic.name)
+        for story in epic.stories:
+            if key_of[id(story)] is not None:
+                continue
+            match = next(
+                (
+                    hit
+                    for hit in dup_index.query(story_text(story.to_dict()))
+                    if hit[0] in rows
+                    and hit[0] not in claimed
+                    and rows[hit[0]]["issuetype"] not in ("Epic", None)
+                ),
+                None,
+            )
+            if match is None:
+                continue
+            if match[0] not in adoptable:
+                # like the push: no second copy of an existing issue, and
+                # issues created by hand or by other plans are left alone
+                skipped.add(id(story))
+                continue
+            key = match[0]
+            key_of[id(story)] = key
+            adoptable.discard(key)
+            claimed.add(key)
+            # adopt the sub-tasks pushed for the issue
+            task_keys_of[id(story)] = tuple(
+                (r["summary"], k)
+                for k, r in rows.items()
+                if r["parent"] == key and k in plan.pushed_keys
+            )
+
+    for epic in plan.epics:
+        for node in (epic, *epic.stories):
+            if key_of[id(node)] != node.key:
+                changes.keys.append((node, key_of[id(node)]))
+
+    # ---------- diff ----------
+    live: set[str] = set()
+    for epic in plan.epics:
+        epic_key = key_of[id(epic)]
+        if epic_key is None:
+            changes.epics.append(epic)
+        else:
+            live.add(epic_key)
+            if rows[epic_key]["summary"] != epic.name:
+                changes.updates[epic_key] = {"summary": epic.name}
+
+        for story in epic.stories:
+            sprint = plan.sprint_by_name.get(story.sprint)
+            if id(story) in skipped:
+                changes.duplicates += 1
+                continue
+            story_key = key_of[id(story)]
+            if story_key is None:
+                subtasks = changes.uses_subtasks(story)
+                wanted = story.tasks if subtasks else []
+                changes.stories.append((epic, story))
+                changes.subtasks.extend((story, t) for t in wanted)
+                changes.saved += len(story.tasks) - len(wanted)
+                if sprint is not None:
+                    changes.moves.setdefault(sprint.name, []).append(story)
+                continue
+
+            row = rows[story_key]
+            live.add(story_key)
+            task_keys = task_keys_of.get(id(story), story.task_keys)
+            # a pushed story keeps its sub-tasks or its checklist, the task
+            # mode only decides for stories that had no tasks yet
+            if task_keys:
+                subtasks = True
+            elif CHECKLIST_HEADING in (row["description"] or ""):
+                subtasks = False
+            else:
+                subtasks = changes.uses_subtasks(story)
+            wanted = story.tasks if subtasks else []
+            update = _story_update(
+                jira, project_key, story, row, checklist=not subtasks
+            )
+            if update:
+                changes.updates[story_key] = update
+            if epic_key is None or row["epic"] != epic_key:
+                changes.epic_moves.append((epic, story))
+            target = sprint_ids[sprint.name] if sprint is not None else None
+            if sprint is not None and (target is None or row["sprint_id"] != target):
+                changes.moves.setdefault(sprint.name, []).append(story)
+            elif sprint is None and row["sprint_id"] is not None:
+                changes.moves.setdefault(None, []).append(story)
+
+            existing = {s: k for s, k in task_keys if k in rows}
+            # sub-tasks of removed tasks are closed
+            kept = tuple((s, k) for s, k in existing.items() if s in wanted)
+            if kept != story.task_keys:
+                changes.task_keys.append((story, kept))
+            live.update(k for _, k in kept)
+            changes.subtasks.extend((story, t) for t in wanted if t not in existing)
+
+    for key in sorted(plan.pushed_keys - live):
+        row = rows.get(key)
+        if row is None:
+            changes.forget.add(key)  # deleted in Jira meanwhile
+        else:
+            changes.close.append((key, row["issuetype"], row["status"]))
+    return changes
+
+
+def apply_mapping(plan: Plan, changes: Changes) -> None:
+    """Writes the keys and sprint ids found by ``diff_plan`` to the plan."""
+    for sprint, sprint_id in changes.sprint_ids:
+        sprint.sprint_id = sprint_id
+    for node, key in changes.keys:
+        node.key = key
+    for story, task_keys in changes.task_keys:
+        story.task_keys = task_keys
+    plan.pushed_keys -= changes.forget
+
+
+def apply_changes(jira, plan: Plan, project_key: str, changes: Changes) -> int:
+    """
+    Applies a diff of ``diff_plan`` with batched Jira calls.
+
+    The mapping found by the diff and the new keys and sprint ids are stored
+    on the plan nodes and in ``plan.pushed_keys``, also when a bulk create
+    fails halfway. Closed issues are dropped from it; issues Jira refused to
+    close stay and are listed in ``changes.not_closed``.
+
+    Args:
+        jira: An instance of the JIRA client.
+        plan (Plan): The plan the diff was computed for.
+        project_key (str): The key of the target project.
+        changes (Changes): The diff.
+
+    Returns:
+        int: The number of Jira requests that were made (without the status
+        polls of bulk transitions).
+    """
+
+    requests = 0
+    apply_mapping(plan, changes)
+
+    if changes.sprints:
+        board_id = ensure_board(jira, project_key)
+        for sp in changes.sprints:
+            sp.sprint_id = create_sprint(jira, board_id, sp.name, days=14)
+            requests += 1
+
+    def create(items: list, build, assign) -> None:
+        nonlocal requests
+        for chunk in _chunks(items):
+            keys: list[str | None] = []
+            requests += 1
+            try:
+                keys = create_issues_bulk(jira, chunk, build)
+            except BulkCreateError as exc:
+                keys = exc.keys  # a later sync must not create them again
+                raise
+            finally:
+                for item, key in zip(chunk, keys):
+                    if key is not None:
+                        assign(item, key)
+                        plan.pushed_keys.add(key)
+
+    def assign_epic(epic: Epic, key: str) -> None:
+        epic.key = key
+
+    def assign_story(item: tuple[Epic, Story], key: str) -> None:
+        item[1].key, item[1].task_keys = key, ()
+
+    def assign_subtask(item: tuple[Story, str], key: str) -> None:
+        story, summary = item
+        story.task_keys += ((summary, key),)
+
+    create(
+        changes.epics,
+        lambda e: epic_fields(jira, project_key, e.name),
+        assign_epic,
+    )
+    create(
+        changes.stories,
+        lambda es: story_fields(
+            jira,
+            project_key,
+            es[0].key,
+            es[1].to_dict(),
+            checklist=not changes.uses_subtasks(es[1]),
+        ),
+        assign_story,
+    )
+    create(
+        changes.subtasks,
+        lambda st: subtask_fields(jira, project_key, st[0].key, st[1]),
+        assign_subtask,
+    )
+
+    for key, fields in changes.updates.items():
+        update_issue_fields(jira, key, fields)
+        requests += 1
+
+    for sprint_name, stories in changes.moves.items():
+        for chunk in _chunks([s.key for s in stories]):
+            if sprint_name is None:
+                move_to_backlog(jira, chunk)
+            else:
+                sprint_id = plan.sprint_by_name[sprint_name].sprint_id
+                jira.add_issues_to_sprint(sprint_id, chunk)
+            requests += 1
+
+    by_epic: dict[str, list[str]] = {}
+    for epic, story in changes.epic_moves:
+        by_epic.setdefault(epic.key, []).append(story.key)
+    for epic_key, keys in by_epic.items():
+        for chunk in _chunks(keys):
+            requests += move_to_epic(jira, project_key, epic_key, chunk)
+
+    # the done transition depends on the workflow, i.e. on type and status
+    transitions: dict[tuple[str, str], str | None] = {}
+    closing: list[tuple[str, str]] = []
+    for key, issuetype, status in changes.close:
+        if (issuetype, status) not in transitions:
+            transitions[(issuetype, status)] = done_transition(jira, key)
+            requests += 1
+        transition = transitions[(issuetype, status)]
+        if transition is None:
+            changes.not_closed.append(key)  # no way to done from its status
+        else:
+            closing.append((transition, key))
+    bulk = True
+    for chunk in _chunks(closing):
+        done = None
+        if bulk:
+            done = transition_issues_bulk(jira, chunk)
+            requests += 1
+        if done is None:
+            bulk = False  # no bulk API (Server/Data Center): one call per issue
+            done = {key for t, key in chunk if transition_issue(jira, key, t)}
+            requests += len(chunk)
+        for _, key in chunk:
+            if key in done:
+                plan.pushed_keys.discard(key)
+            else:
+                changes.not_closed.append(key)
+
+    jira_cache.invalidate(("issues", project_key))
+    index_pushed(plan.epics, plan.description)
+    return requests
+
+
+def sync_plan(jira, plan: Plan, project_key: str) -> tuple[Changes, int]:
+    """Diffs ``plan`` against Jira and applies the changes in one go."""
+    changes = diff_plan(jira, plan, project_key)
+    return changes, apply_changes(jira, plan, project_key, changes)
@@ -0,0 +1,266 @@
+"""Local full-text index over everything the LLM generated.
+
+Every brief, stack, epic, story, task, acceptance criterion and ticket that
+passes through ``ai.py`` is stored in a SQLite table with an FTS5 index on
+top (``~/.prinzcode_agent/search.db``). Every row remembers the brief it
+was generated for (the first line of the description), pushes add the Jira
+keys to the nodes of their own brief only. Queries are prefix searches
+ranked by bm25 and take a few milliseconds, so the search tab can run them
+on every key press.
+
+Indexing never breaks a generation or a push: any error in a hook is
+printed and otherwise ignored.
+"""
+
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(
+    os.path.expanduser("~"), ".prinzcode_agent", "search.db"
+)
+MAX_RESULTS = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    title TEXT NOT NULL,
+    body TEXT NOT NULL DEFAULT '',
+    context TEXT NOT NULL DEFAULT '',
+    brief TEXT NOT NULL DEFAULT '',
+    jira_key TEXT NOT NULL DEFAULT '',
+    created REAL NOT NULL,
+    UNIQUE (kind, title, body, context, brief)
+);
+CREATE INDEX IF NOT EXISTS docs_title ON docs(kind, title);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    title, body, context, jira_key,
+    content='docs', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS docs_ai AFTER INSERT ON docs BEGIN
+    INSERT INTO docs_fts (rowid, title, body, context, jira_key)
+    VALUES (new.id, new.title, new.body, new.context, new.jira_key);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_ad AFTER DELETE ON docs BEGIN
+    INSERT INTO docs_fts (docs_fts, rowid, title, body, context, jira_key)
+    VALUES ('delete', old.id, old.title, old.body, old.context, old.jira_key);
+END;
+CREATE TRIGGER IF NOT EXISTS docs_au AFTER UPDATE ON docs BEGIN
+    INSERT INTO docs_fts (docs_fts, rowid, title, body, context, jira_key)
+    VALUES ('delete', old.id, old.title, old.body, old.context, old.jira_key);
+    INSERT INTO docs_fts (rowid, title, body, context, jira_key)
+    VALUES (new.id, new.title, new.body, new.context, new.jira_key);
+END;
+"""
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _first_line(text: str, width: int = 80) -> str:
+    line = next((ln.strip() for ln in text.splitlines() if ln.strip()), "")
+    return line if len(line) <= width else line[: width - 1] + "…"
+
+
+def _match_query(text: str) -> str | None:
+    """Turns user input into an FTS5 query: all words, the last one as prefix."""
+    words = _TOKEN.findall(text)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*']
+    return " ".join(terms)
+
+
+def _story_rows(story: dict, epic: str, brief: str) -> list[tuple]:
+    summary = str(story.get("summary", ""))
+    criteria = [str(a) for a in story.get("acceptance_criteria") or ()]
+    tasks = [str(t) for t in story.get("tasks") or ()]
+    rows = [("story", summary, "\n".join(criteria + tasks), epic, brief)]
+    rows += [("task", t, "", summary, brief) for t in tasks]
+    rows += [("criterion", a, "", summary, brief) for a in criteria]
+    return rows
+
+
+class SearchIndex:
+    """FTS5 index of generated content.
+
+    Args:
+        path (str, optional): Database file. Defaults to
+            ``~/.prinzcode_agent/search.db``; ``":memory:"`` works too.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH) -> None:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    # ---------- writes ----------
+    def add(self, rows: list[tuple]) -> None:
+        """Adds ``(kind, title, body, context, brief)`` rows, known ones are skipped."""
+        now = time.time()
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO docs "
+                "(kind, title, body, context, brief, created) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(*row, now) for row in rows if row[1]],
+            )
+
+    def set_keys(self, keys: list[tuple]) -> None:
+        """Stores Jira keys given as ``(kind, title, context, brief, key)``.
+
+        Only rows with the same kind, title, context and brief get the key,
+        so equal names from other briefs stay unlinked.
+        """
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE docs SET jira_key = ? WHERE kind = ? AND title = ? "
+                "AND context = ? AND brief = ? AND jira_key != ?",
+                [(key, *where, key) for *where, key in keys],
+            )
+
+    # ---------- queries ----------
+    def search(self, text: str, kind: str | None = None, limit: int = MAX_RESULTS):
+        """
+        Finds indexed content.
+
+        Args:
+            text (str): Words to look for; the last one may be incomplete.
+            kind (str, optional): Only "brief", "stack", "epic", "story",
+                "task", "criterion" or "ticket".
+            limit (int, optional): Maximum number of hits. Defaults to 50.
+
+        Returns:
+            list[dict]: Hits with kind, title, body, context, brief, jira_key,
+            created and a ``snippet`` with the matches in [brackets], best
+            first.
+        """
+
+        query = _match_query(text)
+        if query is None:
+            return []
+        sql = (
+            "SELECT d.kind, d.title, d.body, d.context, d.brief, d.jira_key, "
+            "d.created, "
+            "snippet(docs_fts, -1, '[', ']', '…', 12) "
+            "FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid "
+            "WHERE docs_fts MATCH ?"
+        )
+        args: list = [query]
+        if kind:
+            sql += " AND d.kind = ?"
+            args.append(kind)
+        sql += " ORDER BY bm25(docs_fts, 4.0, 1.0, 0.5, 2.0) LIMIT ?"
+        args.append(limit)
+        cols = (
+            "kind",
+            "title",
+            "body",
+            "context",
+            "brief",
+            "jira_key",
+            "created",
+            "snippet",
+        )
+        with self._lock:
+            return [dict(zip(cols, row)) for row in self._db.execute(sql, args)]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+
+_index: SearchIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> SearchIndex:
+    """Returns the shared index, opened on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+    return _index
+
+
+def _safe(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        # not only database errors: a hook fed with an unexpected LLM answer
+        # must not fail the generation either
+        try:
+            fn(*args, **kwargs)
+        except Exception as exc:
+            print("⮕ Suchindex nicht aktualisiert:", exc)
+
+    return wrapper
+
+
+# ---------- hooks used by ai.py and the push ----------
+@_safe
+def index_stack(description: str, stack_yaml: str) -> None:
+    brief = _first_line(description)
+    rows = [("stack", "Tech-Stack", stack_yaml, brief, brief)]
+    if description.strip():
+        rows.append(("brief", brief, description, "", brief))
+    get_index().add(rows)
+
+
+@_safe
+def index_epics(epics, description: str = "") -> None:
+    """Indexes epic dicts (decomposition layout) with their stories."""
+    brief = _first_line(description)
+    rows = []
+    for epic in epics:
+        name = str(epic.get("epic", ""))
+        rows.append(("epic", name, "", brief, brief))
+        for story in epic.get("stories") or ():
+            rows += _story_rows(story, name, brief)
+    get_index().add(rows)
+
+
+@_safe
+def index_story(story: dict, epic: str = "", description: str = "") -> None:
+    get_index().add(_story_rows(story, epic, _first_line(description)))
+
+
+@_safe
+def index_tickets(prompt: str, tickets: list[dict]) -> None:
+    brief = _first_line(prompt)
+    rows = []
+    for ticket in tickets:
+        story, *children = _story_rows(ticket, brief, brief)
+        rows.append(("ticket", *story[1:]))
+        rows += children
+    get_index().add(rows)
+
+
+@_safe
+def index_ticket_key(summary: str, key: str, prompt: str = "") -> None:
+    brief = _first_line(prompt)
+    get_index().set_keys([("ticket", summary, brief, brief, key)])
+
+
+@_safe
+def index_pushed(epics, description: str = "") -> None:
+    """Stores the Jira keys of pushed plan nodes (``plan_model.Epic`` objects).
+
+    ``description`` is the brief the plan was generated from
+    (``Plan.description``).
+    """
+    brief = _first_line(description)
+    keys = []
+    for epic in epics:
+        if epic.key:
+            keys.append(("epic", epic.name, brief, brief, epic.key))
+        for story in epic.stories:
+            if story.key:
+                keys.append(("story", story.summary, epic.name, brief, story.key))
+            keys += [("task", t, story.summary, brief, k) for t, k in story.task_keys]
+    if keys:
+        get_index().set_keys(keys)
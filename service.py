@@ -0,0 +1,424 @@
+"""Long-running local service around ``ai.py`` and ``jira_client.py``.
+
+    python service.py [--port 8766] [--workers 4] [--token SECRET] [--webhook]
+
+The service keeps one process warm for the whole team (or for scripts): the
+pooled Jira client, the field discovery, ``jira_cache``, the backlog mirror
+and the model router stats are shared by all jobs. Jobs run on a bounded
+worker pool; their status can be polled or streamed.
+
+HTTP API (JSON, ``X-Token`` header if the service runs with ``--token``):
+
+    POST /jobs                {"type": "stack", "params": {...}} → 202 {"id", ...}
+    GET  /jobs                → the latest jobs
+    GET  /jobs/<id>?since=N   → status, result/error and events from N on
+    GET  /jobs/<id>/events    → NDJSON stream of the events, then the final status
+    GET  /health              → {"ok": true, "queued": n, "running": n}
+
+Job types and their params are listed in ``JOB_TYPES``; ``service_client.py``
+wraps the API for the Qt client and scripts.
+"""
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_PORT = 8766
+MAX_WORKERS = 4
+# finished jobs kept for polling, older ones are dropped
+MAX_JOBS = 200
+
+
+# ---------- job types ----------
+def _run_stack(params: dict, emit) -> dict:
+    from ai import suggest_stack
+
+    yaml_part, question = suggest_stack(params["description"])
+    return {"yaml": yaml_part, "question": question}
+
+
+def _run_revise(params: dict, emit) -> dict:
+    from ai import revise_stack
+
+    yaml_part, question = revise_stack(
+        params["yaml"], params["changes"], params.get("description", "")
+    )
+    return {"yaml": yaml_part, "question": question}
+
+
+def _run_decompose(params: dict, emit) -> dict:
+    from ai import decompose_project
+
+    return decompose_project(
+        params["description"], params["yaml"], index=params.get("index", True)
+    )
+
+
+def _run_ticket(params: dict, emit) -> list[dict]:
+    from ai import generate_ticket_content
+
+    return generate_ticket_content(params["prompt"])
+
+
+def _run_push(params: dict, emit) -> dict:
+    """Pushes ``epics`` (decomposition JSON), or generates and pushes them."""
+    from jira_client import get_jira
+    from plan_model import Plan
+    from planner import DEFAULT_VELOCITY
+
+    jira = get_jira()
+    velocity = int(params.get("velocity") or DEFAULT_VELOCITY)
+    saved = 0
+
+    def on_event(ev):
+        nonlocal saved
+        saved = ev.saved
+        emit(asdict(ev))
+
+    if params.get("epics") is not None:
+        from pusher import push_plan
+
+        plan = Plan.from_llm(params["epics"])
+        plan.description = params.get("description", "")
+        plan.schedule(velocity)
+        push_plan(jira, plan, params["project_key"], on_event)
+    else:
+        from ai import stream_decomposition
+        from pipeline import generate_and_push
+
+        epics = stream_decomposition(params["description"], params["yaml"])
+        plan = generate_and_push(
+            jira,
+            epics,
+            Plan(description=params["description"]),
+            params["project_key"],
+            on_event,
+            velocity,
+        )
+    return {
+        "epics": {e.name: e.key for e in plan.epics},
+        "sprints": {s.name: s.sprint_id for s in plan.sprints},
+        "pushed": len(plan.pushed_keys),
+        "saved": saved,
+    }
+
+
+# type → (handler, required params); handlers get (params, emit) and return
+# something JSON-serialisable, ``emit(dict)`` reports progress events
+JOB_TYPES = {
+    "stack": (_run_stack, ("description",)),
+    "revise": (_run_revise, ("yaml", "changes")),
+    "decompose": (_run_decompose, ("description", "yaml")),
+    "ticket": (_run_ticket, ("prompt",)),
+    # also needs "epics", or "description" and "yaml" to generate them
+    "push": (_run_push, ("project_key",)),
+}
+
+
+def check_params(kind: str, params: dict) -> None:
+    """
+    Checks that a job of type ``kind`` gets everything its handler reads.
+
+    Raises:
+        ValueError: If the type is unknown or parameters are missing.
+    """
+    if kind not in JOB_TYPES:
+        raise ValueError(f"Unbekannter Job-Typ: {kind}")
+    missing = [p for p in JOB_TYPES[kind][1] if p not in params]
+    if kind == "push" and params.get("epics") is None:
+        # without epics the push generates them first
+        missing += [p for p in ("description", "yaml") if not params.get(p)]
+    if missing:
+        raise ValueError(f"Fehlende Parameter: {', '.join(missing)}")
+
+
+def run_local(kind: str, params: dict, emit=None):
+    """Runs a job type in this process, without queue (used as client fallback)."""
+    check_params(kind, params)
+    handler, _ = JOB_TYPES[kind]
+    return handler(params, emit or (lambda ev: None))
+
+
+# ---------- queue ----------
+@dataclass(slots=True)
+class Job:
+    id: str
+    type: str
+    params: dict
+    status: str = "queued"  # "queued", "running", "done" or "failed"
+    result: object = None
+    error: str | None = None
+    events: list[dict] = field(default_factory=list)
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+
+    def view(self, since: int = 0) -> dict:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "events": self.events[since:],
+            "event_count": len(self.events),
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class JobQueue:
+    """Runs jobs on a bounded worker pool and keeps their status.
+
+    Args:
+        max_workers (int, optional): Jobs that run at the same time.
+            Defaults to 4, more are queued.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._ids = itertools.count(1)
+        # guards _jobs and the job fields, notified on every change
+        self._changed = threading.Condition()
+
+    def submit(self, kind: str, params: dict) -> Job:
+        check_params(kind, params)
+        with self._changed:
+            job = Job(id=str(next(self._ids)), type=kind, params=params)
+            self._jobs[job.id] = job
+            self._evict()
+        self._pool.submit(self._run, job)
+        return job
+
+    def _evict(self) -> None:
+        done = [j.id for j in self._jobs.values() if j.finished is not None]
+        for job_id in done[: max(len(done) - MAX_JOBS, 0)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job) -> None:
+        handler, _ = JOB_TYPES[job.type]
+
+        def emit(event: dict) -> None:
+            with self._changed:
+                job.events.append(event)
+                self._changed.notify_all()
+
+        with self._changed:
+            job.status, job.started = "running", time.time()
+            self._changed.notify_all()
+        try:
+            result = handler(job.params, emit)
+        except Exception as exc:
+            status, result, error = "failed", None, str(exc)
+        else:
+            status, error = "done", None
+        with self._changed:
+            job.status, job.result, job.error = status, result, error
+            job.finished = time.time()
+            self._changed.notify_all()
+
+    def get(self, job_id: str) -> Job | None:
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    def view(self, job_id: str, since: int = 0) -> dict | None:
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return job.view(since) if job else None
+
+    def views(self, limit: int = 50) -> list[dict]:
+        with self._changed:
+            jobs = list(self._jobs.values())[-limit:]
+            return [{**j.view(), "events": [], "result": None} for j in jobs]
+
+    def counts(self) -> dict[str, int]:
+        with self._changed:
+            statuses = [j.status for j in self._jobs.values()]
+        return {s: statuses.count(s) for s in ("queued", "running", "done", "failed")}
+
+    def follow(self, job_id: str, timeout: float = 15.0):
+        """Yields the events of a job as they arrive, then its final view."""
+        sent = 0
+        while True:
+            with self._changed:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                if len(job.events) == sent and job.finished is None:
+                    # wakes up regularly so the caller can send keep-alives
+                    self._changed.wait(timeout)
+                new = job.events[sent:]
+                finished = job.finished is not None
+                final = job.view(len(job.events)) if finished else None
+            for event in new:
+                yield {"event": event}
+            sent += len(new)
+            if finished:
+                yield {"job": final}
+                return
+            if not new:
+                yield None  # keep-alive
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------- HTTP ----------
+def _make_handler(jobs: JobQueue, token: str):
+    class ServiceHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status: int, body) -> None:
+            data = json.dumps(body, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorized(self) -> bool:
+            if token and self.headers.get("X-Token") != token:
+                self._send_json(403, {"error": "Token fehlt oder ist falsch"})
+                return False
+            return True
+
+        def do_GET(self):
+            if not self._authorized():
+                return
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            if parts == ["health"]:
+                self._send_json(200, {"ok": True, **jobs.counts()})
+            elif parts == ["jobs"]:
+                self._send_json(200, jobs.views())
+            elif len(parts) == 2 and parts[0] == "jobs":
+                try:
+                    since = int(parse_qs(url.query).get("since", ["0"])[0] or 0)
+                    if since < 0:
+                        raise ValueError(since)
+                except ValueError:
+                    self._send_json(400, {"error": "since muss eine Zahl ≥ 0 sein"})
+                    return
+                view = jobs.view(parts[1], since)
+                if view is None:
+                    self._send_json(404, {"error": "Unbekannter Job"})
+                else:
+                    self._send_json(200, view)
+            elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+                self._stream(parts[1])
+            else:
+                self._send_json(404, {"error": "Unbekannter Pfad"})
+
+        def _stream(self, job_id: str) -> None:
+            if jobs.get(job_id) is None:
+                self._send_json(404, {"error": "Unbekannter Job"})
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            try:
+                for item in jobs.follow(job_id):
+                    line = json.dumps(item, default=str) if item else ""
+                    self.wfile.write(line.encode("utf-8") + b"\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client stopped listening, the job keeps running
+
+        def do_POST(self):
+            if not self._authorized():
+                return
+            if urlparse(self.path).path != "/jobs":
+                self._send_json(404, {"error": "Unbekannter Pfad"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                job = jobs.submit(body.get("type", ""), body.get("params") or {})
+            except (ValueError, AttributeError) as exc:
+                self._send_json(400, {"error": str(exc)})
+                return
+            self._send_json(202, job.view())
+
+        def log_message(self, format, *args):
+            print("⮕ Service:", format % args)
+
+    return ServiceHandler
+
+
+def start_service(
+    port: int = DEFAULT_PORT,
+    host: str = "127.0.0.1",
+    token: str = "",
+    max_workers: int = MAX_WORKERS,
+) -> tuple[ThreadingHTTPServer, JobQueue]:
+    """
+    Starts the service in a daemon thread.
+
+    Args:
+        port (int, optional): Port to listen on. Defaults to 8766.
+        host (str, optional): Interface to bind. Defaults to localhost only.
+        token (str, optional): If set, requests need an ``X-Token`` header.
+        max_workers (int, optional): Jobs that run at the same time.
+
+    Returns:
+        tuple[ThreadingHTTPServer, JobQueue]: The running server (call
+        ``shutdown()`` to stop it) and its job queue.
+    """
+
+    jobs = JobQueue(max_workers)
+    server = ThreadingHTTPServer((host, port), _make_handler(jobs, token))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, jobs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prinz-Code Agent als Dienst")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--token", default="")
+    parser.add_argument(
+        "--webhook",
+        action="store_true",
+        help="Jira-Webhooks empfangen, damit der geteilte Cache aktuell bleibt",
+    )
+    args = parser.parse_args()
+
+    import dotenv
+
+    dotenv.load_dotenv()
+    server, jobs = start_service(args.port, args.host, args.token, args.workers)
+    print(f"⮕ Dienst läuft auf http://{args.host}:{args.port}", end=" ")
+    print(f"({args.workers} Worker)")
+    if args.webhook:
+        from PySide6.QtCore import QSettings
+
+        from webhook import DEFAULT_PORT as WEBHOOK_PORT, start_listener
+
+        settings = QSettings("PrinzCodeAgent")
+        start_listener(
+            port=settings.value("webhook/port", WEBHOOK_PORT, type=int),
+            host=args.host,
+            secret=settings.value("webhook/secret", "", type=str),
+        )
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        jobs.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Client for the local service (``service.py``).
+
+    from service_client import ServiceClient
+
+    client = ServiceClient("http://127.0.0.1:8766")
+    job = client.submit("stack", description="Eine Todo-App mit Login")
+    result = client.wait(job)
+
+``run_job`` is what the Qt client uses: it sends the job to the service if
+``service/url`` is set in the settings and runs it in-process otherwise.
+"""
+
+import json
+import time
+import urllib.error
+import urllib.request
+
+from service import DEFAULT_PORT, run_local
+
+
+class ServiceError(RuntimeError):
+    pass
+
+
+class ServiceClient:
+    """Submits jobs to the service and follows them.
+
+    Args:
+        url (str, optional): Base URL of the service.
+        token (str, optional): Value of the ``X-Token`` header, if required.
+    """
+
+    def __init__(self, url: str = f"http://127.0.0.1:{DEFAULT_PORT}", token: str = ""):
+        self.url = url.rstrip("/")
+        self.token = token
+
+    def _request(self, method: str, path: str, body=None, timeout: float = 30):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = urllib.request.Request(self.url + path, data=data, method=method)
+        req.add_header("Content-Type", "application/json")
+        if self.token:
+            req.add_header("X-Token", self.token)
+        try:
+            return urllib.request.urlopen(req, timeout=timeout)
+        except urllib.error.HTTPError as exc:
+            try:
+                msg = json.loads(exc.read()).get("error", exc.reason)
+            except ValueError:
+                msg = exc.reason
+            raise ServiceError(f"Dienst: {msg}") from exc
+        except urllib.error.URLError as exc:
+            raise ServiceError(f"Dienst nicht erreichbar: {exc.reason}") from exc
+
+    def _json(self, method: str, path: str, body=None):
+        with self._request(method, path, body) as res:
+            return json.loads(res.read())
+
+    def health(self) -> dict:
+        return self._json("GET", "/health")
+
+    def submit(self, kind: str, **params) -> str:
+        """Queues a job and returns its id."""
+        return self._json("POST", "/jobs", {"type": kind, "params": params})["id"]
+
+    def status(self, job_id: str, since: int = 0) -> dict:
+        return self._json("GET", f"/jobs/{job_id}?since={since}")
+
+    def events(self, job_id: str):
+        """Yields the events of a job as they happen, then returns its final view."""
+        with self._request("GET", f"/jobs/{job_id}/events", timeout=None) as res:
+            for line in res:
+                if not line.strip():
+                    continue  # keep-alive
+                item = json.loads(line)
+                if "job" in item:
+                    return item["job"]
+                yield item["event"]
+        raise ServiceError("Dienst: Verbindung während des Jobs abgebrochen")
+
+    def wait(self, job_id: str, on_event=None, poll: float = 0.5, timeout=None):
+        """
+        Polls a job until it is finished.
+
+        Args:
+            job_id (str): The id from ``submit``.
+            on_event (callable, optional): Called with every new event.
+            poll (float, optional): Seconds between two polls. Defaults to 0.5.
+            timeout (float, optional): Give up after this many seconds.
+
+        Returns:
+            The result of the job.
+
+        Raises:
+            ServiceError: If the job failed or the timeout passed.
+        """
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        seen = 0
+        while True:
+            view = self.status(job_id, since=seen)
+            for event in view["events"]:
+                if on_event:
+                    on_event(event)
+            seen = view["event_count"]
+            if view["status"] == "done":
+                return view["result"]
+            if view["status"] == "failed":
+                raise ServiceError(view["error"])
+            if deadline is not None and time.monotonic() > deadline:
+                raise ServiceError(f"Job {job_id} läuft noch nach {timeout} s")
+            time.sleep(poll)
+
+
+def run_job(kind: str, on_event=None, **params):
+    """Runs a job on the configured service, or locally if none is configured."""
+    from PySide6.QtCore import QSettings
+
+    settings = QSettings("PrinzCodeAgent")
+    url = settings.value("service/url", "", type=str)
+    if not url:
+        return run_local(kind, params, on_event)
+    client = ServiceClient(url, settings.value("service/token", "", type=str))
+    return client.wait(client.submit(kind, **params), on_event)
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+# the modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def memory_settings():
+    """An in-memory stand-in for QSettings, so tests don't touch the user's config.
+
+    Patch it into a module with ``monkeypatch.setattr(module, "QSettings", ...)``;
+    ``memory_settings.data`` holds the values.
+    """
+
+    class MemorySettings:
+        data: dict = {}
+
+        def __init__(self, *args):
+            pass
+
+        def value(self, key, default=None, type=None):
+            value = self.data.get(key, default)
+            return type(value) if type is not None and value is not None else value
+
+        def setValue(self, key, value):
+            self.data[key] = value
+
+    return MemorySettings
@@ -0,0 +1,131 @@
+import pytest
+
+pytest.importorskip("jira")
+pytest.importorskip("PySide6")
+
+import backlog_mirror  # noqa: E402
+import jira_client  # noqa: E402
+from backlog_mirror import BacklogMirror  # noqa: E402
+
+LOGIN = "Anmelden mit E-Mail und Passwort auf allen Geräten"
+EXPORT = "Alle Projekte als CSV exportieren und auswerten"
+
+
+def issue(key, summary, description="", issuetype="Story"):
+    return {
+        "key": key,
+        "fields": {
+            "summary": summary,
+            "description": description,
+            "issuetype": {"name": issuetype},
+            "status": {"name": "To Do"},
+            "updated": "2026-01-01T00:00:00.000+0000",
+        },
+    }
+
+
+class FakeJira:
+    """Answers the JQL search of ``sync`` from a dict of issues."""
+
+    server_url = "https://mirror.test"
+
+    def __init__(self, issues):
+        self.issues = {i["key"]: i for i in issues}
+        self.queries = []
+
+    def fields(self):
+        return []
+
+    def search_issues(self, jql, startAt=0, maxResults=50, **kwargs):
+        self.queries.append(jql)
+        found = list(self.issues.values())
+        return {"issues": found[startAt : startAt + maxResults], "total": len(found)}
+
+
+@pytest.fixture
+def mirror(monkeypatch):
+    monkeypatch.setattr(jira_client, "_meta_cache", {})
+    return BacklogMirror(":memory:")
+
+
+def stored_signatures(mirror):
+    return dict(mirror._db.execute("SELECT key, signature FROM issues"))
+
+
+def test_sync_stores_signatures_and_reuses_unchanged_ones(mirror, monkeypatch):
+    jira = FakeJira([issue("AB-1", LOGIN), issue("AB-2", EXPORT)])
+    mirror.sync(jira, "AB")
+    first = stored_signatures(mirror)
+    assert all(first.values())
+
+    calls = []
+    sign = mirror._signer.signature
+    monkeypatch.setattr(
+        mirror._signer, "signature", lambda text: calls.append(text) or sign(text)
+    )
+    jira.issues["AB-2"] = issue("AB-2", EXPORT + " pro Monat")
+    mirror.sync(jira, "AB")
+    assert calls == [f"{EXPORT} pro Monat\n"]
+    assert stored_signatures(mirror)["AB-1"] == first["AB-1"]
+
+
+def test_duplicate_index_follows_syncs_creates_and_deletes(mirror, monkeypatch):
+    jira = FakeJira([issue("AB-1", LOGIN)])
+    mirror.sync(jira, "AB")
+    index = mirror.duplicate_index("AB")
+    assert mirror.duplicate_index("AB") is index
+    assert index.best_match(LOGIN)[0] == "AB-1"
+
+    jira.issues["AB-2"] = issue("AB-2", EXPORT)
+    mirror.sync(jira, "AB")
+    assert index.best_match(EXPORT)[0] == "AB-2"
+
+    monkeypatch.setattr(backlog_mirror, "_mirror", mirror)
+    backlog_mirror.remember_issue("AB", "AB-3", "Passwort zurücksetzen per E-Mail")
+    assert index.best_match("Passwort zurücksetzen per E-Mail")[0] == "AB-3"
+
+    backlog_mirror.forget_issue("AB-1")
+    assert index.best_match(LOGIN) is None
+    assert "AB-1" not in {r["key"] for r in mirror.issues("AB")}
+
+
+def test_duplicate_index_fills_missing_signatures(mirror):
+    mirror.sync(FakeJira([issue("AB-1", LOGIN)]), "AB")
+    mirror._db.execute("UPDATE issues SET signature = NULL")
+    assert mirror.duplicate_index("AB").best_match(LOGIN)[0] == "AB-1"
+    assert all(stored_signatures(mirror).values())
+
+
+def test_full_sync_drops_deleted_issues(mirror):
+    jira = FakeJira([issue("AB-1", LOGIN), issue("AB-2", EXPORT)])
+    mirror.sync(jira, "AB")
+    index = mirror.duplicate_index("AB")
+
+    del jira.issues["AB-1"]
+    mirror.sync(jira, "AB")
+    assert len(mirror.issues("AB")) == 2  # incremental: deletions aren't seen
+
+    mirror.sync(jira, "AB", full=True)
+    assert [r["key"] for r in mirror.issues("AB")] == ["AB-2"]
+    assert index.best_match(LOGIN) is None
+
+
+def test_old_full_sync_makes_the_next_sync_full(mirror, monkeypatch):
+    jira = FakeJira([issue("AB-1", LOGIN), issue("AB-2", EXPORT)])
+    mirror.sync(jira, "AB")
+    mirror.sync(jira, "AB")
+    first, second = jira.queries
+    assert "updated" not in first  # the first sync reads everything
+    assert "updated >= -1m" in second
+
+    del jira.issues["AB-1"]
+    last_sync, last_full = mirror.last_sync("AB")
+    monkeypatch.setattr(
+        backlog_mirror.time,
+        "time",
+        lambda: last_full + backlog_mirror.FULL_SYNC_AGE + 1,
+    )
+    mirror.sync(jira, "AB")
+    assert "updated" not in jira.queries[-1]
+    assert [r["key"] for r in mirror.issues("AB")] == ["AB-2"]
+    assert mirror.last_sync("AB")[1] > last_full
@@ -0,0 +1,57 @@
+import threading
+
+from cache import TTLCache
+
+
+def test_get_set_and_expiry():
+    cache = TTLCache(ttl=0)
+    cache.set(("projects",), ["A"])
+    assert cache.get(("projects",)) is None  # expired right away
+    cache.ttl = 60
+    cache.set(("projects",), ["A"])
+    assert cache.get(("projects",)) == ["A"]
+
+
+def test_update_swaps_in_a_copy():
+    cache = TTLCache()
+    cache.set(("issues", "AB"), {"AB-1": ("Login", "")})
+    snapshot = cache.get(("issues", "AB"))
+    assert cache.update(("issues", "AB"), lambda t: t.__setitem__("AB-2", ("x", "")))
+    assert snapshot == {"AB-1": ("Login", "")}
+    assert set(cache.get(("issues", "AB"))) == {"AB-1", "AB-2"}
+    assert not cache.update(("issues", "XY"), lambda t: t.clear())
+
+
+def test_readers_can_iterate_during_updates():
+    cache = TTLCache()
+    cache.set(("issues", "AB"), {f"AB-{i}": ("s", "") for i in range(1000)})
+    errors = []
+
+    def writer():
+        for i in range(1000, 3000):
+            cache.update(("issues", "AB"), lambda t, i=i: t.__setitem__(f"AB-{i}", ""))
+
+    def reader():
+        try:
+            for _ in range(200):
+                sum(1 for _ in cache.get(("issues", "AB")).items())
+        except RuntimeError as exc:  # dictionary changed size during iteration
+            errors.append(exc)
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert len(cache.get(("issues", "AB"))) == 3000
+
+
+def test_invalidate_prefix():
+    cache = TTLCache()
+    cache.set(("sprints", 1), [])
+    cache.set(("sprints", 2), [])
+    cache.set(("boards", "AB"), 1)
+    cache.invalidate_prefix("sprints")
+    assert cache.get(("sprints", 1)) is None
+    assert cache.get(("boards", "AB")) == 1
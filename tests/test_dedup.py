@@ -0,0 +1,118 @@
+import os
+import random
+import subprocess
+import sys
+import time
+
+import pytest
+
+from dedup import DuplicateIndex, story_text
+
+LOGIN = (
+    "Als Nutzer möchte ich mich mit E-Mail und Passwort anmelden, "
+    "damit ich meine gespeicherten Aufgaben auf allen Geräten sehe"
+)
+EXPORT = (
+    "Als Admin möchte ich alle Projekte als CSV exportieren, "
+    "damit ich die Zahlen in der Tabellenkalkulation auswerten kann"
+)
+
+
+def test_near_duplicate_is_found():
+    index = DuplicateIndex.from_issues([("AB-1", LOGIN, ""), ("AB-2", EXPORT, "")])
+    hit = index.best_match(LOGIN.replace("allen", "all meinen"))
+    assert hit is not None
+    assert hit[0] == "AB-1"
+    assert 0.6 <= hit[1] < 1
+
+
+def test_unrelated_text_is_no_duplicate():
+    index = DuplicateIndex.from_issues([("AB-1", LOGIN, "")])
+    assert index.best_match(EXPORT) is None
+
+
+def test_shared_words_alone_are_no_duplicate():
+    # same vocabulary, different statement: word 3-grams barely overlap
+    index = DuplicateIndex.from_issues([("AB-1", LOGIN, "")])
+    shuffled = " ".join(sorted(LOGIN.split()))
+    assert index.best_match(shuffled) is None
+
+
+def test_remove_and_replace():
+    index = DuplicateIndex()
+    index.add("AB-1", LOGIN)
+    index.add("AB-1", EXPORT)
+    assert len(index) == 1
+    assert index.best_match(LOGIN) is None
+    index.remove("AB-1")
+    assert len(index) == 0
+    assert index.best_match(EXPORT) is None
+
+
+def test_story_text_uses_summary_and_criteria():
+    story = {"summary": "Login", "acceptance_criteria": ["Passwort", ""]}
+    assert story_text(story) == "Login\nPasswort"
+
+
+def test_invalid_threshold_is_rejected():
+    with pytest.raises(ValueError):
+        DuplicateIndex(threshold=0)
+    with pytest.raises(ValueError):
+        DuplicateIndex().query(LOGIN, threshold=1.5)
+
+
+def test_query_stays_fast_on_a_large_backlog():
+    rnd = random.Random(1)
+    words = [f"wort{i}" for i in range(3000)]
+    index = DuplicateIndex.from_issues(
+        (f"AB-{i}", " ".join(rnd.choices(words, k=25)), "") for i in range(2000)
+    )
+    queries = [" ".join(rnd.choices(words, k=25)) for _ in range(200)]
+    t0 = time.perf_counter()
+    for text in queries:
+        index.query(text)
+    per_query = (time.perf_counter() - t0) / len(queries)
+    assert per_query < 0.005  # a few hundred µs on a laptop, generous for CI
+
+
+def test_signatures_are_stable_across_processes():
+    # the mirror stores them, so the salted str hash must not be involved
+    code = "from dedup import DuplicateIndex as D; print(D().signature(%r).hex())"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", code % LOGIN],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={"PYTHONPATH": root, "PYTHONHASHSEED": seed},
+        ).stdout.strip()
+        for seed in ("1", "2")
+    }
+    assert outputs == {DuplicateIndex().signature(LOGIN).hex()}
+
+
+def test_stored_signature_is_used():
+    index = DuplicateIndex()
+    sig = index.signature(LOGIN)
+    assert index.add("AB-1", LOGIN, sig) == sig
+    assert index.best_match(LOGIN)[0] == "AB-1"
+
+
+def test_large_backlog_loads_from_stored_signatures_and_updates_incrementally():
+    # 50k issues as read back from the mirror: no hashing, only bucket inserts
+    rnd = random.Random(2)
+    index = DuplicateIndex()
+    n = 50_000
+    t0 = time.perf_counter()
+    for i in range(n):
+        index.add(f"AB-{i}", f"Issue {i}", rnd.randbytes(512))
+    assert (time.perf_counter() - t0) / n < 100e-6  # ~20 µs on a laptop
+
+    t0 = time.perf_counter()
+    index.add("AB-NEU", LOGIN)
+    hit = index.best_match(LOGIN.replace("allen", "all meinen"))
+    index.remove("AB-NEU")
+    assert time.perf_counter() - t0 < 0.05
+    assert hit[0] == "AB-NEU"
+    assert len(index) == n
@@ -0,0 +1,127 @@
+import csv
+import json
+
+import pytest
+
+from export import CSV_COLUMNS, export_csv, export_json
+from plan_model import Plan
+
+RAW = [
+    {
+        "epic": "Login",
+        "stories": [
+            {
+                "summary": "Anmelden",
+                "points": 3,
+                "tasks": ["Formular", "Validierung"],
+                "acceptance_criteria": ["Fehler bei falschem Passwort", "Sperre"],
+            },
+            {
+                "summary": "Abmelden",
+                "points": 1,
+                "tasks": [],
+                "acceptance_criteria": ["Session endet"],
+            },
+        ],
+    },
+    {
+        "epic": "Profil",
+        "stories": [
+            {
+                "summary": "Avatar hochladen",
+                "points": 2,
+                "tasks": ["Upload"],
+                "acceptance_criteria": [],
+            }
+        ],
+    },
+]
+
+
+@pytest.fixture
+def plan():
+    plan = Plan.from_llm(RAW)
+    plan.schedule(3)
+    return plan
+
+
+def test_csv_has_importer_header_and_one_row_per_issue(plan, tmp_path):
+    path = tmp_path / "plan.csv"
+    assert export_csv(str(path), plan) == 8
+
+    with open(path, newline="", encoding="utf-8") as fh:
+        reader = csv.reader(fh)
+        assert next(reader) == CSV_COLUMNS
+        rows = [dict(zip(CSV_COLUMNS, r)) for r in reader]
+
+    assert [(r["Issue Id"], r["Issue Type"], r["Summary"]) for r in rows] == [
+        ("1", "Epic", "Login"),
+        ("2", "Story", "Anmelden"),
+        ("3", "Sub-task", "Formular"),
+        ("4", "Sub-task", "Validierung"),
+        ("5", "Story", "Abmelden"),
+        ("6", "Epic", "Profil"),
+        ("7", "Story", "Avatar hochladen"),
+        ("8", "Sub-task", "Upload"),
+    ]
+    login, anmelden, formular = rows[:3]
+    assert login["Epic Name"] == "Login" and login["Parent Id"] == ""
+    assert anmelden["Description"] == "* Fehler bei falschem Passwort\n* Sperre"
+    assert (anmelden["Story Points"], anmelden["Sprint"]) == ("3", "Sprint 1")
+    assert formular["Sprint"] == "Sprint 1"
+
+
+def test_csv_parent_ids_link_the_hierarchy(plan, tmp_path):
+    path = tmp_path / "plan.csv"
+    export_csv(str(path), plan)
+    with open(path, newline="", encoding="utf-8") as fh:
+        parents = {r["Summary"]: r["Parent Id"] for r in csv.DictReader(fh)}
+    assert parents == {
+        "Login": "",
+        "Anmelden": "1",
+        "Formular": "2",
+        "Validierung": "2",
+        "Abmelden": "1",
+        "Profil": "",
+        "Avatar hochladen": "6",
+        "Upload": "7",
+    }
+
+
+def test_json_layout_and_links(plan, tmp_path):
+    path = tmp_path / "plan.json"
+    assert export_json(str(path), plan, "AB") == 8
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data.keys() == {"projects", "links"}
+    [project] = data["projects"]
+    assert project["key"] == "AB"
+    issues = {i["externalId"]: i for i in project["issues"]}
+    assert len(issues) == 8
+
+    epic = issues["1"]
+    assert (epic["issueType"], epic["summary"]) == ("Epic", "Login")
+    assert [c["fieldName"] for c in epic["customFieldValues"]] == ["Epic Name"]
+    story = {c["fieldName"]: c["value"] for c in issues["2"]["customFieldValues"]}
+    assert story == {"Story Points": 3, "Sprint": ["Sprint 1"]}
+    assert issues["2"]["description"] == "* Fehler bei falschem Passwort\n* Sperre"
+    assert issues["3"]["issueType"] == "Sub-task"
+
+    links = {(k["name"], k["sourceId"], k["destinationId"]) for k in data["links"]}
+    assert links == {
+        ("Epic-Story Link", "1", "2"),
+        ("Epic-Story Link", "1", "5"),
+        ("Epic-Story Link", "6", "7"),
+        ("sub-task-link", "3", "2"),
+        ("sub-task-link", "4", "2"),
+        ("sub-task-link", "8", "7"),
+    }
+
+
+def test_empty_plan_is_still_valid_json(tmp_path):
+    path = tmp_path / "plan.json"
+    assert export_json(str(path), Plan.from_llm([]), "AB") == 0
+    assert json.loads(path.read_text(encoding="utf-8")) == {
+        "projects": [{"key": "AB", "issues": []}],
+        "links": [],
+    }
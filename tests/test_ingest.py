@@ -0,0 +1,49 @@
+from ingest import count_tokens, ingest_document, iter_chunks, iter_paragraphs
+
+
+def test_paragraphs_split_at_blank_lines_and_headings():
+    lines = ["# Titel\n", "Absatz eins\n", "geht weiter\n", "\n", "## Teil\n", "x\n"]
+    assert list(iter_paragraphs(lines)) == [
+        "# Titel\nAbsatz eins\ngeht weiter",
+        "## Teil\nx",
+    ]
+
+
+def test_text_without_breaks_is_cut_at_the_budget():
+    lines = (f"12:00:{i % 60:02d} INFO request {i} done\n" for i in range(5000))
+    paragraphs = list(iter_paragraphs(lines, max_tokens=200))
+    assert len(paragraphs) > 10
+    assert max(count_tokens(p) for p in paragraphs) <= 200
+
+
+def test_chunks_respect_the_budget_also_for_huge_lines():
+    lines = ["kurz\n", "\n", "wort " * 5000 + "\n", "\n", "ende\n"]
+    chunks = list(iter_chunks(lines, max_tokens=300))
+    assert all(count_tokens(c) <= 300 for c in chunks)
+    joined = "".join(chunks).replace("\n", "")
+    assert joined.replace(" ", "") == ("kurz" + "wort" * 5000 + "ende")
+
+
+def test_ingest_document_extracts_every_chunk_in_order(tmp_path):
+    path = tmp_path / "spec.md"
+    path.write_text(
+        "\n\n".join(f"# Kapitel {i}\n" + "Anforderung " * 60 for i in range(12)),
+        encoding="utf-8",
+    )
+    brief = ingest_document(
+        str(path),
+        extract=lambda chunk: chunk.splitlines()[0],
+        condense=lambda text: text,
+        chunk_tokens=300,
+        brief_tokens=10_000,
+    )
+    assert [ln for ln in brief.splitlines() if ln] == [
+        f"# Kapitel {i}" for i in range(12)
+    ]
+
+
+def test_small_document_is_returned_as_is(tmp_path):
+    path = tmp_path / "kurz.txt"
+    path.write_text("Eine Todo-App mit Login\n", encoding="utf-8")
+    brief = ingest_document(str(path), lambda c: c, lambda t: t)
+    assert brief == "Eine Todo-App mit Login"
@@ -0,0 +1,188 @@
+import pytest
+
+pytest.importorskip("jira")
+pytest.importorskip("PySide6")
+
+from jira.exceptions import JIRAError  # noqa: E402
+
+import jira_client  # noqa: E402
+
+EPIC_NAME = {
+    "fieldId": "customfield_1",
+    "name": "Epic Name",
+    "schema": {"custom": "com.pyxis.greenhopper.jira:gh-epic-label"},
+}
+EPIC_LINK = {
+    "fieldId": "customfield_2",
+    "name": "Epic Link",
+    "schema": {"custom": "com.pyxis.greenhopper.jira:gh-epic-link"},
+}
+POINTS = {"fieldId": "customfield_3", "name": "Story point estimate", "schema": {}}
+PARENT = {"fieldId": "parent", "name": "Parent"}
+
+TYPES = [
+    {"id": "1", "name": "Epic"},
+    {"id": "2", "name": "Story"},
+    {"id": "3", "name": "Subtask", "subtask": True},
+]
+SCREENS = {"1": [EPIC_NAME], "2": [EPIC_LINK, PARENT, POINTS], "3": [PARENT]}
+
+
+class Response:
+    def __init__(self, errors):
+        self.errors = errors
+
+    def json(self):
+        return {"errors": self.errors}
+
+
+class Issue:
+    def __init__(self, key):
+        self.key = key
+
+
+class FakeJira:
+    """Serves the paged createmeta endpoints (``legacy``: only the old one)."""
+
+    server_url = "https://fields.test"
+
+    def __init__(self, legacy=False, rejected=()):
+        self.legacy = legacy
+        self.rejected = set(rejected)
+        self.paths = []
+        self.created = []
+
+    def _get_json(self, path, params=None):
+        self.paths.append(path)
+        if path == "issue/createmeta":
+            return {
+                "projects": [
+                    {
+                        "issuetypes": [
+                            {
+                                **t,
+                                "fields": {
+                                    f["fieldId"]: {"name": f["name"], **f}
+                                    for f in SCREENS[t["id"]]
+                                },
+                            }
+                            for t in TYPES
+                        ]
+                    }
+                ]
+            }
+        if self.legacy:
+            raise JIRAError("Not Found")
+        start = params["startAt"]
+        if path.endswith("/issuetypes"):
+            # two pages, to see that all of them are read
+            return {"issueTypes": TYPES[start : start + 2], "total": len(TYPES)}
+        fields = SCREENS[path.rsplit("/", 1)[1]]
+        return {"fields": fields[start:], "total": len(fields)}
+
+    def fields(self):
+        return [{**f, "id": f["fieldId"]} for f in (EPIC_NAME, EPIC_LINK, POINTS)]
+
+    def create_issue(self, fields):
+        bad = self.rejected & fields.keys()
+        if bad:
+            error = JIRAError(f"Field '{min(bad)}' cannot be set.")
+            error.response = Response({f: "cannot be set" for f in bad})
+            raise error
+        self.created.append(fields)
+        return Issue(f"AB-{len(self.created)}")
+
+    def create_issues(self, field_list, prefetch=True):
+        results = []
+        for fields in field_list:
+            try:
+                issue = self.create_issue(fields)
+            except JIRAError as e:
+                results.append({"status": "Error", "error": str(e), "issue": None})
+            else:
+                results.append({"status": "Success", "error": None, "issue": issue})
+        return results
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(jira_client, "_meta_cache", {})
+    monkeypatch.setattr(jira_client, "task_mode", lambda key: ("subtasks", 5))
+
+
+def story():
+    return {"summary": "Login", "acceptance_criteria": ["geht"], "points": 3}
+
+
+def test_fields_are_discovered_per_issue_type():
+    jira = FakeJira()
+    assert jira_client.get_create_fields(jira, "AB", "Epic") == {
+        "epic_name": "customfield_1"
+    }
+    assert jira_client.get_create_fields(jira, "AB", "Story") == {
+        "epic_link": "customfield_2",
+        "parent": "parent",
+        "story_points": "customfield_3",
+    }
+    assert jira_client.get_subtask_type(jira, "AB") == "Subtask"
+    assert jira.paths.count("issue/createmeta/AB/issuetypes") == 2  # two pages
+    jira_client.get_create_fields(jira, "AB", "Story")
+    assert jira.paths.count("issue/createmeta/AB/issuetypes/2") == 1  # cached
+
+
+def test_old_servers_use_the_expanded_createmeta():
+    jira = FakeJira(legacy=True)
+    assert jira_client.get_create_fields(jira, "AB", "Epic") == {
+        "epic_name": "customfield_1"
+    }
+    assert "parent" in jira_client.get_create_fields(jira, "AB", "Story")
+    assert jira_client.get_subtask_type(jira, "AB") == "Subtask"
+
+
+def test_without_createmeta_the_global_fields_are_used(monkeypatch):
+    jira = FakeJira(legacy=True)
+    real = jira._get_json
+
+    def get_json(path, params=None):
+        if path == "issue/createmeta":
+            raise JIRAError("Not Found")
+        return real(path, params)
+
+    monkeypatch.setattr(jira, "_get_json", get_json)
+    story_roles = jira_client.get_create_fields(jira, "AB", "Story")
+    assert story_roles["epic_link"] == "customfield_2"
+    # each type gets its own copy, dropping a field for stories keeps it for epics
+    del story_roles["epic_link"]
+    assert "epic_link" in jira_client.get_create_fields(jira, "AB", "Epic")
+
+
+def test_rejected_epic_link_falls_back_to_parent():
+    jira = FakeJira(rejected={"customfield_2"})
+    key = jira_client.create_story(jira, "AB", "AB-100", story(), subtasks=False)
+    assert key == "AB-1"
+    assert jira.created[0]["parent"] == {"key": "AB-100"}
+    assert "customfield_2" not in jira.created[0]
+    # remembered: the next story is built without the epic link right away
+    jira.rejected.clear()
+    jira_client.create_story(jira, "AB", "AB-100", story(), subtasks=False)
+    assert "customfield_2" not in jira.created[1]
+
+
+def test_other_errors_are_raised():
+    jira = FakeJira(rejected={"summary"})
+    with pytest.raises(JIRAError):
+        jira_client.create_epic(jira, "AB", "Login")
+
+
+def test_bulk_create_retries_without_rejected_fields():
+    jira = FakeJira(rejected={"customfield_3"})
+    keys = jira_client.create_issues_bulk(
+        jira,
+        ["Login", "Logout"],
+        lambda name: jira_client.story_fields(
+            jira, "AB", "AB-100", {**story(), "summary": name}
+        ),
+    )
+    assert keys == ["AB-1", "AB-2"]
+    assert [f["summary"] for f in jira.created] == ["Login", "Logout"]
+    assert all("customfield_3" not in f for f in jira.created)
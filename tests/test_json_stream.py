@@ -0,0 +1,50 @@
+import json
+import random
+
+import pytest
+
+from json_stream import ItemStream
+
+EPICS = [
+    {"epic": "Login", "stories": [{"summary": "Passwort {vergessen}", "tasks": []}]},
+    {"epic": 'Export "CSV"', "stories": [{"summary": "Pfad C:\\temp\\", "points": 3}]},
+    {"epic": "Leer ]}", "stories": []},
+]
+
+
+def _feed_all(stream: ItemStream, text: str, rng: random.Random) -> list:
+    items = []
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 7)
+        items.extend(stream.feed(text[i : i + size]))
+        i += size
+    return items
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_pieces_of_any_size(seed):
+    text = json.dumps({"epics": EPICS}, ensure_ascii=False, indent=2)
+    assert _feed_all(ItemStream(), text, random.Random(seed)) == EPICS
+
+
+def test_bare_array():
+    assert ItemStream().feed(json.dumps(EPICS)) == EPICS
+
+
+def test_item_is_returned_as_soon_as_it_is_closed():
+    stream = ItemStream()
+    first = json.dumps(EPICS[0])
+    assert stream.feed('{"epics": [' + first[:-1]) == []
+    assert stream.feed(first[-1]) == [EPICS[0]]
+    assert stream.feed(", " + json.dumps(EPICS[1])[:5]) == []
+
+
+def test_nested_objects_are_not_items():
+    text = '{"epics": [{"epic": "A", "meta": {"x": [1, {"y": 2}]}}]}'
+    assert ItemStream().feed(text) == [{"epic": "A", "meta": {"x": [1, {"y": 2}]}}]
+
+
+def test_incomplete_answer_yields_only_closed_items():
+    text = json.dumps({"epics": EPICS})
+    assert ItemStream().feed(text[: text.index('{"epic": "Leer')]) == EPICS[:2]
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+import model_router  # noqa: E402
+from model_router import ERROR_HALF_LIFE, ModelRouter  # noqa: E402
+
+
+ROUTES = {
+    "short": {"models": ["a", "b", "c"], "rank_by": "latency"},
+    "long": {"models": ["a", "b"], "rank_by": "tps"},
+}
+
+
+@pytest.fixture
+def router(monkeypatch, memory_settings):
+    monkeypatch.setattr(model_router, "QSettings", memory_settings)
+    monkeypatch.setattr(model_router, "EXPLORE", 0.0)
+    router = ModelRouter(ROUTES, seed=1)
+    yield router
+    router.save()  # stops the save timer while the settings are still patched
+
+
+def test_unmeasured_models_keep_config_order(router):
+    assert router.candidates("short") == ["a", "b", "c"]
+
+
+def test_ranks_by_latency_or_throughput(router):
+    for _ in range(3):
+        router.record("short", "a", 2.0, 100, ok=True)
+        router.record("short", "b", 1.0, 10, ok=True)
+        router.record("long", "a", 10.0, 2000, ok=True)  # 200 tokens/s
+        router.record("long", "b", 5.0, 500, ok=True)  # 100 tokens/s
+    assert router.candidates("short")[:2] == ["b", "a"]
+    assert router.candidates("long") == ["a", "b"]
+
+
+def test_failing_model_goes_last_and_recovers(router):
+    router.record("short", "a", 1.0, 10, ok=False)
+    router.record("short", "a", 1.0, 10, ok=False)
+    router.record("short", "a", 1.0, 10, ok=False)
+    assert router.candidates("short")[-1] == "a"
+
+    # some hours later the burst has faded
+    entry = router._stats["short/a"]
+    entry["updated"] = time.time() - 3 * ERROR_HALF_LIFE
+    assert router.candidates("short")[0] == "a"
+
+
+def test_successes_lower_the_error_rate(router):
+    router.record("short", "a", 1.0, 10, ok=False)
+    rates = []
+    for _ in range(5):
+        router.record("short", "a", 1.0, 10, ok=True)
+        rates.append(router.stats()["short/a"]["error_rate"])
+    assert rates == sorted(rates, reverse=True)
+    assert rates[-1] < 0.2
+
+
+def test_exploration_tries_unmeasured_fallbacks(router, monkeypatch):
+    monkeypatch.setattr(model_router, "EXPLORE", 0.5)
+    for _ in range(5):
+        router.record("short", "a", 0.5, 10, ok=True)
+    firsts = [router.candidates("short")[0] for _ in range(200)]
+    assert {"b", "c"} <= set(firsts)
+    assert firsts.count("a") > 60
+
+
+def test_stats_are_saved_once_after_a_burst(router, memory_settings, monkeypatch):
+    writes = []
+    monkeypatch.setattr(
+        memory_settings, "setValue", lambda self, key, value: writes.append(key)
+    )
+    monkeypatch.setattr(model_router, "SAVE_DELAY", 0.05)
+    for _ in range(5):
+        router.record("short", "a", 1.0, 10, ok=True)
+    assert writes == []
+    time.sleep(0.3)
+    assert writes == ["ai/stats"]
+    router.save()  # nothing changed since
+    assert writes == ["ai/stats"]
+
+
+def test_saved_stats_are_loaded(router, memory_settings):
+    router.record("short", "a", 1.0, 10, ok=True)
+    router.save()
+    assert ModelRouter(ROUTES).stats() == router.stats()
@@ -0,0 +1,160 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("jira")
+pytest.importorskip("PySide6")
+
+import pipeline  # noqa: E402
+import pusher  # noqa: E402
+from dedup import DuplicateIndex  # noqa: E402
+from plan_model import Plan  # noqa: E402
+
+
+def epic(i, stories=2):
+    return {
+        "epic": f"Epic {i}",
+        "stories": [
+            {
+                "summary": f"Story {i}.{j} mit eigenem Inhalt Nummer {i * 10 + j}",
+                "points": 3,
+                "tasks": [],
+                "acceptance_criteria": [f"Kriterium {i}.{j}"],
+            }
+            for j in range(stories)
+        ],
+    }
+
+
+class Stream:
+    """A decomposition stream that yields ``count`` epics, ``delay`` apart."""
+
+    def __init__(self, count, delay=0.0, log=None, fail_at=None):
+        self.count = count
+        self.delay = delay
+        self.log = log if log is not None else []
+        self.fail_at = fail_at
+        self.closed = threading.Event()
+
+    def __iter__(self):
+        for i in range(self.count):
+            time.sleep(self.delay)
+            if i == self.fail_at:
+                raise ValueError("Stream abgebrochen")
+            self.log.append(("generated", i))
+            yield epic(i)
+
+    def close(self):
+        self.closed.set()
+
+
+class FakeJira:
+    """Stands in for the Jira calls of the pusher, each takes ``delay``.
+
+    The ``fail_at``-th story (0-based) fails like an unreachable Jira.
+    """
+
+    def __init__(self, delay=0.0, log=None, fail_at=None):
+        self.delay = delay
+        self.log = log if log is not None else []
+        self.fail_at = fail_at
+        self.stories = 0
+
+    def create_sprint(self, jira, board_id, name, days=14):
+        return len(self.log) + 1
+
+    def create_epic(self, jira, project_key, name):
+        return f"AB-{name.split()[-1]}"
+
+    def create_story(self, jira, project_key, epic_key, data, on_created, subtasks):
+        time.sleep(self.delay)
+        if self.stories == self.fail_at:
+            raise ConnectionError("Jira nicht erreichbar")
+        self.stories += 1
+        key = f"AB-{100 + self.stories}"
+        self.log.append(("pushed", data["summary"]))
+        on_created("story", key, data["summary"], self.delay)
+        return key
+
+
+@pytest.fixture
+def fake_jira(monkeypatch):
+    def install(**kwargs):
+        jira = FakeJira(**kwargs)
+        for name in ("create_sprint", "create_epic", "create_story"):
+            monkeypatch.setattr(pusher, name, getattr(jira, name))
+        monkeypatch.setattr(pusher, "add_issue_to_sprint", lambda *a: None)
+        monkeypatch.setattr(pusher, "ensure_board", lambda *a: 1)
+        monkeypatch.setattr(pusher, "duplicate_index", lambda *a: DuplicateIndex())
+        monkeypatch.setattr(pusher, "task_mode", lambda *a: ("subtasks", 0))
+        monkeypatch.setattr(pipeline, "index_pushed", lambda *a: None)
+        return jira
+
+    return install
+
+
+def run(stream, **kwargs):
+    plan = Plan()
+    pipeline.generate_and_push(None, stream, plan, "AB", lambda ev: None, **kwargs)
+    return plan
+
+
+def test_pushing_starts_while_the_stream_is_still_running(fake_jira):
+    log = []
+    fake_jira(delay=0.01, log=log)
+    plan = run(Stream(4, delay=0.05, log=log))
+
+    assert log.index(("pushed", plan.epics[0].stories[0].summary)) < log.index(
+        ("generated", 3)
+    )
+    assert len(plan.pushed_keys) == 8 + 4  # stories and epics
+    assert [e.key for e in plan.epics] == ["AB-0", "AB-1", "AB-2", "AB-3"]
+
+
+def test_a_slow_jira_holds_the_stream_back(fake_jira):
+    fake_jira(delay=0.02)
+    plan = Plan()
+    ahead = []
+
+    class Watched(Stream):
+        def __iter__(self):
+            for i, data in enumerate(super().__iter__()):
+                # epics generated but not taken by the pushing thread yet
+                ahead.append(i - len(plan.epics))
+                yield data
+
+    pipeline.generate_and_push(
+        None, Watched(8), plan, "AB", lambda ev: None, queue_size=1
+    )
+    assert len(plan.epics) == 8
+    # the epic in the queue, and one the pushing thread is just taking
+    assert max(ahead) <= 2
+
+
+def test_a_jira_error_stops_and_closes_the_stream(fake_jira):
+    fake_jira(fail_at=3)  # the second story of the second epic
+    stream = Stream(1000)
+    plan = Plan()
+    with pytest.raises(ConnectionError):
+        pipeline.generate_and_push(
+            None, stream, plan, "AB", lambda ev: None, queue_size=2
+        )
+
+    assert stream.closed.wait(2 * pipeline.PUT_TIMEOUT + 1)
+    assert len(stream.log) < 10
+    # what was pushed before the error stays in the plan
+    assert [s.key for e in plan.epics for s in e.stories] == [
+        "AB-101",
+        "AB-102",
+        "AB-103",
+        None,
+    ]
+
+
+def test_a_stream_error_reaches_the_caller(fake_jira):
+    fake_jira()
+    stream = Stream(5, fail_at=2)
+    with pytest.raises(ValueError, match="Stream abgebrochen"):
+        run(stream)
+    assert stream.closed.wait(1)
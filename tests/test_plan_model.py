@@ -0,0 +1,109 @@
+import pytest
+
+from plan_model import Plan, check_epic, check_story
+
+RAW = [
+    {
+        "epic": "Login",
+        "stories": [
+            {
+                "summary": "Anmelden",
+                "points": 3,
+                "tasks": ["Formular"],
+                "acceptance_criteria": ["Fehler bei falschem Passwort"],
+            },
+            {
+                "summary": "Abmelden",
+                "points": 1,
+                "tasks": [],
+                "acceptance_criteria": ["Session endet"],
+            },
+        ],
+    },
+    {"epic": "Profil", "depends_on": ["Login"], "stories": []},
+]
+
+
+def story(summary, points=2):
+    return {
+        "summary": summary,
+        "points": points,
+        "tasks": [],
+        "acceptance_criteria": [],
+    }
+
+
+@pytest.fixture
+def plan():
+    plan = Plan.from_llm(RAW)
+    plan.schedule(20)
+    return plan
+
+
+def test_from_llm_builds_indexes(plan):
+    assert plan.story_count() == 2
+    assert plan.epic_by_name["Profil"].depends_on == ("Login",)
+    assert [s.summary for _, s in plan.stories_by_sprint["Sprint 1"]] == [
+        "Anmelden",
+        "Abmelden",
+    ]
+
+
+def test_replace_epic_keeps_keys_of_unchanged_stories(plan):
+    login = plan.epics[0]
+    login.key, login.stories[0].key = "AB-1", "AB-2"
+    plan.pushed_keys.update({"AB-1", "AB-2"})
+    epic = plan.replace_epic(0, {"epic": "Login", "stories": [story("Anmelden")]})
+    assert epic.key == "AB-1"
+    assert epic.stories[0].key == "AB-2"
+    assert epic.stories[0].sprint == "Sprint 1"
+
+
+def test_renamed_epic_updates_dependencies(plan):
+    plan.replace_epic(0, {"epic": "Anmeldung", "stories": [story("Anmelden")]})
+    assert plan.epic_by_name["Profil"].depends_on == ("Anmeldung",)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"epic": "Login"},
+        {"epic": "Login", "stories": []},
+        {"epic": "Login", "stories": ["Anmelden"]},
+        {"stories": [story("x")]},
+        {"epic": "Login", "stories": [{"summary": "x", "tasks": []}]},
+        ["Anmelden"],
+    ],
+)
+def test_invalid_epic_is_rejected_and_plan_kept(plan, data):
+    before = plan.epics[0]
+    with pytest.raises(ValueError):
+        plan.replace_epic(0, data)
+    assert plan.epics[0] is before
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"summary": "", "tasks": [], "acceptance_criteria": []},
+        {"summary": "x", "acceptance_criteria": []},
+        {"summary": "x", "tasks": "a, b", "acceptance_criteria": []},
+        "x",
+    ],
+)
+def test_invalid_story_is_rejected_and_plan_kept(plan, data):
+    before = plan.epics[0].stories[1]
+    with pytest.raises(ValueError):
+        plan.replace_story(0, 1, data)
+    assert plan.epics[0].stories[1] is before
+
+
+def test_replace_story_keeps_sprint_and_key(plan):
+    plan.epics[0].stories[1].key = "AB-3"
+    new = plan.replace_story(0, 1, story("Abmelden überall", points=5))
+    assert (new.key, new.sprint, new.points) == ("AB-3", "Sprint 1", 5)
+
+
+def test_checks_return_valid_data():
+    assert check_story(story("x"))["summary"] == "x"
+    assert check_epic({"epic": "E", "stories": [story("x")]})["epic"] == "E"
@@ -0,0 +1,326 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("jira")
+pytest.importorskip("PySide6")
+
+import jira_client  # noqa: E402
+import reconcile  # noqa: E402
+from dedup import DuplicateIndex  # noqa: E402
+from jira.exceptions import JIRAError  # noqa: E402
+from plan_model import Epic, Plan  # noqa: E402
+
+FIELDS = {"story_points": "customfield_2", "epic_link": "customfield_1"}
+
+
+def story(summary, points=3, tasks=("Umsetzen",)):
+    return {
+        "summary": summary,
+        "points": points,
+        "tasks": list(tasks),
+        "acceptance_criteria": [f"{summary} ist fertig und getestet"],
+    }
+
+
+def row(key, summary, issuetype="Story", **kw):
+    data = {
+        "key": key,
+        "summary": summary,
+        "description": "",
+        "issuetype": issuetype,
+        "status": "To Do",
+        "epic": None,
+        "parent": None,
+        "points": None,
+        "sprint_id": None,
+    }
+    data.update(kw)
+    return data
+
+
+def story_row(key, data, epic, sprint_id):
+    return row(
+        key,
+        data["summary"],
+        description="\n".join(f"* {a}" for a in data["acceptance_criteria"]),
+        epic=epic,
+        points=float(data["points"]),
+        sprint_id=sprint_id,
+    )
+
+
+class FakeMirror:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def sync(self, jira, project_key):
+        pass
+
+    def issues(self, project_key):
+        return list(self.rows)
+
+    def duplicate_index(self, project_key):
+        return DuplicateIndex.from_issues(
+            (r["key"], r["summary"], r["description"]) for r in self.rows
+        )
+
+
+@pytest.fixture
+def setup(monkeypatch):
+    """A pushed two-story plan and the mirror rows Jira has for it."""
+    monkeypatch.setattr(jira_client, "get_create_fields", lambda *a: FIELDS)
+    monkeypatch.setattr(reconcile, "get_create_fields", lambda *a: FIELDS)
+    monkeypatch.setattr(reconcile, "task_mode", lambda key: ("subtasks", 5))
+    monkeypatch.setattr(reconcile, "index_pushed", lambda epics, description: None)
+
+    login = story("Anmelden mit E-Mail und Passwort")
+    logout = story("Abmelden auf allen Geräten")
+    plan = Plan.from_llm([{"epic": "Login", "stories": [login, logout]}])
+    plan.schedule(20)
+    epic = plan.epics[0]
+    epic.key = "AB-1"
+    plan.sprints[0].sprint_id = 7
+    rows = [row("AB-1", "Login", "Epic")]
+    for i, (node, data) in enumerate(zip(epic.stories, (login, logout))):
+        node.key = f"AB-{10 + i}"
+        node.task_keys = (("Umsetzen", f"AB-{20 + i}"),)
+        rows.append(story_row(node.key, data, "AB-1", 7))
+        rows.append(row(f"AB-{20 + i}", "Umsetzen", "Sub-task", parent=node.key))
+    plan.pushed_keys.update(r["key"] for r in rows)
+
+    mirror = FakeMirror(rows)
+    monkeypatch.setattr(reconcile, "get_mirror", lambda: mirror)
+    return plan, mirror
+
+
+def snapshot(plan):
+    return [
+        (node.key, getattr(node, "task_keys", None))
+        for epic in plan.epics
+        for node in (epic, *epic.stories)
+    ] + [(s.sprint_id,) for s in plan.sprints]
+
+
+def test_unchanged_plan_has_no_changes(setup):
+    plan, _ = setup
+    assert not reconcile.diff_plan(None, plan, "AB")
+
+
+def test_edits_become_updates_moves_and_closes(setup):
+    plan, _ = setup
+    epic = plan.epics[0]
+    epic.stories[0].points = 8
+    del epic.stories[1]
+    plan.reindex()
+    changes = reconcile.diff_plan(None, plan, "AB")
+    assert changes.updates == {"AB-10": {"customfield_2": 8.0}}
+    assert [c[0] for c in changes.close] == ["AB-11", "AB-21"]
+    assert not changes.stories and not changes.moves
+
+
+def test_diff_leaves_the_plan_alone_until_applied(setup):
+    plan, mirror = setup
+    story = plan.epics[0].stories[0]
+    story.key, story.task_keys = None, ()  # e.g. summary edited by regeneration
+    mirror.rows = [r for r in mirror.rows if r["key"] != "AB-11"]  # deleted
+    before = snapshot(plan)
+
+    changes = reconcile.diff_plan(None, plan, "AB")
+    assert snapshot(plan) == before
+    assert (story, "AB-10") in changes.keys
+    assert changes.forget == {"AB-11"}
+
+    reconcile.apply_mapping(plan, changes)
+    assert story.key == "AB-10"
+    assert story.task_keys == (("Umsetzen", "AB-20"),)
+    assert plan.epics[0].stories[1].key is None
+    assert "AB-11" not in plan.pushed_keys
+
+
+def test_issues_created_by_hand_are_never_adopted(setup):
+    plan, mirror = setup
+    text = story("Passwort zurücksetzen per E-Mail Link")
+    plan.epics[0].stories.append(
+        Plan.from_llm([{"epic": "x", "stories": [text]}]).epics[0].stories[0]
+    )
+    plan.reindex()
+    # the same story, created by hand in another sprint
+    mirror.rows.append(story_row("AB-99", text, None, 3))
+
+    changes = reconcile.diff_plan(None, plan, "AB")
+    assert changes.duplicates == 1
+    assert "AB-99" not in changes.updates
+    assert not changes.moves and not changes.stories and not changes.keys
+
+
+def test_task_mode_applies_to_new_stories_only(setup, monkeypatch):
+    plan, _ = setup
+    monkeypatch.setattr(reconcile, "task_mode", lambda key: ("checklist", 5))
+    data = story("Passwort zurücksetzen per E-Mail Link", tasks=("Link", "Formular"))
+    new = Plan.from_llm([{"epic": "x", "stories": [data]}]).epics[0].stories[0]
+    plan.epics[0].stories.append(new)
+    plan.reindex()
+
+    changes = reconcile.diff_plan(None, plan, "AB")
+    # the pushed stories keep their sub-tasks
+    assert not changes.close and not changes.updates and not changes.task_keys
+    assert changes.stories == [(plan.epics[0], new)]
+    assert not changes.subtasks
+    assert changes.saved == 2
+
+
+def test_pushed_checklist_stays_a_checklist(setup):
+    plan, mirror = setup
+    login = plan.epics[0].stories[0]
+    login.task_keys = ()
+    checklist = jira_client.story_fields(
+        None, "AB", "AB-1", login.to_dict(), checklist=True
+    )["description"]
+    mirror.rows = [r for r in mirror.rows if r["key"] != "AB-20"]
+    mirror.rows[1]["description"] = checklist
+    plan.pushed_keys.discard("AB-20")
+
+    assert not reconcile.diff_plan(None, plan, "AB")  # mode is "subtasks"
+
+    login.tasks += ("Testen",)
+    changes = reconcile.diff_plan(None, plan, "AB")
+    assert not changes.subtasks
+    assert "☐ Testen" in changes.updates["AB-10"]["description"]
+
+class Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.text = ""
+        self._body = body or {}
+
+    def json(self):
+        return self._body
+
+
+class FakeSession:
+    def __init__(self, jira):
+        self.jira = jira
+
+    def post(self, url, json):
+        self.jira.calls.append(("POST", url, json))
+        if url.endswith("/bulk/issues/transition"):
+            return Response(201, {"taskId": "5"}) if self.jira.bulk else Response(404)
+        return Response(204)
+
+    def get(self, url):
+        self.jira.calls.append(("GET", url))
+        return Response(200, {"status": "COMPLETE", "progressPercent": 100})
+
+    def put(self, url, json):
+        self.jira.calls.append(("PUT", url, json))
+        return Response(204)
+
+
+class FakeJira:
+    """Records the calls of ``apply_changes``; refuses issues in ``refuse``."""
+
+    server_url = "https://jira.test"
+    AGILE_BASE_URL = "{server}/rest/agile/1.0/{path}"
+
+    def __init__(self, bulk=True, refuse=()):
+        self.bulk = bulk
+        self.refuse = set(refuse)
+        self.calls = []
+        self.next_key = 100
+        self._session = FakeSession(self)
+
+    def _get_url(self, path, base="{server}/rest/api/2/{path}"):
+        return base.format(server=self.server_url, path=path)
+
+    def create_issues(self, field_list, prefetch=True):
+        self.calls.append(("create", [f["summary"] for f in field_list]))
+        results = []
+        for fields in field_list:
+            if fields["summary"] in self.refuse:
+                results.append({"status": "Error", "error": "abgelehnt"})
+                continue
+            key, self.next_key = f"AB-{self.next_key}", self.next_key + 1
+            results.append({"status": "Success", "issue": SimpleNamespace(key=key)})
+        return results
+
+    def transitions(self, key):
+        return [{"id": "31", "to": {"statusCategory": {"key": "done"}}}]
+
+    def transition_issue(self, key, transition):
+        self.calls.append(("transition", key, transition))
+        if key in self.refuse:
+            raise JIRAError("Übergang nicht erlaubt")
+
+
+def test_apply_changes_batches_epic_moves_and_closes(setup):
+    plan, _ = setup
+    login = plan.epics[0]
+    del login.stories[0]  # AB-10 and its sub-task AB-20 are closed
+    profil = Epic(name="Profil", stories=[login.stories.pop()])
+    plan.epics.append(profil)
+    plan.reindex()
+
+    jira = FakeJira()
+    changes = reconcile.diff_plan(jira, plan, "AB")
+    assert [(e.name, s.key) for e, s in changes.epic_moves] == [("Profil", "AB-11")]
+    requests = reconcile.apply_changes(jira, plan, "AB", changes)
+
+    posts = [c[1:] for c in jira.calls if c[0] == "POST"]
+    assert posts == [
+        ("https://jira.test/rest/agile/1.0/epic/AB-100/issue", {"issues": ["AB-11"]}),
+        (
+            "https://jira.test/rest/api/3/bulk/issues/transition",
+            {
+                "bulkTransitionInputs": [
+                    {"selectedIssueIdsOrKeys": ["AB-10", "AB-20"], "transitionId": "31"}
+                ],
+                "sendBulkNotification": False,
+            },
+        ),
+    ]
+    # create, epic move, two transition lookups, bulk transition
+    assert requests == 5
+    assert profil.key == "AB-100"
+    assert not changes.not_closed
+    assert plan.pushed_keys == {"AB-1", "AB-11", "AB-21", "AB-100"}
+
+
+def test_issues_jira_refuses_to_close_stay_pushed(setup):
+    plan, _ = setup
+    del plan.epics[0].stories[1]
+    plan.reindex()
+
+    jira = FakeJira(bulk=False, refuse={"AB-21"})
+    changes = reconcile.diff_plan(jira, plan, "AB")
+    reconcile.apply_changes(jira, plan, "AB", changes)
+
+    closed = [c[1] for c in jira.calls if c[0] == "transition"]
+    assert closed == ["AB-11", "AB-21"]
+    assert changes.not_closed == ["AB-21"]
+    assert "AB-21" in plan.pushed_keys and "AB-11" not in plan.pushed_keys
+    assert "AB-21" in changes.summary()
+
+
+def test_partial_bulk_create_keeps_the_created_keys(setup):
+    plan, _ = setup
+    first, second = Plan.from_llm(
+        [
+            {
+                "epic": "x",
+                "stories": [
+                    story("Passwort zurücksetzen per E-Mail Link"),
+                    story("Profilbild hochladen und zuschneiden"),
+                ],
+            }
+        ]
+    ).epics[0].stories
+    plan.epics[0].stories += [first, second]
+    plan.reindex()
+
+    jira = FakeJira(refuse={second.summary})
+    changes = reconcile.diff_plan(jira, plan, "AB")
+    with pytest.raises(jira_client.BulkCreateError):
+        reconcile.apply_changes(jira, plan, "AB", changes)
+    assert first.key == "AB-100" and first.key in plan.pushed_keys
+    assert second.key is None
@@ -0,0 +1,78 @@
+import pytest
+
+import search_index
+from plan_model import Plan
+from search_index import SearchIndex
+
+EPICS = [
+    {
+        "epic": "Login",
+        "stories": [
+            {
+                "summary": "Anmelden",
+                "tasks": ["Formular bauen"],
+                "acceptance_criteria": ["Falsches Passwort zeigt einen Fehler"],
+            }
+        ],
+    }
+]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = SearchIndex(":memory:")
+    monkeypatch.setattr(search_index, "_index", index)
+    return index
+
+
+def test_prefix_search_finds_all_kinds(index):
+    search_index.index_stack("Eine Todo-App\nmit Login", "frontend: React")
+    search_index.index_epics(EPICS, "Eine Todo-App\nmit Login")
+    assert index.search("Anmel")[0]["kind"] == "story"  # title ranks first
+    assert [h["kind"] for h in index.search("react")] == ["stack"]
+    hit = index.search("passwort fehl")[0]
+    assert hit["kind"] == "criterion"
+    assert "[Passwort]" in hit["snippet"]
+    assert index.search("   ") == []
+
+
+def test_kind_filter_and_duplicates(index):
+    search_index.index_epics(EPICS, "App A")
+    search_index.index_epics(EPICS, "App A")
+    assert len(index.search("login", kind="epic")) == 1
+    assert index.search("login", kind="ticket") == []
+
+
+def test_push_links_only_the_nodes_of_its_own_brief(index):
+    search_index.index_epics(EPICS, "App A")
+    search_index.index_epics(EPICS, "App B")
+    plan = Plan.from_llm(EPICS)
+    plan.description = "App A"
+    epic = plan.epics[0]
+    epic.key, epic.stories[0].key = "AB-1", "AB-2"
+    epic.stories[0].task_keys = (("Formular bauen", "AB-3"),)
+    search_index.index_pushed(plan.epics, plan.description)
+
+    for kind, query, key in (
+        ("epic", "login", "AB-1"),
+        ("story", "anmelden", "AB-2"),
+        ("task", "formular", "AB-3"),
+    ):
+        hits = {h["brief"]: h["jira_key"] for h in index.search(query, kind)}
+        assert hits == {"App A": key, "App B": ""}
+
+
+def test_ticket_keys_use_the_prompt(index):
+    ticket = {"summary": "CSV-Export", "tasks": [], "acceptance_criteria": []}
+    search_index.index_tickets("Export für Admins", [ticket])
+    search_index.index_tickets("Export für Kunden", [ticket])
+    search_index.index_ticket_key("CSV-Export", "AB-7", "Export für Kunden")
+    hits = {h["brief"]: h["jira_key"] for h in index.search("csv", "ticket")}
+    assert hits == {"Export für Admins": "", "Export für Kunden": "AB-7"}
+
+
+def test_hooks_never_raise(index, capsys):
+    search_index.index_epics(["kein dict"], "App")
+    search_index.index_tickets("App", [None])
+    assert "Suchindex nicht aktualisiert" in capsys.readouterr().out
+
@@ -0,0 +1,113 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+import service
+from service import JobQueue, check_params, start_service
+from service_client import ServiceClient, ServiceError
+
+
+def echo(params, emit):
+    for i in range(params.get("events", 0)):
+        emit({"n": i})
+    if params.get("fail"):
+        raise RuntimeError("kaputt")
+    return {"text": params["text"]}
+
+
+@pytest.fixture(autouse=True)
+def echo_job(monkeypatch):
+    monkeypatch.setitem(service.JOB_TYPES, "echo", (echo, ("text",)))
+
+
+@pytest.fixture
+def jobs():
+    jobs = JobQueue(max_workers=2)
+    yield jobs
+    jobs.shutdown()
+
+
+@pytest.fixture
+def client():
+    server, jobs = start_service(port=0, token="geheim")
+    yield ServiceClient(f"http://127.0.0.1:{server.server_address[1]}", "geheim")
+    server.shutdown()
+    server.server_close()
+    jobs.shutdown()
+
+
+def finish(jobs, job):
+    *_, last = jobs.follow(job.id, timeout=1)
+    return last["job"]
+
+
+def test_queue_runs_jobs_and_keeps_events_and_errors(jobs):
+    view = finish(jobs, jobs.submit("echo", {"text": "hallo", "events": 3}))
+    assert view["status"] == "done"
+    assert view["result"] == {"text": "hallo"}
+    assert jobs.view(view["id"])["events"] == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert jobs.view(view["id"], since=2)["events"] == [{"n": 2}]
+
+    view = finish(jobs, jobs.submit("echo", {"text": "x", "fail": True}))
+    assert (view["status"], view["error"]) == ("failed", "kaputt")
+    assert jobs.counts() == {"queued": 0, "running": 0, "done": 1, "failed": 1}
+
+
+def test_params_are_checked_before_queueing(jobs):
+    with pytest.raises(ValueError, match="Unbekannter Job-Typ"):
+        jobs.submit("gibtsnicht", {})
+    with pytest.raises(ValueError, match="text"):
+        jobs.submit("echo", {})
+    assert jobs.views() == []
+
+
+def test_push_needs_epics_or_description_and_yaml():
+    with pytest.raises(ValueError, match="description, yaml"):
+        check_params("push", {"project_key": "AB"})
+    with pytest.raises(ValueError, match="yaml"):
+        check_params("push", {"project_key": "AB", "description": "Shop"})
+    check_params("push", {"project_key": "AB", "epics": []})
+    check_params("push", {"project_key": "AB", "description": "Shop", "yaml": "x"})
+
+
+def test_client_round_trip(client):
+    assert client.health()["ok"]
+    assert client.wait(client.submit("echo", text="hallo"), poll=0.01) == {
+        "text": "hallo"
+    }
+
+    events = []
+    job_id = client.submit("echo", text="x", events=2)
+    client.wait(job_id, on_event=events.append, poll=0.01)
+    assert events == [{"n": 0}, {"n": 1}]
+
+    stream = client.events(client.submit("echo", text="y", events=1))
+    assert list(stream) == [{"n": 0}]
+
+    with pytest.raises(ServiceError, match="kaputt"):
+        client.wait(client.submit("echo", text="z", fail=True), poll=0.01)
+
+
+def test_client_reports_rejected_requests(client):
+    with pytest.raises(ServiceError, match="Fehlende Parameter"):
+        client.submit("echo")
+    with pytest.raises(ServiceError, match="Unbekannter Job"):
+        client.status("999")
+    with pytest.raises(ServiceError, match="Token"):
+        ServiceClient(client.url, "falsch").health()
+
+
+@pytest.mark.parametrize("since", ["abc", "-1"])
+def test_invalid_since_is_a_bad_request(client, since):
+    job_id = client.submit("echo", text="x")
+    req = urllib.request.Request(f"{client.url}/jobs/{job_id}?since={since}")
+    req.add_header("X-Token", "geheim")
+    with pytest.raises(urllib.error.HTTPError) as exc:
+        urllib.request.urlopen(req)
+    assert exc.value.code == 400
+
+
+def test_unreachable_service_raises_service_error():
+    with pytest.raises(ServiceError, match="nicht erreichbar"):
+        ServiceClient("http://127.0.0.1:1").health()
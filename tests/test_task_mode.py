@@ -0,0 +1,85 @@
+import pytest
+
+pytest.importorskip("jira")
+pytest.importorskip("PySide6")
+
+import jira_client  # noqa: E402
+import pusher  # noqa: E402
+from jira_client import parse_task_overrides, story_fields, task_mode  # noqa: E402
+from plan_model import Plan  # noqa: E402
+from reconcile import Changes  # noqa: E402
+
+RAW = [
+    {
+        "epic": "Login",
+        "stories": [
+            {"summary": "Klein", "points": 2, "tasks": ["a", "b"]},
+            {"summary": "Groß", "points": 8, "tasks": ["a", "b", "c"]},
+        ],
+    }
+]
+
+
+@pytest.fixture
+def settings(monkeypatch, memory_settings):
+    monkeypatch.setattr(jira_client, "QSettings", memory_settings)
+    return memory_settings.data
+
+
+def test_default_is_subtasks(settings):
+    assert task_mode("AB") == ("subtasks", jira_client.DEFAULT_TASK_THRESHOLD)
+
+
+def test_project_overrides(settings):
+    settings.update(
+        {
+            "tasks/mode": "checklist",
+            "tasks/threshold": 5,
+            "tasks/projects": "ab=threshold:8, XY=subtasks",
+        }
+    )
+    assert task_mode("AB") == ("threshold", 8)
+    assert task_mode("XY") == ("subtasks", 5)
+    assert task_mode("QQ") == ("checklist", 5)
+    assert task_mode() == ("checklist", 5)
+
+
+def test_invalid_override_falls_back_to_the_default(settings, capsys):
+    settings.update({"tasks/mode": "checklist", "tasks/projects": "AB=checklst"})
+    assert task_mode("AB")[0] == "checklist"
+    assert "checklst" in capsys.readouterr().out
+
+
+def test_parse_overrides_reports_bad_entries():
+    text = "AB=threshold:3, XY, CD=foo, EF=threshold:x,"
+    overrides, invalid = parse_task_overrides(text)
+    assert overrides == {"AB": ("threshold", 3)}
+    assert invalid == ["XY", "CD=foo", "EF=threshold:x"]
+
+
+@pytest.mark.parametrize(
+    "mode, expected",
+    [("subtasks", 1 + 2 + 5), ("checklist", 1 + 2), ("threshold", 1 + 2 + 3)],
+)
+def test_operation_counts_follow_the_mode(settings, mode, expected):
+    settings.update({"tasks/mode": mode, "tasks/threshold": 5})
+    plan = Plan.from_llm(RAW)
+    assert pusher.count_operations(plan, "AB") == expected
+
+
+def test_checklist_goes_into_the_description(monkeypatch):
+    monkeypatch.setattr(jira_client, "get_create_fields", lambda *a: {})
+    story = {"summary": "Klein", "acceptance_criteria": ["ok"], "tasks": ["a", "b"]}
+    plain = story_fields(None, "AB", None, story)
+    checklist = story_fields(None, "AB", None, story, checklist=True)
+    assert plain["description"] == "* ok"
+    assert checklist["description"] == "* ok\n\n*Aufgaben:*\n* ☐ a\n* ☐ b"
+
+
+@pytest.mark.parametrize(
+    "mode, label", [("checklist", "Checkliste"), ("threshold", "Punkte-Schwelle")]
+)
+def test_savings_are_labelled_by_mode(mode, label):
+    changes = Changes(task_mode=(mode, 5), saved=3)
+    assert "3 API-Aufrufe gespart" in changes.summary()
+    assert label in changes.summary()
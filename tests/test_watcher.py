@@ -0,0 +1,58 @@
+import sys
+import textwrap
+
+import pytest
+
+pytest.importorskip("watchdog")
+
+import watcher  # noqa: E402
+
+SOURCES = {
+    "base.py": "VALUE = 1\n",
+    "mid.py": "from base import VALUE\n\ndef value():\n    return VALUE\n",
+    "top.py": "import mid\nfrom mid import value\n",
+    "lazy.py": "def value():\n    from base import VALUE\n    return VALUE\n",
+    "other.py": "X = 0\n",
+    "pkg/__init__.py": "",
+    "pkg/view.py": "from top import value\n",
+}
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    for name, source in SOURCES.items():
+        path = tmp_path / name
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(textwrap.dedent(source))
+    monkeypatch.setattr(watcher, "ROOT", str(tmp_path))
+    # same size, same second: a cached .pyc would hide the change
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    names = ("base", "mid", "top", "lazy", "other", "pkg", "pkg.view")
+    for name in names:
+        __import__(name)
+    yield tmp_path
+    for name in names:
+        sys.modules.pop(name, None)
+
+
+def test_dependents_are_reloaded_after_their_imports(project):
+    (project / "base.py").write_text("VALUE = 2\n")
+    order = watcher.reload_modules([str(project / "base.py")])
+
+    # lazy imports base inside a function only, other doesn't import it
+    assert set(order) == {"base", "mid", "top", "pkg.view"}
+    assert order.index("base") < order.index("mid") < order.index("top")
+    assert order.index("top") < order.index("pkg.view")
+    assert sys.modules["pkg.view"].value() == 2
+    assert sys.modules["lazy"].value() == 2
+
+
+def test_unloaded_and_unrelated_files_reload_nothing_else(project):
+    (project / "new.py").write_text("")
+    assert watcher.reload_modules([str(project / "new.py")]) == []
+    assert watcher.reload_modules([str(project / "other.py")]) == ["other"]
+
+
+def test_window_state_includes_the_speculation():
+    assert {"spec_key", "spec_result", "spec_waiting"} <= set(watcher.STATE_ATTRS)
@@ -0,0 +1,119 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+pytest.importorskip("jira")
+pytest.importorskip("PySide6")
+
+import backlog_mirror  # noqa: E402
+import webhook  # noqa: E402
+from cache import TTLCache  # noqa: E402
+
+LOGIN = "Anmelden mit E-Mail und Passwort auf allen Geräten"
+
+
+@pytest.fixture
+def cache():
+    cache = TTLCache()
+    cache.set(("projects",), [{"key": "AB", "name": "Alpha"}])
+    cache.set(("sprints", 1), [{"id": 11, "name": "Sprint 1", "state": "future"}])
+    return cache
+
+
+@pytest.fixture
+def index(monkeypatch):
+    mirror = backlog_mirror.BacklogMirror(":memory:")
+    monkeypatch.setattr(backlog_mirror, "_mirror", mirror)
+    return mirror.duplicate_index("AB")
+
+
+def issue_event(event, key, **fields):
+    return {"webhookEvent": event, "issue": {"key": key, "fields": fields}}
+
+
+def test_issue_events_update_the_duplicate_index(cache, index):
+    created = issue_event("jira:issue_created", "AB-1", summary=LOGIN)
+    assert webhook.apply_event(created, cache)
+    assert index.best_match(LOGIN)[0] == "AB-1"
+
+    webhook.apply_event(issue_event("jira:issue_deleted", "AB-1"), cache)
+    assert index.best_match(LOGIN) is None
+
+
+def test_partial_issue_payload_invalidates(cache, index):
+    cache.set(("issues", "AB"), index)
+    webhook.apply_event(issue_event("jira:issue_updated", "AB-1", status={}), cache)
+    assert cache.get(("issues", "AB")) is None
+    assert len(index) == 0
+
+
+def test_sprint_events_patch_the_board_list(cache):
+    started = {"id": 11, "name": "Sprint 1", "state": "active", "originBoardId": 1}
+    created = {"id": 12, "name": "Sprint 2", "state": "future", "originBoardId": 1}
+    webhook.apply_event({"webhookEvent": "sprint_started", "sprint": started}, cache)
+    webhook.apply_event({"webhookEvent": "sprint_created", "sprint": created}, cache)
+    assert [(s["id"], s["state"]) for s in cache.get(("sprints", 1))] == [
+        (11, "active"),
+        (12, "future"),
+    ]
+
+    deleted = {"id": 11, "originBoardId": 1}
+    webhook.apply_event({"webhookEvent": "sprint_deleted", "sprint": deleted}, cache)
+    assert [s["id"] for s in cache.get(("sprints", 1))] == [12]
+
+
+def test_partial_sprint_payload_invalidates_instead_of_failing(cache):
+    partial = {"id": 11, "originBoardId": 1}  # no name/state
+    event = {"webhookEvent": "sprint_updated", "sprint": partial}
+    assert webhook.apply_event(event, cache)
+    assert cache.get(("sprints", 1)) is None
+
+    cache.set(("sprints", 2), [])
+    webhook.apply_event({"webhookEvent": "sprint_closed", "sprint": {}}, cache)
+    assert cache.get(("sprints", 2)) is None
+
+
+def test_project_events(cache):
+    webhook.apply_event(
+        {"webhookEvent": "project_created", "project": {"key": "NEW", "name": "Neu"}},
+        cache,
+    )
+    assert [p["key"] for p in cache.get(("projects",))] == ["AB", "NEW"]
+    cache.set(("boards", "AB"), 1)
+    webhook.apply_event(
+        {"webhookEvent": "project_deleted", "project": {"key": "AB"}}, cache
+    )
+    assert [p["key"] for p in cache.get(("projects",))] == ["NEW"]
+    assert cache.get(("boards", "AB")) is None
+
+
+def test_unknown_events_are_ignored(cache):
+    assert not webhook.apply_event({"webhookEvent": "comment_created"}, cache)
+
+
+def post(url, body):
+    req = urllib.request.Request(url, data=body, method="POST")
+    try:
+        with urllib.request.urlopen(req) as res:
+            return res.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_listener_checks_path_secret_and_body(cache):
+    server = webhook.start_listener(port=0, secret="geheim", cache=cache)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    url = f"{base}{webhook.WEBHOOK_PATH}?secret=geheim"
+    event = {"webhookEvent": "project_created", "project": {"key": "NEW"}}
+    try:
+        assert post(f"{base}/other", b"{}") == 404
+        assert post(f"{base}{webhook.WEBHOOK_PATH}?secret=falsch", b"{}") == 403
+        assert post(url, b"kein json") == 400
+        assert post(url, b"[1, 2]") == 400
+        assert post(url, json.dumps(event).encode()) == 204
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert "NEW" in [p["key"] for p in cache.get(("projects",))]
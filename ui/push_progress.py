@@ -0,0 +1,178 @@
+# push_progress.py
+import time
+from collections import deque
+
+from PySide6.QtCore import QThread, Signal, Slot
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QLabel,
+    QProgressBar,
+    QPlainTextEdit,
+    QDialogButtonBox,
+)
+
+from jira_client import TASK_MODES, get_jira, task_mode
+from pipeline import generate_and_push
+from pusher import PushEvent, count_operations, push_plan
+
+# how many of the latest events the rolling throughput and latency use
+WINDOW = 20
+
+_LINES = {
+    "sprint": "🏃 {name} (ID {key}) angelegt",
+    "epic": "  ✔ Epic {key} für {name}",
+    "story": "     ↳ Story {key} – {name}",
+    "subtask": "        • {key} {name}",
+    "skip": "     ⚠ Übersprungen: {name} (Duplikat von {key})",
+}
+
+
+class PushWorker(QThread):
+    """Runs ``push_plan`` off the UI thread and forwards its events."""
+
+    event = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, plan, project_key: str, parent=None):
+        super().__init__(parent)
+        self.plan = plan
+        self.project_key = project_key
+
+    def run(self):
+        try:
+            push_plan(get_jira(), self.plan, self.project_key, self.event.emit)
+        except Exception as exc:
+            self.failed.emit(str(exc))
+
+
+class PipelineWorker(QThread):
+    """Runs ``generate_and_push`` off the UI thread and forwards its events.
+
+    ``plan`` is filled while the worker runs and holds everything pushed so
+    far, also when the worker failed.
+    """
+
+    event = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, epics, plan, project_key: str, velocity: int, parent=None):
+        super().__init__(parent)
+        self.epics = epics
+        self.plan = plan
+        self.project_key = project_key
+        self.velocity = velocity
+
+    def run(self):
+        try:
+            generate_and_push(
+                get_jira(),
+                self.epics,
+                self.plan,
+                self.project_key,
+                self.event.emit,
+                self.velocity,
+            )
+        except Exception as exc:
+            self.failed.emit(str(exc))
+
+
+class PushProgressDialog(QDialog):
+    """Live log of a running push with throughput, latency and ETA.
+
+    Without ``worker`` the dialog pushes ``plan`` with a ``PushWorker``; a
+    ``PipelineWorker`` can be passed instead, the total then grows with the
+    generated epics. ``done`` is emitted once the worker has stopped, after
+    a failure too.
+    """
+
+    done = Signal()
+
+    def __init__(self, plan, project_key: str, parent=None, worker=None):
+        super().__init__(parent)
+        self.setWindowTitle("Stories an Jira senden")
+        self.setMinimumSize(640, 420)
+
+        v = QVBoxLayout(self)
+        self.bar = QProgressBar()
+        self.bar.setRange(0, count_operations(plan, project_key))
+        v.addWidget(self.bar)
+        self.stats_lbl = QLabel("⏳ Verbinde mit Jira …")
+        v.addWidget(self.stats_lbl)
+        self.log = QPlainTextEdit()
+        self.log.setReadOnly(True)
+        v.addWidget(self.log, stretch=1)
+        self.btns = QDialogButtonBox(QDialogButtonBox.Close)
+        self.btns.rejected.connect(self.reject)
+        self.btns.setEnabled(False)
+        v.addWidget(self.btns)
+
+        self._stamps = deque(maxlen=WINDOW)
+        self._latencies = deque(maxlen=WINDOW)
+        self._started = time.perf_counter()
+        self._saved = 0
+        self._mode = TASK_MODES[task_mode(project_key)[0]]
+        self.error = None
+
+        self.worker = worker or PushWorker(plan, project_key, self)
+        self.worker.event.connect(self.on_event)
+        self.worker.failed.connect(self.on_failed)
+        self.worker.finished.connect(self.on_finished)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self.worker.start()
+
+    @Slot(object)
+    def on_event(self, ev: PushEvent):
+        now = time.perf_counter()
+        self._stamps.append((now, ev.done))
+        self._saved = ev.saved
+        if ev.kind != "skip":
+            self._latencies.append(ev.seconds)
+
+        line = _LINES[ev.kind].format(key=ev.key, name=ev.name)
+        if ev.kind != "skip":
+            line += f"  ({ev.seconds * 1000:.0f} ms)"
+        self.log.appendPlainText(line)
+        if ev.total != self.bar.maximum():
+            self.bar.setMaximum(ev.total)
+        self.bar.setValue(ev.done)
+
+        first_t, first_done = self._stamps[0]
+        if now > first_t and ev.done > first_done:
+            rate = (ev.done - first_done) / (now - first_t)
+        else:
+            rate = ev.done / max(now - self._started, 1e-6)
+        latency = sum(self._latencies) / len(self._latencies) if self._latencies else 0
+        eta = (ev.total - ev.done) / rate if rate else 0
+        self.stats_lbl.setText(
+            f"{ev.done}/{ev.total} Issues · {rate:.1f} Issues/s · "
+            f"Ø {latency * 1000:.0f} ms pro Aufruf · "
+            f"noch ca. {int(eta) // 60}:{int(eta) % 60:02d} min"
+        )
+
+    @Slot(str)
+    def on_failed(self, msg: str):
+        self.error = msg
+        self.log.appendPlainText(f"❌ Abgebrochen: {msg}")
+
+    @Slot()
+    def on_finished(self):
+        secs = time.perf_counter() - self._started
+        if self.error is None:
+            self.bar.setValue(self.bar.maximum())
+            text = f"Alles angelegt 🎉 in {secs:.1f} s"
+            if self._saved:
+                text += f" · {self._saved} API-Aufrufe gespart ({self._mode})"
+            self.stats_lbl.setText(text)
+        else:
+            self.stats_lbl.setText(f"❌ Push fehlgeschlagen nach {secs:.1f} s")
+        self.btns.setEnabled(True)
+        self.done.emit()
+
+    def reject(self):
+        # closing while the worker runs would kill the thread mid-push
+        if self.worker.isRunning():
+            return
+        super().reject()
@@ -0,0 +1,122 @@
+# search_tab.py
+import time
+from datetime import datetime
+
+from PySide6.QtCore import QTimer, Slot
+from PySide6.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QComboBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QPlainTextEdit,
+)
+
+from search_index import get_index
+
+_KINDS = {
+    "": "Alles",
+    "brief": "Briefings",
+    "stack": "Tech-Stacks",
+    "epic": "Epics",
+    "story": "Stories",
+    "task": "Tasks",
+    "criterion": "Akzeptanzkriterien",
+    "ticket": "Tickets",
+}
+
+
+class SearchTab(QWidget):
+    """Search box over everything generated so far (local FTS5 index)."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._setup_ui()
+        self._hits = []
+
+    def _setup_ui(self):
+        l = QVBoxLayout(self)  # noqa: E741
+
+        row = QHBoxLayout()
+        self.query_le = QLineEdit()
+        self.query_le.setPlaceholderText("Suchen in Briefings, Stacks, Stories … ")
+        self.query_le.setClearButtonEnabled(True)
+        row.addWidget(self.query_le, stretch=1)
+        self.kind_cb = QComboBox()
+        for kind, label in _KINDS.items():
+            self.kind_cb.addItem(label, kind)
+        row.addWidget(self.kind_cb)
+        l.addLayout(row)
+
+        self.status_lbl = QLabel("")
+        l.addWidget(self.status_lbl)
+
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(
+            ["Art", "Titel", "Treffer", "Jira", "Datum"]
+        )
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.currentCellChanged.connect(self.show_hit)
+        l.addWidget(self.table, stretch=2)
+
+        self.detail = QPlainTextEdit()
+        self.detail.setReadOnly(True)
+        l.addWidget(self.detail, stretch=1)
+
+        # search while typing, but not on every single key of a fast typist
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(120)
+        self._timer.timeout.connect(self.run_search)
+        self.query_le.textChanged.connect(self._timer.start)
+        self.kind_cb.currentIndexChanged.connect(self.run_search)
+
+    @Slot()
+    def run_search(self):
+        text = self.query_le.text()
+        t0 = time.perf_counter()
+        self._hits = get_index().search(text, self.kind_cb.currentData() or None)
+        ms = (time.perf_counter() - t0) * 1000
+
+        self.table.setRowCount(len(self._hits))
+        for i, hit in enumerate(self._hits):
+            created = datetime.fromtimestamp(hit["created"]).strftime("%d.%m.%Y %H:%M")
+            cells = [
+                _KINDS.get(hit["kind"], hit["kind"]),
+                hit["title"],
+                hit["snippet"].replace("\n", " "),
+                hit["jira_key"],
+                created,
+            ]
+            for col, value in enumerate(cells):
+                item = QTableWidgetItem(value)
+                item.setToolTip(value)
+                self.table.setItem(i, col, item)
+        self.table.resizeColumnToContents(0)
+        self.detail.clear()
+        if text.strip():
+            self.status_lbl.setText(f"{len(self._hits)} Treffer in {ms:.1f} ms")
+        else:
+            self.status_lbl.clear()
+
+    @Slot(int, int, int, int)
+    def show_hit(self, row, col, prev_row, prev_col):
+        if not 0 <= row < len(self._hits):
+            return
+        hit = self._hits[row]
+        lines = [hit["title"]]
+        if hit["context"]:
+            lines.append(f"({hit['context']})")
+        if hit["brief"] and hit["brief"] != hit["context"]:
+            lines.append(f"Briefing: {hit['brief']}")
+        if hit["jira_key"]:
+            lines.append(f"Jira: {hit['jira_key']}")
+        if hit["body"]:
+            lines += ["", hit["body"]]
+        self.detail.setPlainText("\n".join(lines))
@@ -6,8 +6,17 @@ from PySide6.QtWidgets import (
     QPushButton,
     QMessageBox,
     QFormLayout,
+    QSpinBox,
+    QCheckBox,
+    QComboBox,
 )
 
+from cache import DEFAULT_TTL, jira_cache
+from jira_client import DEFAULT_TASK_THRESHOLD, TASK_MODES, parse_task_overrides
+from model_router import DEFAULT_ROUTES
+from planner import DEFAULT_VELOCITY
+from webhook import DEFAULT_PORT
+
 
 class SettingsTab(QWidget):
     def __init__(self, parent=None):
@@ -21,6 +30,39 @@ class SettingsTab(QWidget):
         self.jira_email = QLineEdit()
         self.jira_token = QLineEdit()
         self.openai_key = QLineEdit()
+        self.velocity = QSpinBox()
+        self.velocity.setRange(1, 500)
+        self.velocity.setSuffix(" SP / Sprint")
+        self.webhook_enabled = QCheckBox("Jira-Webhooks empfangen (Neustart nötig)")
+        self.webhook_port = QSpinBox()
+        self.webhook_port.setRange(1024, 65535)
+        self.webhook_secret = QLineEdit()
+        self.cache_ttl = QSpinBox()
+        self.cache_ttl.setRange(10, 86400)
+        self.cache_ttl.setSuffix(" s")
+        self.speculate = QCheckBox(
+            "Stories schon während der Stack-Bestätigung vorbereiten"
+        )
+        self.service_url = QLineEdit()
+        self.service_url.setPlaceholderText(
+            "leer = lokal, z. B. http://127.0.0.1:8766 (python service.py)"
+        )
+        self.service_token = QLineEdit()
+        self.task_mode = QComboBox()
+        for mode, label in TASK_MODES.items():
+            self.task_mode.addItem(label, mode)
+        self.task_threshold = QSpinBox()
+        self.task_threshold.setRange(1, 100)
+        self.task_threshold.setSuffix(" SP")
+        self.task_projects = QLineEdit()
+        self.task_projects.setPlaceholderText(
+            "je Projekt, z. B. ABC=checklist, XYZ=threshold:8"
+        )
+        self.model_edits = {}
+        for call_type, route in DEFAULT_ROUTES.items():
+            edit = QLineEdit()
+            edit.setPlaceholderText(", ".join(route["models"]))
+            self.model_edits[call_type] = edit
         save_btn = QPushButton("Speichern")
         save_btn.clicked.connect(self._save_settings)
 
@@ -33,6 +75,19 @@ class SettingsTab(QWidget):
         form.addRow("Jira-Email:", self.jira_email)
         form.addRow("Jira-Token:", self.jira_token)
         form.addRow("OpenAI API-Key:", self.openai_key)
+        form.addRow("Team-Velocity:", self.velocity)
+        form.addRow("Webhook:", self.webhook_enabled)
+        form.addRow("Webhook-Port:", self.webhook_port)
+        form.addRow("Webhook-Secret:", self.webhook_secret)
+        form.addRow("Cache-Gültigkeit:", self.cache_ttl)
+        form.addRow("Vorausberechnung:", self.speculate)
+        form.addRow("Dienst-URL:", self.service_url)
+        form.addRow("Dienst-Token:", self.service_token)
+        form.addRow("Tasks als:", self.task_mode)
+        form.addRow("Sub-Tasks ab:", self.task_threshold)
+        form.addRow("Tasks je Projekt:", self.task_projects)
+        for call_type, edit in self.model_edits.items():
+            form.addRow(f"Modelle ({call_type}):", edit)
         form.addRow(QLabel(), save_btn)
 
     def _load_settings(self):
@@ -40,6 +95,30 @@ class SettingsTab(QWidget):
         self.jira_email.setText(self.settings.value("jira/email", ""))
         self.jira_token.setText(self.settings.value("jira/token", ""))
         self.openai_key.setText(self.settings.value("openai/key", ""))
+        self.velocity.setValue(
+            self.settings.value("planner/velocity", DEFAULT_VELOCITY, type=int)
+        )
+        self.webhook_enabled.setChecked(
+            self.settings.value("webhook/enabled", False, type=bool)
+        )
+        self.webhook_port.setValue(
+            self.settings.value("webhook/port", DEFAULT_PORT, type=int)
+        )
+        self.webhook_secret.setText(self.settings.value("webhook/secret", ""))
+        self.cache_ttl.setValue(self.settings.value("cache/ttl", DEFAULT_TTL, type=int))
+        self.speculate.setChecked(
+            self.settings.value("ai/speculate", True, type=bool)
+        )
+        self.service_url.setText(self.settings.value("service/url", ""))
+        self.service_token.setText(self.settings.value("service/token", ""))
+        index = self.task_mode.findData(self.settings.value("tasks/mode", "subtasks"))
+        self.task_mode.setCurrentIndex(max(index, 0))
+        self.task_threshold.setValue(
+            self.settings.value("tasks/threshold", DEFAULT_TASK_THRESHOLD, type=int)
+        )
+        self.task_projects.setText(self.settings.value("tasks/projects", ""))
+        for call_type, edit in self.model_edits.items():
+            edit.setText(self.settings.value(f"ai/models/{call_type}", ""))
 
     @Slot()
     def _save_settings(self):
@@ -47,7 +126,31 @@ class SettingsTab(QWidget):
         self.settings.setValue("jira/email", self.jira_email.text())
         self.settings.setValue("jira/token", self.jira_token.text())
         self.settings.setValue("openai/key", self.openai_key.text())
+        self.settings.setValue("planner/velocity", self.velocity.value())
+        self.settings.setValue("webhook/enabled", self.webhook_enabled.isChecked())
+        self.settings.setValue("webhook/port", self.webhook_port.value())
+        self.settings.setValue("webhook/secret", self.webhook_secret.text())
+        self.settings.setValue("cache/ttl", self.cache_ttl.value())
+        jira_cache.ttl = self.cache_ttl.value()
+        self.settings.setValue("ai/speculate", self.speculate.isChecked())
+        self.settings.setValue("service/url", self.service_url.text().strip())
+        self.settings.setValue("service/token", self.service_token.text())
+        self.settings.setValue("tasks/mode", self.task_mode.currentData())
+        self.settings.setValue("tasks/threshold", self.task_threshold.value())
+        self.settings.setValue("tasks/projects", self.task_projects.text().strip())
+        for call_type, edit in self.model_edits.items():
+            self.settings.setValue(f"ai/models/{call_type}", edit.text())
         self.settings.sync()
+        _, invalid = parse_task_overrides(self.task_projects.text())
+        if invalid:
+            QMessageBox.warning(
+                self,
+                "Tasks je Projekt",
+                "Gespeichert, aber diese Einträge werden ignoriert:\n"
+                + "\n".join(invalid)
+                + f"\n\nErlaubte Modi: {', '.join(TASK_MODES)}",
+            )
+            return
         QMessageBox.information(
             self, "Gespeichert", "Jira-Einstellungen wurden gespeichert."
         )
@@ -7,9 +7,28 @@ from PySide6.QtWidgets import (
     QTextEdit,
     QPushButton,
     QMessageBox,
+    QListWidget,
 )
 from PySide6.QtCore import Slot, QEvent
-from jira_client import get_jira, ensure_board, add_issue_to_sprint, create_story
+from jira_client import (
+    get_jira,
+    ensure_board,
+    add_issue_to_sprint,
+    create_story,
+    list_projects,
+    list_sprints,
+)
+from dedup import story_text
+from backlog_mirror import get_mirror
+from search_index import index_ticket_key
+from ui.worker import FunctionWorker
+
+
+def _sync_backlog(jira, project_key: str) -> None:
+    mirror = get_mirror()
+    mirror.sync(jira, project_key)
+    # built here instead of on the UI thread when the first ticket is checked
+    mirror.duplicate_index(project_key)
 
 
 class TicketTab(QWidget):
@@ -18,6 +37,8 @@ class TicketTab(QWidget):
         self._setup_ui()
         self.current_sprint_id = None
         self._projects_loaded = False
+        self.mirror_worker = None
+        self._mirror_next = None
 
     def showEvent(self, event: QEvent):
         super().showEvent(event)
@@ -41,8 +62,14 @@ class TicketTab(QWidget):
         # Dropdown, selecting a sprint
         l.addWidget(QLabel("Sprint auswählen:"))
         self.sprint_cb = QComboBox()
+        self.sprint_cb.currentIndexChanged.connect(self.show_sprint_issues)
         l.addWidget(self.sprint_cb)
 
+        # issues already in the selected sprint (from the local mirror)
+        l.addWidget(QLabel("Vorhandene Issues im Sprint:"))
+        self.issue_list = QListWidget()
+        l.addWidget(self.issue_list, stretch=1)
+
         # text for AI prompt
         l.addWidget(QLabel("Ticket-Inhalt (AI-Prompt):"))
         self.prompt_te = QTextEdit()
@@ -74,8 +101,10 @@ class TicketTab(QWidget):
         if self._projects_loaded:
             return
 
-        for project in jira.projects():
-            self.project_cb.addItem(f"{project.key} – {project.name}", project.key)
+        for project in list_projects(jira):
+            self.project_cb.addItem(
+                f"{project['key']} – {project['name']}", project["key"]
+            )
         self._projects_loaded = True
 
     def load_sprints(self):
@@ -84,7 +113,8 @@ class TicketTab(QWidget):
 
         This function first ensures that Jira projects are loaded. It then retrieves the
         currently selected project's key and fetches its associated sprints, populating
-        the dropdown with active and future sprints.
+        the dropdown with active and future sprints. The sprints come from the shared
+        cache, which the webhook listener keeps up to date.
 
         Raises:
             Exception: If the Jira instance cannot be obtained or if the project key is not selected.
@@ -109,11 +139,48 @@ class TicketTab(QWidget):
 
         project_key = self.project_cb.currentData()
         board = ensure_board(jira, project_key)
-        sprints = jira.sprints(board)
+        sprints = list_sprints(jira, board)
         self.sprint_cb.clear()
         for s in sprints:
-            if s.state in ("active", "future"):
-                self.sprint_cb.addItem(f"{s.name} [{s.state}]", s.id)
+            if s["state"] in ("active", "future"):
+                self.sprint_cb.addItem(f"{s['name']} [{s['state']}]", s["id"])
+        self.sync_mirror(jira, project_key)
+
+    def sync_mirror(self, jira, project_key: str):
+        """Syncs the backlog mirror in the background, then refreshes the list.
+
+        The first sync of a project reads its whole backlog, which would
+        freeze the window on the UI thread.
+        """
+        if self.mirror_worker is not None and self.mirror_worker.isRunning():
+            # one sync at a time, the latest request runs afterwards
+            self._mirror_next = (jira, project_key)
+            return
+        worker = FunctionWorker(_sync_backlog, jira, project_key, parent=self)
+        worker.done.connect(lambda _: self.show_sprint_issues())
+        worker.failed.connect(lambda msg: print("⮕ Backlog-Abgleich:", msg))
+        worker.finished.connect(self._sync_next)
+        self.mirror_worker = worker
+        worker.start()
+
+    @Slot()
+    def _sync_next(self):
+        if self._mirror_next is not None:
+            args, self._mirror_next = self._mirror_next, None
+            self.sync_mirror(*args)
+
+    @Slot()
+    def show_sprint_issues(self):
+        """Lists the issues of the selected sprint from the local backlog mirror."""
+        self.issue_list.clear()
+        project_key = self.project_cb.currentData()
+        sprint_id = self.sprint_cb.currentData()
+        if not project_key or sprint_id is None:
+            return
+        for issue in get_mirror().issues(project_key, sprint_id=sprint_id):
+            self.issue_list.addItem(
+                f"{issue['key']}  {issue['summary']}  [{issue['status'] or '–'}]"
+            )
 
     @Slot()
     def on_create_ticket(self):
@@ -126,9 +193,13 @@ class TicketTab(QWidget):
             )
             return
 
-        from ai import generate_ticket_content
+        from service_client import run_job
 
-        result = generate_ticket_content(prompt)
+        try:
+            result = run_job("ticket", prompt=prompt)
+        except Exception as exc:
+            QMessageBox.critical(self, "LLM-Fehler", str(exc))
+            return
         tickets = result if isinstance(result, list) else [result]
 
         try:
@@ -141,23 +212,33 @@ class TicketTab(QWidget):
             )
             return
 
+        # loading the sprints synced the mirror and built the index in the
+        # background, the UI thread doesn't wait for Jira here; create_story
+        # adds the new keys
+        dup_index = get_mirror().duplicate_index(project_key)
+
         created_keys = []
+        skipped = []
         for ticket in tickets:
-            story_key = create_story(
-                jira,
-                project_key,
-                None,
-                {
-                    "summary": ticket.get("summary", ""),
-                    "acceptance_criteria": ticket.get("acceptance_criteria", []),
-                    "points": ticket.get("points", 1),
-                    "tasks": ticket.get("tasks", []),
-                },
-            )
+            story = {
+                "summary": ticket.get("summary", ""),
+                "acceptance_criteria": ticket.get("acceptance_criteria", []),
+                "points": ticket.get("points", 1),
+                "tasks": ticket.get("tasks", []),
+            }
+            text = story_text(story)
+            dup = dup_index.best_match(text)
+            if dup:
+                skipped.append(f"{story['summary']} (≈ {dup[0]}, {dup[1]:.0%})")
+                continue
+            story_key = create_story(jira, project_key, None, story)
             add_issue_to_sprint(jira, sprint_id, story_key)
+            index_ticket_key(story["summary"], story_key, prompt)
             created_keys.append(story_key)
 
-        QMessageBox.information(
-            self, "Erfolg", f"Tickets angelegt: {', '.join(created_keys)} im Sprint."
-        )
+        msg = f"Tickets angelegt: {', '.join(created_keys) or '–'} im Sprint."
+        if skipped:
+            msg += "\n\nAls Duplikat übersprungen:\n" + "\n".join(skipped)
+        self.sync_mirror(jira, project_key)
+        QMessageBox.information(self, "Erfolg", msg)
         self.prompt_te.clear()
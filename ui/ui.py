@@ -1,5 +1,5 @@
 # ui.py
-from PySide6.QtCore import Slot
+from PySide6.QtCore import QSettings, Qt, Slot
 from PySide6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -15,15 +15,24 @@ from PySide6.QtWidgets import (
     QDialogButtonBox,
     QPlainTextEdit,
     QTabWidget,
+    QFileDialog,
+    QInputDialog,
 )
 import yaml
 import re
 
-from ai import suggest_stack, revise_stack, decompose_project
 from dialogs.project_dialog import ProjectDialog
-from jira_client import create_jira_project
+from jira_client import create_jira_project, get_jira
+from plan_model import Plan
+from planner import DEFAULT_VELOCITY
+from cache import DEFAULT_TTL, jira_cache
+from webhook import DEFAULT_PORT, start_listener
 from ui.ticket_tab import TicketTab
 from ui.settings_tab import SettingsTab
+from ui.search_tab import SearchTab
+from ui.push_progress import PipelineWorker, PushProgressDialog
+from ui.worker import FunctionWorker
+from service_client import run_job
 
 
 def clean_yaml(raw: str) -> str:
@@ -88,6 +97,9 @@ class MainWindow(QMainWindow):
         self.in_edit = QTextEdit()
         self.in_edit.setPlaceholderText("Beschreibe dein Projekt …")
 
+        self.doc_btn = QPushButton("Spezifikation laden (Markdown/Text) …")
+        self.doc_btn.clicked.connect(self.on_load_document)
+
         self.ask_btn = QPushButton("Tech-Stack vorschlagen")
         self.ask_btn.clicked.connect(self.on_suggest)
 
@@ -108,13 +120,28 @@ class MainWindow(QMainWindow):
         self.mod_btn.clicked.connect(self.on_modify)
 
         self.gen_btn = QPushButton("User-Stories generieren")
+        self.pipe_btn = QPushButton("Generieren und gleich an Jira senden")
         self.push_btn = QPushButton("Stories an Jira senden")
-
-        for b in (self.gen_btn, self.push_btn):
+        self.sync_btn = QPushButton("Änderungen mit Jira abgleichen")
+        self.export_btn = QPushButton("Als Jira-Import exportieren (CSV/JSON)")
+        self.regen_btn = QPushButton("Ausgewähltes Epic / Story neu generieren")
+
+        for b in (
+            self.gen_btn,
+            self.pipe_btn,
+            self.push_btn,
+            self.sync_btn,
+            self.export_btn,
+            self.regen_btn,
+        ):
             b.setEnabled(False)  # anfangs deaktiviert
 
         self.gen_btn.clicked.connect(self.on_generate_stories)
+        self.pipe_btn.clicked.connect(self.on_generate_and_push)
         self.push_btn.clicked.connect(self.on_push_to_jira)
+        self.sync_btn.clicked.connect(self.on_sync_to_jira)
+        self.export_btn.clicked.connect(self.on_export_plan)
+        self.regen_btn.clicked.connect(self.on_regenerate_selected)
 
         # ------------ Layout ------------
         tabs = QTabWidget()
@@ -124,6 +151,7 @@ class MainWindow(QMainWindow):
         lyt1 = QVBoxLayout(tab1)
         lyt1.addWidget(QLabel("Projekt anlegen & Tech-Stack"))
         lyt1.addWidget(self.in_edit)
+        lyt1.addWidget(self.doc_btn)
         lyt1.addWidget(self.ask_btn)
         lyt1.addWidget(self.tree)
         lyt1.addWidget(self.question_lbl)
@@ -131,13 +159,20 @@ class MainWindow(QMainWindow):
         lyt1.addWidget(self.mod_btn)
         lyt1.addWidget(QLabel("User-Stories & Jira"))
         lyt1.addWidget(self.gen_btn)
+        lyt1.addWidget(self.pipe_btn)
+        lyt1.addWidget(self.regen_btn)
         lyt1.addWidget(self.push_btn)
+        lyt1.addWidget(self.sync_btn)
+        lyt1.addWidget(self.export_btn)
         tabs.addTab(tab1, "Projekt")
 
         # --- Tab 2: Stories & Jira-Push ---
         self.ticket_tab = TicketTab()
         tabs.addTab(self.ticket_tab, "Tickets")
 
+        # --- Search ---
+        tabs.addTab(SearchTab(), "Suche")
+
         # --- Tab 3: Settings ---
         tab3 = SettingsTab()
         tabs.addTab(tab3, "Einstellungen")
@@ -146,9 +181,65 @@ class MainWindow(QMainWindow):
 
         # ---------- State ----------
         self.yaml_raw = ""
-        self.stories = []
+        self.plan = Plan()
+        # speculative decompose_project run: (description, yaml) it was
+        # started for, its worker and (raw, error) once it has finished
+        self.spec_key = None
+        self.spec_worker = None
+        self.spec_result = None
+        self.spec_waiting = False
+        # a push, sync or regeneration is working on the plan
+        self.plan_locked = False
+
+        # ---------- Cache / Webhooks ----------
+        settings = QSettings("PrinzCodeAgent")
+        jira_cache.ttl = settings.value("cache/ttl", DEFAULT_TTL, type=int)
+        self.webhook_server = None
+        if settings.value("webhook/enabled", False, type=bool):
+            try:
+                self.webhook_server = start_listener(
+                    port=settings.value("webhook/port", DEFAULT_PORT, type=int),
+                    secret=settings.value("webhook/secret", "", type=str),
+                )
+            except OSError as exc:
+                print("⮕ Webhook-Listener nicht gestartet:", exc)
 
     # ---------- Slots ----------
+    @Slot()
+    def on_load_document(self) -> None:
+        from ingest import ingest_document
+
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Spezifikation laden", "", "Dokumente (*.md *.markdown *.txt)"
+        )
+        if not path:
+            return
+
+        self.doc_btn.setEnabled(False)
+        self.ask_btn.setEnabled(False)
+        self.question_lbl.setText("⏳ Dokument wird zusammengefasst …")
+
+        worker = FunctionWorker(ingest_document, path, parent=self)
+        worker.kwargs["on_progress"] = worker.progress.emit
+        worker.progress.connect(
+            lambda n: self.question_lbl.setText(
+                f"⏳ Dokument wird zusammengefasst … {n} Abschnitte fertig"
+            )
+        )
+        worker.done.connect(self._on_document_ready)
+        worker.failed.connect(
+            lambda msg: QMessageBox.critical(self, "LLM-Fehler", msg)
+        )
+        worker.finished.connect(lambda: self.doc_btn.setEnabled(True))
+        worker.finished.connect(lambda: self.ask_btn.setEnabled(True))
+        worker.finished.connect(self.question_lbl.clear)
+        self.doc_worker = worker
+        worker.start()
+
+    @Slot(object)
+    def _on_document_ready(self, brief: str) -> None:
+        self.in_edit.setPlainText(brief)
+
     @Slot()
     def on_suggest(self) -> None:
         desc = self.in_edit.toPlainText().strip()
@@ -161,7 +252,8 @@ class MainWindow(QMainWindow):
         QApplication.processEvents()
 
         try:
-            yaml_part, question = suggest_stack(desc)
+            result = run_job("stack", description=desc)
+            yaml_part, question = result["yaml"], result["question"]
             self.yaml_raw = yaml_part
         except Exception as exc:
             QMessageBox.critical(self, "LLM-Fehler", str(exc))
@@ -177,6 +269,7 @@ class MainWindow(QMainWindow):
         for b in (self.ok_btn, self.mod_btn):
             b.setEnabled(True)
         self.ask_btn.setEnabled(True)
+        self._speculate()
 
     def populate_tree(self, yaml_text: str) -> None:
         self.tree.clear()
@@ -196,6 +289,22 @@ class MainWindow(QMainWindow):
             sec_item.setExpanded(True)
         self.tree.resizeColumnToContents(0)
 
+    def populate_stories(self) -> None:
+        self.tree.clear()
+        for ei, epic in enumerate(self.plan.epics):
+            epic_item = QTreeWidgetItem([f"[EPIC] {epic.name}"])
+            epic_item.setData(0, Qt.UserRole, (ei, None))
+            self.tree.addTopLevelItem(epic_item)
+            for si, st in enumerate(epic.stories):
+                story_item = QTreeWidgetItem(
+                    epic_item,
+                    [f"{st.summary}  (SP: {st.points})", st.sprint or ""],
+                )
+                story_item.setData(0, Qt.UserRole, (ei, si))
+                for t in st.tasks:
+                    QTreeWidgetItem(story_item, [f"• {t}"])
+        self.tree.expandAll()
+
     @Slot()
     def on_confirm(self) -> None:
         dlg = ProjectDialog(self)
@@ -208,7 +317,10 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Jira-Fehler", str(exc))
             return
 
-        self.gen_btn.setEnabled(True)
+        if not self.plan_locked:
+            self.gen_btn.setEnabled(True)
+            self.pipe_btn.setEnabled(True)
+        self._speculate()  # no-op if the shown stack is already running
 
     @Slot()
     def on_modify(self) -> None:
@@ -224,13 +336,21 @@ class MainWindow(QMainWindow):
             return
 
         # --- call KI ---
+        # the stack changes, stories decomposed for the old one are useless
+        self._discard_speculation()
         self.ok_btn.setEnabled(False)
         self.mod_btn.setEnabled(False)
         self.question_lbl.setText("⏳ Änderungen werden geprüft …")
         QApplication.processEvents()
 
         try:
-            new_yaml, new_q = revise_stack(self.yaml_raw, changes_txt)
+            result = run_job(
+                "revise",
+                yaml=self.yaml_raw,
+                changes=changes_txt,
+                description=self.in_edit.toPlainText(),
+            )
+            new_yaml, new_q = result["yaml"], result["question"]
             self.yaml_raw = new_yaml
             self.populate_tree(new_yaml)
             self.question_lbl.setText(new_q)
@@ -239,53 +359,110 @@ class MainWindow(QMainWindow):
         finally:
             self.ok_btn.setEnabled(True)
             self.mod_btn.setEnabled(True)
+        self._speculate()
 
-    @Slot()
     @Slot()
     def on_push_to_jira(self) -> None:
-        from jira_client import (
-            get_jira,
-            ensure_board,
-            create_sprint,
-            create_epic,
-            create_story,
-            add_issue_to_sprint,
-        )
-
-        if not self.stories:
+        if not self.plan:
             QMessageBox.warning(
                 self, "Keine Stories", "Bitte erst User-Stories generieren."
             )
             return
+        if self.plan.is_pushed():
+            # pushing again would duplicate everything, sync the changes instead
+            self.on_sync_to_jira()
+            return
+
+        self._lock_plan()
+        self.push_dlg = PushProgressDialog(self.plan, self.project_key, self)
+        self.push_dlg.done.connect(self._unlock_plan)
+        self.push_dlg.show()
+        self.push_dlg.start()
+
+    @Slot()
+    def on_sync_to_jira(self) -> None:
+        from reconcile import diff_plan
+
+        self._lock_plan()
+        self.question_lbl.setText("⏳ Plan wird mit Jira verglichen …")
+        plan, project_key = self.plan, self.project_key
+
+        worker = FunctionWorker(
+            lambda: diff_plan(get_jira(), plan, project_key), parent=self
+        )
+        worker.done.connect(lambda changes: self._apply_sync(plan, changes))
+        worker.failed.connect(
+            lambda msg: QMessageBox.critical(self, "Jira-Fehler", msg)
+        )
+        worker.failed.connect(lambda _: self._unlock_plan())
+        worker.finished.connect(self.question_lbl.clear)
+        self.sync_worker = worker
+        worker.start()
+
+    def _apply_sync(self, plan, changes) -> None:
+        from reconcile import apply_changes, apply_mapping
+
+        if not changes:
+            apply_mapping(plan, changes)
+            QMessageBox.information(
+                self, "Abgleich", "Jira ist auf dem Stand des Plans."
+            )
+            self._unlock_plan()
+            return
+        answer = QMessageBox.question(
+            self, "Abgleich", f"{changes.summary()}\n\nÄnderungen übernehmen?"
+        )
+        if answer != QMessageBox.Yes:
+            self._unlock_plan()
+            return
 
-        jira = get_jira()
-        project_key = self.project_key
-        board_id = ensure_board(jira, project_key)
+        self.question_lbl.setText("⏳ Änderungen werden übernommen …")
+        worker = FunctionWorker(
+            lambda: apply_changes(get_jira(), plan, self.project_key, changes),
+            parent=self,
+        )
+        worker.done.connect(
+            lambda n: QMessageBox.information(
+                self, "Abgleich", f"{changes.summary()}\n\n{n} Jira-Aufrufe."
+            )
+        )
+        worker.failed.connect(
+            lambda msg: QMessageBox.critical(self, "Jira-Fehler", msg)
+        )
+        worker.finished.connect(self._unlock_plan)
+        worker.finished.connect(self.question_lbl.clear)
+        self.sync_worker = worker
+        worker.start()
 
-        log_lines = []
+    @Slot()
+    def on_export_plan(self) -> None:
+        from export import export_csv, export_json
 
-        for sp in self.sprint_plan:
-            # sprint name
-            name = sp.get("name", "Sprint")
-            goal = sp.get("goal", "")
-            sprint_id = create_sprint(jira, board_id, name, days=14)
-            log_lines.append(f"🏃 {name} (ID {sprint_id}) angelegt")
+        if not self.plan:
+            QMessageBox.warning(
+                self, "Keine Stories", "Bitte erst User-Stories generieren."
+            )
+            return
+
+        path, selected = QFileDialog.getSaveFileName(
+            self, "Jira-Import speichern", "", "CSV (*.csv);;JSON (*.json)"
+        )
+        if not path:
+            return
 
-            for epic in self.stories:
-                if epic["epic"] in sp.get("epics", []):
-                    epic_key = create_epic(jira, project_key, epic["epic"])
-                    log_lines.append(f"  ✔ Epic {epic_key} für {epic['epic']}")
-                    for story in epic["stories"]:
-                        story_key = create_story(jira, project_key, epic_key, story)
-                        add_issue_to_sprint(jira, sprint_id, story_key)
-                        log_lines.append(f"     ↳ Story {story_key}")
+        try:
+            if path.lower().endswith(".json") or selected.startswith("JSON"):
+                project_key = getattr(self, "project_key", "")
+                count = export_json(path, self.plan, project_key)
+            else:
+                count = export_csv(path, self.plan)
+        except OSError as exc:
+            QMessageBox.critical(self, "Export-Fehler", str(exc))
+            return
 
         QMessageBox.information(
-            self,
-            "Fertig",
-            "Alles angelegt 🎉\n\n" + "\n".join(log_lines),
+            self, "Exportiert", f"{count} Issues nach {path} geschrieben."
         )
-        self.push_btn.setEnabled(False)
 
     @Slot()
     def on_generate_stories(self):
@@ -293,41 +470,248 @@ class MainWindow(QMainWindow):
         self.gen_btn.setEnabled(False)
         self.push_btn.setEnabled(False)
         self.question_lbl.setText("⏳ Stories werden erstellt …")
-        QApplication.processEvents()
 
         # tree and stories clear
         self.tree.clear()
-        self.stories = []
-        self.sprint_plan = []
+        self.plan = Plan()
+        self.sync_btn.setEnabled(False)
+
+        key = (self.in_edit.toPlainText(), self.yaml_raw)
+        if self.spec_key == key:
+            if self.spec_result is None:
+                # still running: _on_speculation_done shows it when it's ready
+                self.spec_waiting = True
+                return
+            raw, error = self.spec_result
+            # a result is used once, generating again asks the LLM again
+            self._discard_speculation()
+            if error is None:
+                self._use_speculation(raw, key[0])
+                self._show_plan(raw)
+                return
+        QApplication.processEvents()
 
         # LLM call
         try:
-            plan = decompose_project(self.in_edit.toPlainText(), self.yaml_raw)
-            if isinstance(plan, dict):
-                self.stories = plan.get("epics", [])
-                self.sprint_plan = plan.get("sprints", [])
-            else:
-                # Fallback
-                self.stories = plan
+            raw = run_job("decompose", description=key[0], yaml=key[1])
         except Exception as exc:
             QMessageBox.critical(self, "LLM-Fehler", str(exc))
             self.gen_btn.setEnabled(True)
+            self.question_lbl.clear()
             return
+        self._show_plan(raw)
 
-        # fill tree
-        for epic in self.stories:
-            epic_item = QTreeWidgetItem([f"[EPIC] {epic['epic']}"])
-            self.tree.addTopLevelItem(epic_item)
-            for st in epic["stories"]:
-                story_item = QTreeWidgetItem(
-                    epic_item, [f"{st['summary']}  (SP: {st['points']})"]
-                )
-                for t in st.get("tasks", []):
-                    QTreeWidgetItem(story_item, [f"• {t}"])
-        self.tree.expandAll()
+    @Slot()
+    def on_generate_and_push(self) -> None:
+        from ai import decomposed_epics, stream_decomposition
+
+        key = (self.in_edit.toPlainText(), self.yaml_raw)
+        if self.spec_key == key and self.spec_result and self.spec_result[1] is None:
+            # the speculative run already has all epics, only the push is left
+            raw = self.spec_result[0]
+            self._use_speculation(raw, key[0])
+            epics = decomposed_epics(raw)
+        else:
+            epics = stream_decomposition(*key)
+        # used or overtaken by the stream: never push the same epics twice
+        self._discard_speculation()
+
+        self._lock_plan()
+        self.tree.clear()
+        self.plan = Plan(description=key[0])
+        worker = PipelineWorker(
+            epics, self.plan, self.project_key, self._velocity(), self
+        )
+        self.push_dlg = PushProgressDialog(
+            self.plan, self.project_key, self, worker=worker
+        )
+        self.push_dlg.setWindowTitle("Stories generieren und an Jira senden")
+        self.push_dlg.done.connect(self._on_pipeline_finished)
+        self.push_dlg.show()
+        self.push_dlg.start()
+
+    def _on_pipeline_finished(self) -> None:
+        # also after a failure: the plan holds what was generated and pushed
+        self.populate_stories()
+        self._unlock_plan()
+
+    # ---------- plan lock ----------
+    def _lock_plan(self) -> None:
+        """Disables everything that starts work on the plan.
+
+        Pushes, syncs and regenerations change the plan from a worker (a
+        regeneration swaps the nodes a push is creating), so only one of them
+        may run. Their finished/failed handlers call ``_unlock_plan``.
+        """
+        self.plan_locked = True
+        for b in (
+            self.gen_btn,
+            self.pipe_btn,
+            self.push_btn,
+            self.sync_btn,
+            self.export_btn,
+            self.regen_btn,
+        ):
+            b.setEnabled(False)
+
+    def _unlock_plan(self) -> None:
+        self.plan_locked = False
+        has_plan = bool(self.plan)
+        # a new plan only replaces the current one when there is none yet
+        for b in (self.gen_btn, self.pipe_btn):
+            b.setEnabled(not has_plan and hasattr(self, "project_key"))
+        for b in (self.push_btn, self.export_btn, self.regen_btn):
+            b.setEnabled(has_plan)
+        self.sync_btn.setEnabled(self.plan.is_pushed())
+
+    def _show_plan(self, raw) -> None:
+        self.question_lbl.clear()
+        try:
+            self.plan = Plan.from_llm(raw)
+            self.plan.description = self.in_edit.toPlainText()
+            self.plan.schedule(self._velocity())
+        except Exception as exc:
+            QMessageBox.critical(self, "LLM-Fehler", str(exc))
+            self.gen_btn.setEnabled(True)
+            return
+
+        self.populate_stories()
 
         # activate btn for push
         self.push_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+        self.regen_btn.setEnabled(True)
+
+    # ---------- speculative decomposition ----------
+    def _speculate(self) -> None:
+        """Starts ``decompose_project`` for the shown stack in the background.
+
+        The user still has to confirm the stack and create the Jira project,
+        so the stories are usually ready by the time they are asked for.
+        """
+        if not QSettings("PrinzCodeAgent").value("ai/speculate", True, type=bool):
+            return
+        key = (self.in_edit.toPlainText(), self.yaml_raw)
+        if not self.yaml_raw or key == self.spec_key:
+            return
+        self._discard_speculation()
+
+        worker = FunctionWorker(
+            run_job,
+            "decompose",
+            description=key[0],
+            yaml=key[1],
+            index=False,
+            parent=self,
+        )
+        self._watch_speculation(key, worker)
+        worker.start()
+
+    def _watch_speculation(self, key, worker) -> None:
+        worker.done.connect(lambda raw: self._on_speculation_done(key, raw, None))
+        worker.failed.connect(lambda msg: self._on_speculation_done(key, None, msg))
+        self.spec_key, self.spec_worker, self.spec_result = key, worker, None
+
+    def _use_speculation(self, raw, description: str) -> None:
+        # speculative runs skip the search index, only a used result lands there
+        from ai import index_decomposition
+
+        index_decomposition(raw, description)
+
+    def _discard_speculation(self) -> None:
+        # a running LLM call can't be aborted, its result is dropped instead
+        self.spec_key = self.spec_worker = self.spec_result = None
+        if self.spec_waiting:
+            self.spec_waiting = False
+            self.gen_btn.setEnabled(True)
+
+    def _on_speculation_done(self, key, raw, error) -> None:
+        if key != self.spec_key:
+            return  # stale: the stack or description changed meanwhile
+        self.spec_result = (raw, error)
+        if self.spec_waiting:
+            self.spec_waiting = False
+            self._discard_speculation()
+            if error is None:
+                self._use_speculation(raw, key[0])
+                self._show_plan(raw)
+            else:
+                QMessageBox.critical(self, "LLM-Fehler", error)
+                self.gen_btn.setEnabled(True)
+                self.question_lbl.clear()
+
+    def _velocity(self) -> int:
+        return QSettings("PrinzCodeAgent").value(
+            "planner/velocity", DEFAULT_VELOCITY, type=int
+        )
+
+    @Slot()
+    def on_regenerate_selected(self) -> None:
+        from ai import regenerate_part
+
+        item = self.tree.currentItem()
+        # sub-task rows point to their story
+        while item is not None and item.data(0, Qt.UserRole) is None:
+            item = item.parent()
+        if item is None or not self.plan:
+            QMessageBox.warning(
+                self, "Nichts ausgewählt", "Bitte ein Epic oder eine Story auswählen."
+            )
+            return
+
+        ei, si = item.data(0, Qt.UserRole)
+        epic = self.plan.epics[ei]
+        story = None if si is None else epic.stories[si].summary
+        if story is None:
+            target = f"Epic „{epic.name}“"
+        else:
+            target = f"Story „{story}“ (Epic „{epic.name}“)"
+
+        hint, ok = QInputDialog.getMultiLineText(
+            self, "Neu generieren", f"{target}\n\nWas soll anders werden? (optional)"
+        )
+        if not ok:
+            return
+
+        self._lock_plan()
+        self.question_lbl.setText(f"⏳ {target} wird neu generiert …")
+
+        worker = FunctionWorker(
+            regenerate_part,
+            self.in_edit.toPlainText(),
+            self.yaml_raw,
+            self.plan.outline(),
+            epic.name,
+            story,
+            hint.strip(),
+            parent=self,
+        )
+        plan = self.plan
+        worker.done.connect(lambda data: self._splice_part(plan, ei, si, data))
+        worker.failed.connect(
+            lambda msg: QMessageBox.critical(self, "LLM-Fehler", msg)
+        )
+        worker.finished.connect(self._unlock_plan)
+        worker.finished.connect(self.question_lbl.clear)
+        self.regen_worker = worker
+        worker.start()
+
+    def _splice_part(self, plan, epic_index: int, story_index: int | None, data):
+        if plan is not self.plan:
+            return  # the whole plan was regenerated meanwhile
+        try:
+            if story_index is None:
+                self.plan.replace_epic(epic_index, data)
+            else:
+                self.plan.replace_story(epic_index, story_index, data)
+            if not self.plan.is_pushed():
+                # points may have changed, the local planner is cheap to rerun
+                self.plan.schedule(self._velocity())
+        except ValueError as exc:
+            QMessageBox.critical(self, "LLM-Fehler", str(exc))
+        # once pushed the sprints stay as they are (a sync would move every
+        # shifted story), new stories go to the backlog
+        self.populate_stories()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,28 @@
+# worker.py
+from PySide6.QtCore import QThread, Signal
+
+
+class FunctionWorker(QThread):
+    """Runs ``fn(*args, **kwargs)`` off the UI thread.
+
+    ``done`` carries the return value, ``failed`` the error message and
+    ``progress`` whatever the function reports through it.
+    """
+
+    done = Signal(object)
+    failed = Signal(str)
+    progress = Signal(object)
+
+    def __init__(self, fn, *args, parent=None, **kwargs):
+        super().__init__(parent)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as exc:
+            self.failed.emit(str(exc))
+        else:
+            self.done.emit(result)
@@ -0,0 +1,46 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from dedup import DuplicateIndex  # noqa: E402
+
+# Misst den Duplikat-Index bei großen Backlogs:
+#   python utils/bench_dedup.py            → 100000 Issues
+#   python utils/bench_dedup.py 20000
+
+
+def main(n: int) -> None:
+    rnd = random.Random(1)
+    words = [f"wort{i}" for i in range(5000)]
+    texts = [" ".join(rnd.choices(words, k=40)) for _ in range(n)]
+
+    index = DuplicateIndex()
+    t0 = time.perf_counter()
+    signatures = [index.signature(t) for t in texts]
+    hashing = time.perf_counter() - t0
+    print(f"Signaturen berechnen (einmal, im Sync): {hashing:7.2f} s")
+
+    # what the backlog mirror does on first use: read the stored signatures
+    t0 = time.perf_counter()
+    for i, (text, sig) in enumerate(zip(texts, signatures)):
+        index.add(f"AB-{i}", text, sig)
+    print(f"Index aus gespeicherten Signaturen:     {time.perf_counter() - t0:7.2f} s")
+
+    queries = [t.replace(t.split()[0], "anders", 1) for t in rnd.sample(texts, 500)]
+    t0 = time.perf_counter()
+    found = sum(bool(index.query(q)) for q in queries)
+    per_query = (time.perf_counter() - t0) / len(queries)
+    print(f"Abfrage:                                {per_query * 1e3:7.3f} ms"
+          f" ({found}/{len(queries)} Duplikate gefunden)")
+
+    t0 = time.perf_counter()
+    for i in range(500):
+        index.add(f"NEU-{i}", queries[i])
+    per_add = (time.perf_counter() - t0) / 500
+    print(f"Neues Issue aufnehmen (Push/Webhook):   {per_add * 1e3:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
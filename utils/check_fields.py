@@ -1,8 +1,11 @@
 import os
-import json
+import sys
 from jira import JIRA
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from jira_client import get_create_fields, get_subtask_type  # noqa: E402
+
 load_dotenv()
 
 jira = JIRA(
@@ -13,3 +16,11 @@ jira = JIRA(
 for f in jira.fields():
     if "epic" in f["name"].lower():  # filtert alles mit „epic“
         print(f"{f['name']:25s}  →  {f['id']}")
+
+# python utils/check_fields.py PROJ  → was create_epic/create_story benutzen
+if len(sys.argv) > 1:
+    project_key = sys.argv[1]
+    for issue_type in ("Epic", "Story"):
+        for role, field_id in get_create_fields(jira, project_key, issue_type).items():
+            print(f"{issue_type:6s} {role:13s}  →  {field_id}")
+    print(f"Sub-Task-Typ           →  {get_subtask_type(jira, project_key)}")
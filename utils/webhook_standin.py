@@ -0,0 +1,73 @@
+import json
+import os
+import sys
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import backlog_mirror  # noqa: E402
+from cache import TTLCache  # noqa: E402
+from webhook import WEBHOOK_PATH, start_listener  # noqa: E402
+
+# Stand-in für Jira: schickt Beispiel-Events an den Webhook-Listener.
+#   python utils/webhook_standin.py      → eigener Listener + Ausgabe des Caches
+#   python utils/webhook_standin.py http://host:port/jira-webhook
+
+SAMPLES = [
+    {
+        "webhookEvent": "jira:issue_created",
+        "issue": {
+            "key": "DEMO-3",
+            "fields": {
+                "project": {"key": "DEMO"},
+                "summary": "Login mit SSO",
+                "description": "* Nutzer kann sich per SSO anmelden",
+            },
+        },
+    },
+    {"webhookEvent": "jira:issue_deleted", "issue": {"key": "DEMO-1"}},
+    {
+        "webhookEvent": "sprint_created",
+        "sprint": {"id": 12, "name": "Sprint 2", "state": "future", "originBoardId": 1},
+    },
+    {
+        "webhookEvent": "sprint_started",
+        "sprint": {"id": 11, "name": "Sprint 1", "state": "active", "originBoardId": 1},
+    },
+    {"webhookEvent": "project_created", "project": {"key": "NEW", "name": "Neu"}},
+]
+
+
+def post(url: str, payload: dict) -> int:
+    req = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req) as res:
+        return res.status
+
+
+if __name__ == "__main__":
+    server = None
+    if len(sys.argv) > 1:
+        url = sys.argv[1]
+    else:
+        cache = TTLCache()
+        cache.set(("projects",), [{"key": "DEMO", "name": "Demo"}])
+        cache.set(("sprints", 1), [{"id": 11, "name": "Sprint 1", "state": "future"}])
+        backlog_mirror._mirror = backlog_mirror.BacklogMirror(":memory:")
+        index = backlog_mirror._mirror.duplicate_index("DEMO")
+        index.add("DEMO-1", "Alt")
+        index.add("DEMO-2", "Bleibt")
+        server = start_listener(port=0, cache=cache)
+        url = f"http://127.0.0.1:{server.server_address[1]}{WEBHOOK_PATH}"
+
+    for payload in SAMPLES:
+        print(f"{payload['webhookEvent']:22s} → {post(url, payload)}")
+
+    if server:
+        server.shutdown()
+        for key in (("projects",), ("sprints", 1)):
+            print(key, cache.get(key))
+        keys = ("DEMO-1", "DEMO-2", "DEMO-3")
+        print("Duplikat-Index DEMO:", {k: k in index for k in keys})
@@ -1,25 +1,278 @@
-import sys
+"""Dev watcher: restarts or hot-reloads the app when a *.py file changes.
+
+    python watcher.py              → restart main.py as a subprocess
+    python watcher.py --inprocess  → reload the changed modules inside the
+                                     running app and keep the MainWindow state
+
+Changes are debounced, so one save (editors often write several events)
+triggers one restart/reload. Virtualenvs, caches and .git are ignored.
+"""
+
+import ast
+import graphlib
+import importlib
+import os
 import subprocess
+import sys
+import threading
+import time
 from watchdog.observers import Observer
 from watchdog.events import PatternMatchingEventHandler
 
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEBOUNCE = 0.3
+IGNORE_DIRS = {
+    ".venv",
+    "venv",
+    "__pycache__",
+    ".git",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".tox",
+    ".nox",
+    "site-packages",
+}
+
+# MainWindow attributes carried over to the reloaded window
+STATE_ATTRS = (
+    "yaml_raw",
+    "plan",
+    "project_key",
+    "spec_key",
+    "spec_result",
+    "spec_waiting",
+)
+
+
+class DebouncedHandler(PatternMatchingEventHandler):
+    """Collects changed paths and calls ``callback(paths)`` once they settle."""
+
+    def __init__(self, callback, delay: float = DEBOUNCE):
+        super().__init__(patterns=["*.py"], ignore_directories=True)
+        self.callback = callback
+        self.delay = delay
+        self._changed: set[str] = set()
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def on_any_event(self, event):
+        if event.event_type not in ("modified", "created", "moved"):
+            return
+        path = getattr(event, "dest_path", "") or event.src_path
+        if IGNORE_DIRS.intersection(os.path.relpath(path, ROOT).split(os.sep)):
+            return
+        with self._lock:
+            self._changed.add(os.path.abspath(path))
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._fire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _fire(self):
+        with self._lock:
+            paths, self._changed = sorted(self._changed), set()
+            self._timer = None
+        if paths:
+            self.callback(paths)
+
+
+class RestartRunner:
+    """Runs ``cmd`` as a subprocess and restarts it on changes."""
 
-class RestartHandler(PatternMatchingEventHandler):
     def __init__(self, cmd):
-        super().__init__(patterns=["*.py"])
         self.cmd = cmd
         self.process = subprocess.Popen(self.cmd)
 
-    def on_modified(self, event):
-        print(f"{event.src_path} geändert → Neustart")
-        self.process.kill()
+    def restart(self, paths):
+        t0 = time.perf_counter()
+        names = ", ".join(os.path.relpath(p, ROOT) for p in paths)
+        print(f"{names} geändert → Neustart")
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        stopped = time.perf_counter()
         self.process = subprocess.Popen(self.cmd)
+        print(
+            f"⏱ Prozess beendet in {(stopped - t0) * 1000:.0f} ms, "
+            f"neu gestartet nach {(time.perf_counter() - t0) * 1000:.0f} ms"
+        )
 
 
-if __name__ == "__main__":
-    cmd = [sys.executable, "main.py"]
-    event_handler = RestartHandler(cmd)
+def _module_name(path: str) -> str | None:
+    rel = os.path.relpath(path, ROOT)
+    if rel.startswith("..") or not rel.endswith(".py"):
+        return None
+    name = rel[:-3].replace(os.sep, ".")
+    return name.removesuffix(".__init__")
+
+
+def _module_imports(path: str) -> set[str]:
+    """Module names imported when ``path`` is executed (not inside functions)."""
+    with open(path, encoding="utf-8") as fh:
+        tree = ast.parse(fh.read(), path)
+    names: set[str] = set()
+    nodes = list(tree.body)
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            continue  # imports there run later and see the reloaded modules
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.module and not node.level:
+                names.add(node.module)
+                # "from ui import worker" binds the submodule
+                names.update(f"{node.module}.{alias.name}" for alias in node.names)
+        else:
+            nodes.extend(ast.iter_child_nodes(node))
+    return names
+
+
+def _project_modules() -> dict[str, str]:
+    """Returns name → file of the loaded project modules (watcher excluded)."""
+    modules = {}
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path and _module_name(path) == name and name != "watcher":
+            modules[name] = path
+    return modules
+
+
+def reload_modules(paths) -> list[str]:
+    """
+    Reloads the changed project modules plus everything that binds their names.
+
+    The import graph of the loaded project modules is read from their
+    sources. Every module that imports a changed module, directly or through
+    others, is reloaded too, each one after the modules it imports, so no
+    module keeps a binding to an old function or class.
+
+    Returns:
+        list[str]: The reloaded module names in reload order.
+    """
+
+    modules = _project_modules()
+    imports = {
+        name: _module_imports(path) & modules.keys() for name, path in modules.items()
+    }
+    dependents: dict[str, set[str]] = {}
+    for name, deps in imports.items():
+        for dep in deps:
+            dependents.setdefault(dep, set()).add(name)
+
+    todo = [m for m in map(_module_name, paths) if m in modules]
+    affected = set(todo)
+    while todo:
+        for name in dependents.get(todo.pop(), ()):
+            if name not in affected:
+                affected.add(name)
+                todo.append(name)
+
+    graph = {name: imports[name] & affected for name in sorted(affected)}
+    try:
+        order = list(graphlib.TopologicalSorter(graph).static_order())
+    except graphlib.CycleError as exc:
+        # an import cycle at module level: reload in name order, the cycle's
+        # members see each other's new code after the next save at the latest
+        print(f"⚠ Import-Zyklus {exc.args[1]}, lade in Namensreihenfolge")
+        order = sorted(affected, key=lambda m: (m == "ui.ui", m))
+
+    for name in order:
+        importlib.reload(sys.modules[name])
+    return order
+
+
+def swap_window(old):
+    """Creates a MainWindow from the reloaded code and moves the state over."""
+    from PySide6.QtWidgets import QPushButton
+    from ui.ui import MainWindow
+
+    if getattr(old, "webhook_server", None):
+        old.webhook_server.shutdown()
+        old.webhook_server.server_close()
+
+    new = MainWindow()
+    for attr in STATE_ATTRS:
+        if hasattr(old, attr):
+            setattr(new, attr, getattr(old, attr))
+    new.in_edit.setPlainText(old.in_edit.toPlainText())
+    new.question_lbl.setText(old.question_lbl.text())
+    if new.plan:
+        new.populate_stories()
+    elif new.yaml_raw:
+        new.populate_tree(new.yaml_raw)
+    for name, widget in vars(old).items():
+        if isinstance(widget, QPushButton) and hasattr(new, name):
+            getattr(new, name).setEnabled(widget.isEnabled())
+    worker = getattr(old, "spec_worker", None)
+    if worker is not None and worker.isRunning():
+        # the running speculation reports to the new window, and must not be
+        # deleted with the old one
+        worker.done.disconnect()
+        worker.failed.disconnect()
+        worker.setParent(new)
+        new._watch_speculation(old.spec_key, worker)
+
+    new.setGeometry(old.geometry())
+    new.show()
+    old.close()
+    old.deleteLater()
+    return new
+
+
+def run_inprocess():
+    from PySide6.QtCore import QObject, Signal, Slot
+    from PySide6.QtWidgets import QApplication
+    import dotenv
+
+    dotenv.load_dotenv()
+    app = QApplication(sys.argv)
+    from ui.ui import MainWindow
+
+    class Reloader(QObject):
+        # watchdog runs in its own thread, the queued signal moves the reload
+        # into Qt's main thread where widgets may be touched
+        changed = Signal(list)
+
+        def __init__(self):
+            super().__init__()
+            self.win = MainWindow()
+            self.win.show()
+            self.changed.connect(self.reload)
+
+        @Slot(list)
+        def reload(self, paths):
+            t0 = time.perf_counter()
+            try:
+                modules = reload_modules(paths)
+                self.win = swap_window(self.win)
+            except Exception as exc:  # keep the old window on syntax errors etc.
+                print(f"⚠ Reload fehlgeschlagen: {exc}")
+                return
+            ms = (time.perf_counter() - t0) * 1000
+            print(f"♻ {', '.join(modules)} neu geladen in {ms:.0f} ms")
+
+    reloader = Reloader()
+
     obs = Observer()
-    obs.schedule(event_handler, path=".", recursive=True)
+    obs.schedule(DebouncedHandler(reloader.changed.emit), path=ROOT, recursive=True)
     obs.start()
-    obs.join()
+    code = app.exec()
+    obs.stop()
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    if "--inprocess" in sys.argv:
+        run_inprocess()
+    else:
+        runner = RestartRunner([sys.executable, os.path.join(ROOT, "main.py")])
+        obs = Observer()
+        obs.schedule(DebouncedHandler(runner.restart), path=ROOT, recursive=True)
+        obs.start()
+        obs.join()
@@ -0,0 +1,173 @@
+"""Optional local HTTP listener for Jira webhooks.
+
+Jira posts issue, sprint, board and project events to
+``http://<host>:<port>/jira-webhook``; every event updates or invalidates the
+matching entry in ``cache.jira_cache`` (issue events the duplicate index of
+the backlog mirror), so the UI doesn't have to poll Jira. When no events
+arrive the cache TTL still refreshes the data.
+
+``utils/webhook_standin.py`` posts sample payloads for local testing.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from backlog_mirror import forget_issue, remember_issue
+from cache import jira_cache
+from dedup import issue_text
+
+DEFAULT_PORT = 8765
+WEBHOOK_PATH = "/jira-webhook"
+
+
+def _issue_project(issue: dict) -> str | None:
+    project = (issue.get("fields") or {}).get("project") or {}
+    if project.get("key"):
+        return project["key"]
+    key = issue.get("key", "")
+    return key.rsplit("-", 1)[0] if "-" in key else None
+
+
+def _apply_issue(event: str, payload: dict, cache) -> None:
+    issue = payload.get("issue") or {}
+    project_key = _issue_project(issue)
+    if not project_key or not issue.get("key"):
+        return
+    key = issue["key"]
+    if event == "jira:issue_deleted":
+        forget_issue(key)
+        return
+
+    # the rows of created/updated issues reach the mirror with its next
+    # incremental sync, the duplicate index is updated right away
+    fields = issue.get("fields") or {}
+    if "summary" not in fields:
+        # partial payload, we can't patch the index: sync before the next use
+        cache.invalidate(("issues", project_key))
+        return
+    remember_issue(
+        project_key, key, issue_text(fields["summary"], fields.get("description"))
+    )
+
+
+def _apply_sprint(event: str, payload: dict, cache) -> None:
+    sprint = payload.get("sprint") or {}
+    board_id = sprint.get("originBoardId")
+    if board_id is None:
+        cache.invalidate_prefix("sprints")
+        return
+    deleted = event == "sprint_deleted"
+    if sprint.get("id") is None or not (deleted or {"name", "state"} <= sprint.keys()):
+        # partial payload, we can't patch the list: reload it next time
+        cache.invalidate(("sprints", board_id))
+        return
+
+    def patch(sprints: list[dict]) -> None:
+        sprints[:] = [s for s in sprints if s.get("id") != sprint["id"]]
+        if not deleted:
+            sprints.append(
+                {"id": sprint["id"], "name": sprint["name"], "state": sprint["state"]}
+            )
+            sprints.sort(key=lambda s: s["id"])
+
+    if not cache.update(("sprints", board_id), patch):
+        cache.invalidate(("sprints", board_id))
+
+
+def _apply_project(event: str, payload: dict, cache) -> None:
+    project = payload.get("project") or {}
+    key = project.get("key")
+    if not key:
+        cache.invalidate(("projects",))
+        return
+
+    def patch(projects: list[dict]) -> None:
+        projects[:] = [p for p in projects if p["key"] != key]
+        if event != "project_deleted":
+            projects.append({"key": key, "name": project.get("name", key)})
+
+    cache.update(("projects",), patch)
+    if event == "project_deleted":
+        for kind in ("boards", "issues"):
+            cache.invalidate((kind, key))
+
+
+def apply_event(payload: dict, cache=jira_cache) -> bool:
+    """
+    Updates the cache from one Jira webhook payload.
+
+    Args:
+        payload (dict): The decoded webhook body.
+        cache (TTLCache, optional): The cache to update. Defaults to ``jira_cache``.
+
+    Returns:
+        bool: True if the event type was recognised.
+    """
+
+    event = payload.get("webhookEvent", "")
+    if event.startswith("jira:issue_"):
+        _apply_issue(event, payload, cache)
+    elif event.startswith("sprint_"):
+        _apply_sprint(event, payload, cache)
+    elif event.startswith("project_"):
+        _apply_project(event, payload, cache)
+    elif event.startswith("board_"):
+        cache.invalidate_prefix("boards")
+    else:
+        return False
+    return True
+
+
+def _make_handler(cache, secret: str):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != WEBHOOK_PATH:
+                self.send_error(404)
+                return
+            if secret and parse_qs(url.query).get("secret", [""])[0] != secret:
+                self.send_error(403)
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except (ValueError, json.JSONDecodeError):
+                self.send_error(400)
+                return
+            if not isinstance(payload, dict):
+                self.send_error(400)
+                return
+            apply_event(payload, cache)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            print("⮕ Webhook:", format % args)
+
+    return WebhookHandler
+
+
+def start_listener(
+    port: int = DEFAULT_PORT,
+    host: str = "127.0.0.1",
+    secret: str = "",
+    cache=jira_cache,
+) -> ThreadingHTTPServer:
+    """
+    Starts the webhook listener in a daemon thread.
+
+    Args:
+        port (int, optional): Port to listen on. Defaults to 8765.
+        host (str, optional): Interface to bind. Defaults to localhost only.
+        secret (str, optional): If set, requests need ``?secret=<secret>``.
+        cache (TTLCache, optional): The cache to update.
+
+    Returns:
+        ThreadingHTTPServer: The running server, call ``shutdown()`` to stop it.
+    """
+
+    server = ThreadingHTTPServer((host, port), _make_handler(cache, secret))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server